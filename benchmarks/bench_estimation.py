@@ -0,0 +1,87 @@
+'''
+流式需求估计 (econ1210.estimation) 的吞吐量、内存和结果
+按第 12 章的两条需求生成成交记录 (.npy 与 .csv), 对比:
+  load_all   整个文件读进内存后每个市场 np.linalg.lstsq (对照)
+  stream     fit_file, workers=1, 分块累积充分统计量
+  stream xN  fit_file, N 个进程并行后合并
+计时与测内存分开跑 (tracemalloc 会拖慢分配); 峰值内存只算本进程 (并行时不含子进程)
+用法:
+    python benchmarks/bench_estimation.py --rows 20000000 --csv-rows 2000000 --workers 1 2 4
+'''
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from econ1210.estimation import fit_file, synthesize
+
+MARKETS = [(92.0, 2.0), (64.0, 2.0)]
+
+
+def load_all(path):
+    '''对照: 一次读入, 逐市场最小二乘, 返回 {市场: (a, b)}'''
+    if path.suffix == '.npy':
+        data = np.load(path)
+        market, price, quantity = data['market'], data['price'], data['quantity']
+    else:
+        data = np.loadtxt(path, delimiter=',', skiprows=1)
+        market, price, quantity = data[:, 0].astype(int), data[:, 1], data[:, 2]
+    result = {}
+    for key in np.unique(market):
+        mask = market == key
+        design = np.column_stack([np.ones(mask.sum()), price[mask]])
+        (alpha, beta), *_ = np.linalg.lstsq(design, quantity[mask], rcond=None)
+        result[int(key)] = (-alpha / beta, -1.0 / beta)
+    return result
+
+
+def stream(path, workers):
+    fit = fit_file(path, workers=workers)
+    return {key: (c['a'], c['b']) for key, c in fit.table().items()}
+
+
+def measure(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def run(path, rows, workers, baseline):
+    print(f'{path.name}: {rows:,} 行, {path.stat().st_size / 2**20:.0f} MB')
+    methods = [('load_all', load_all, (path,))] if baseline else []
+    methods += [(f'stream x{w}' if w > 1 else 'stream', stream, (path, w)) for w in workers]
+    for label, func, args in methods:
+        result, elapsed, peak = measure(func, *args)
+        curves = '  '.join(f'{key}: P={a:.3f}-{b:.4f}Q' for key, (a, b) in sorted(result.items()))
+        print(f'  {label:10s} {elapsed:7.2f}s  {rows / elapsed / 1e6:6.1f} M 行/秒  '
+              f'峰值内存 {peak / 2**20:7.1f} MB  {curves}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='流式需求估计的吞吐量与内存')
+    parser.add_argument('--rows', type=float, default=2e7, help='.npy 的行数')
+    parser.add_argument('--csv-rows', type=float, default=2e6, help='.csv 的行数, 0 表示不测')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--no-baseline', action='store_true', help='不跑整体读入的对照 (行数很大时)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for suffix, rows in (('npy', int(args.rows)), ('csv', int(args.csv_rows))):
+            if not rows:
+                continue
+            path = synthesize(Path(tmp) / f'sales.{suffix}', rows, MARKETS, seed=0)
+            run(path, rows, args.workers, not args.no_baseline)
+
+
+if __name__ == '__main__':
+    main()
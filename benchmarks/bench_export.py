@@ -0,0 +1,95 @@
+'''
+内存导出 (econ1210.export) 与写磁盘的 savefig 对比
+每张图只创建一次, 各导出方式在同一个 Figure 上重复计时 (取中位数):
+  disk_tight    savefig(文件, bbox_inches='tight')  章节脚本现在的保存方式
+  disk          savefig(文件)
+  bytes_tight   to_bytes(tight=True)                 BytesIO, 无临时文件
+  bytes         to_bytes()                           不做 tight 测量
+  array         to_array()                           只栅格化, 返回缓冲区视图 (仅位图)
+  bytes_raster  to_bytes(rasterize_fills=True)       矢量格式, 填充层栅格化 (仅矢量)
+另外给出 100 个面板的小多图 (一个大的 PolyCollection) 作为填充层复杂时的对照
+用法:
+    python benchmarks/bench_export.py --dpi 100 300 --formats png svg pdf --repeat 5
+'''
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+from econ1210.export import VECTOR_FORMATS, to_array, to_bytes
+from econ1210.figures import FIGURES, get_figure
+from econ1210.figures.multiples import monopoly_multiples
+
+
+def _time(func, repeat):
+    times, size = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), size
+
+
+def methods(fig, fmt, dpi, tmp):
+    path = Path(tmp) / f'out.{fmt}'
+
+    def disk(**kwargs):
+        fig.savefig(path, format=fmt, dpi=dpi, **kwargs)
+        return path.stat().st_size
+
+    result = {
+        'disk_tight': lambda: disk(bbox_inches='tight'),
+        'disk': disk,
+        'bytes_tight': lambda: len(to_bytes(fig, fmt, dpi, tight=True)),
+        'bytes': lambda: len(to_bytes(fig, fmt, dpi)),
+    }
+    if fmt in VECTOR_FORMATS:
+        result['bytes_raster'] = lambda: len(to_bytes(fig, fmt, dpi, rasterize_fills=True))
+    else:
+        result['array'] = lambda: to_array(fig, dpi).nbytes
+    return result
+
+
+def run(figures, dpis, formats, repeat):
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, build in figures:
+            fig = build()
+            to_bytes(fig, 'png', 72)  # 预热
+            for fmt in formats:
+                for dpi in (dpis if fmt not in VECTOR_FORMATS else dpis[:1]):
+                    row = {name: _time(func, repeat) for name, func in methods(fig, fmt, dpi, tmp).items()}
+                    base = row['disk_tight'][0]
+                    print(f'{label:18s} {fmt:4s} {dpi:4d}dpi  ' + '  '.join(
+                        f'{name} {t*1000:6.1f}ms ({base / t:4.1f}x, {size/1024:7.1f}KB)'
+                        for name, (t, size) in row.items()))
+            plt.close(fig)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='内存导出与 savefig 写磁盘的对比')
+    parser.add_argument('figures', nargs='*', default=sorted(FIGURES))
+    parser.add_argument('--dpi', type=int, nargs='+', default=[100, 300])
+    parser.add_argument('--formats', nargs='+', default=['png', 'svg', 'pdf'])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--panels', type=int, default=100, help='小多图对照的面板数, 0 表示不测')
+    args = parser.parse_args()
+
+    figures = [(name, lambda name=name: get_figure(name)()) for name in args.figures]
+    if args.panels:
+        figures.append((f'multiples×{args.panels}',
+                        lambda: monopoly_multiples(np.linspace(0, 80, args.panels))))
+    print('括号内为相对 disk_tight 的加速比和输出大小')
+    run(figures, args.dpi, args.formats, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
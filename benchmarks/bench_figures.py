@@ -0,0 +1,178 @@
+'''
+各章图形的分阶段耗时 (Agg 画布, 不开窗口), 结果写成 JSON 便于跨提交比较
+每个 (图形, 采样点数, dpi, 格式) 组合分别计时:
+  model          模型计算 (RenderPlan.values)
+  artists        创建 Figure 和全部 artist
+  tight_layout   排版, 图形函数实际走的 labels.tight_layout (坐标轴内的文字不参与测量, 文字尺寸跨图缓存)
+  tight_layout_plain  对照: 同一张图另建一份, 用普通的 fig.tight_layout()
+  rasterize      canvas.draw() 栅格化 (仅位图格式)
+  encode         位图: RGBA 缓冲区编码为 PNG; 矢量: savefig 写 SVG/PDF
+  savefig_tight  脚本实际走的路径: savefig(..., bbox_inches='tight')
+图形来自 econ1210/specs 的声明式描述, 采样点数通过改写曲线和填充图层的 samples 实现
+(adaptive 表示不设 samples, 即自适应采样)
+用法:
+    python benchmarks/bench_figures.py --dpi 100 300 --formats png pdf --samples adaptive 200 2000 \
+        --out bench.json
+    python benchmarks/bench_figures.py --compare bench.json        # 与旧结果比较, 慢 20% 以上标出
+'''
+import argparse
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+from PIL import Image
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+from econ1210 import labels
+from econ1210.figures import FIGURES
+from econ1210.spec import SPEC_DIR, RenderPlan, parse_spec, with_samples
+
+STAGES = ('model', 'artists', 'tight_layout', 'tight_layout_plain', 'rasterize', 'encode', 'savefig_tight')
+# 不计入分阶段合计的对照项
+_REFERENCE = ('tight_layout_plain', 'savefig_tight')
+
+
+def run_once(plan, fmt, dpi):
+    '''一次完整渲染, 返回各阶段耗时 (秒)'''
+    times = {}
+    start = time.perf_counter()
+    ns = plan.values()
+    times['model'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fig = plan.build(ns)
+    fig.set_dpi(dpi)
+    times['artists'] = time.perf_counter() - start
+
+    if plan.tight_layout:
+        reference = plan.build(ns)
+        reference.set_dpi(dpi)
+        start = time.perf_counter()
+        reference.tight_layout()
+        times['tight_layout_plain'] = time.perf_counter() - start
+        plt.close(reference)
+
+    start = time.perf_counter()
+    if plan.tight_layout:
+        labels.tight_layout(fig)
+    times['tight_layout'] = time.perf_counter() - start
+
+    buf = io.BytesIO()
+    if fmt == 'png':
+        start = time.perf_counter()
+        fig.canvas.draw()
+        times['rasterize'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        Image.fromarray(np.asarray(fig.canvas.buffer_rgba())).save(buf, format='png')
+        times['encode'] = time.perf_counter() - start
+    else:
+        start = time.perf_counter()
+        fig.savefig(buf, format=fmt, dpi=dpi)
+        times['encode'] = time.perf_counter() - start
+
+    buf = io.BytesIO()
+    start = time.perf_counter()
+    fig.savefig(buf, format=fmt, dpi=dpi, bbox_inches='tight')
+    times['savefig_tight'] = time.perf_counter() - start
+    times['bytes'] = buf.tell()
+    plt.close(fig)
+    return times
+
+
+def run(names, samples, dpis, formats, repeat):
+    results = []
+    for name in names:
+        raw = parse_spec((SPEC_DIR / FIGURES[name]['spec']).read_text(encoding='utf-8'))
+        for n in samples:
+            plan = RenderPlan(with_samples(raw, n), name=name)
+            run_once(plan, 'png', 72)  # 预热: 字体缓存、首次导入
+            for dpi in dpis:
+                for fmt in formats:
+                    runs = [run_once(plan, fmt, dpi) for _ in range(repeat)]
+                    stages = {stage: {'median': statistics.median(r[stage] for r in runs),
+                                      'min': min(r[stage] for r in runs)}
+                              for stage in STAGES if stage in runs[0]}
+                    results.append({'figure': name, 'samples': n, 'dpi': dpi, 'format': fmt,
+                                    'bytes': runs[-1]['bytes'], 'stages': stages})
+                    total = sum(s['median'] for k, s in stages.items() if k not in _REFERENCE)
+                    print(f'{name:16s} n={n or "自适应":<5} {dpi:4d}dpi {fmt:4s} '
+                          + '  '.join(f'{k} {v["median"]*1000:7.1f}' for k, v in stages.items())
+                          + f'  (ms, 分阶段合计 {total*1000:.0f})')
+    return results
+
+
+def _metadata():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'matplotlib': matplotlib.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+    }
+
+
+def compare(old, new, threshold):
+    '''按 (图形, 采样数, dpi, 格式, 阶段) 对齐, 返回变慢超过 threshold 的条目'''
+    key = lambda r: (r['figure'], r['samples'], r['dpi'], r['format'])
+    baseline = {key(r): r for r in old['results']}
+    regressions = []
+    for r in new['results']:
+        if key(r) not in baseline:
+            continue
+        for stage, t in r['stages'].items():
+            before = baseline[key(r)]['stages'].get(stage)
+            if before and before['median'] > 0 and t['median'] > before['median'] * (1 + threshold):
+                regressions.append((*key(r), stage, before['median'], t['median']))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='各章图形的分阶段耗时')
+    parser.add_argument('figures', nargs='*', default=sorted(FIGURES))
+    parser.add_argument('--samples', nargs='+', default=[None],
+                        type=lambda v: None if v == 'adaptive' else int(v),
+                        help='曲线采样点数, adaptive 为自适应采样')
+    parser.add_argument('--dpi', type=int, nargs='+', default=[100, 300])
+    parser.add_argument('--formats', nargs='+', default=['png', 'svg', 'pdf'])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--out', default=None, help='结果 JSON 路径')
+    parser.add_argument('--compare', default=None, metavar='JSON', help='与旧结果比较')
+    parser.add_argument('--threshold', type=float, default=0.2, help='判定变慢的相对阈值')
+    args = parser.parse_args()
+
+    report = {'meta': _metadata(),
+              'results': run(args.figures, args.samples, args.dpi, args.formats, args.repeat)}
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8')
+        print(f'结果已写入 {args.out}')
+    if args.compare:
+        old = json.loads(Path(args.compare).read_text(encoding='utf-8'))
+        regressions = compare(old, report, args.threshold)
+        print(f'与 {args.compare} (commit {old["meta"].get("commit")}) 相比: '
+              f'{len(regressions)} 项变慢超过 {args.threshold:.0%}')
+        for figure, n, dpi, fmt, stage, before, after in regressions:
+            print(f'  {figure} n={n} {dpi}dpi {fmt} {stage}: {before*1000:.1f} -> {after*1000:.1f}ms')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
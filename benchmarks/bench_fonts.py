@@ -0,0 +1,143 @@
+'''
+字体设置的启动耗时、警告数和输出大小
+启动耗时在子进程里测 (各自的 MPLCONFIGDIR 和字体缓存文件), 情况:
+  legacy   原来的 font.sans-serif = ['SimHei', 'Arial Unicode MS', 'DejaVu Sans']
+  cold     matplotlib 字体列表和中文字体解析都没有缓存 (全新机器的第一次运行)
+  resolve  matplotlib 字体列表已缓存, 中文字体未解析
+  warm     两者都已缓存 (之后的每次运行)
+每个子进程: 导入 pyplot + 设置字体, 再画一张 Ch7 图并渲染成 PNG, 统计字体相关的警告和日志
+输出大小: 各图在 PDF (type3 / type42 嵌入) 和 SVG (字形转路径 / 保留文字) 下的字节数
+用法:
+    python benchmarks/bench_fonts.py --repeat 5
+'''
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+CHILD = r'''
+import json, logging, sys, time, warnings
+sys.path.insert(0, sys.argv[1])
+legacy = sys.argv[2] == 'legacy'
+records = []
+handler = logging.Handler()
+handler.emit = records.append
+logging.getLogger('matplotlib.font_manager').addHandler(handler)
+with warnings.catch_warnings(record=True) as caught:
+    warnings.simplefilter('always')
+    start = time.perf_counter()
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import econ1210.figures.four_case as four_case
+    if legacy:
+        def configure_fonts():
+            plt.rcParams['font.sans-serif'] = ['SimHei', 'Arial Unicode MS', 'DejaVu Sans']
+            plt.rcParams['axes.unicode_minus'] = False
+        four_case.configure_fonts = configure_fonts
+    else:
+        from econ1210.fonts import configure_fonts
+        configure_fonts()
+    setup = time.perf_counter() - start
+    start = time.perf_counter()
+    from econ1210.export import to_bytes
+    fig = four_case.four_case_figure()
+    to_bytes(fig, 'png', dpi=100)
+    render = time.perf_counter() - start
+print(json.dumps({'setup': setup, 'render': render,
+                  'warnings': len(caught) + len(records)}))
+'''
+
+
+def _child(mode, mpl_dir, font_cache):
+    env = {**os.environ, 'MPLCONFIGDIR': str(mpl_dir), 'ECON1210_FONT_CACHE': str(font_cache)}
+    out = subprocess.run([sys.executable, '-c', CHILD, str(ROOT), mode], env=env,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.splitlines()[-1])
+
+
+def startup(repeat):
+    '''各情况的 (设置耗时, 渲染耗时, 警告数) 中位数'''
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        warm_mpl, font_cache = tmp / 'mpl', tmp / 'fonts.json'
+        _child('warm', warm_mpl, font_cache)  # 建好 matplotlib 字体列表和中文字体缓存
+        for mode in ('legacy', 'cold', 'resolve', 'warm'):
+            runs = []
+            for i in range(repeat):
+                if mode == 'cold':
+                    mpl_dir, cache = tmp / f'cold{i}', tmp / f'cold{i}.json'
+                elif mode == 'resolve':
+                    mpl_dir, cache = warm_mpl, tmp / f'resolve{i}.json'
+                else:
+                    mpl_dir, cache = warm_mpl, font_cache
+                runs.append(_child(mode, mpl_dir, cache))
+                if mode == 'cold':
+                    shutil.rmtree(mpl_dir, ignore_errors=True)
+            results[mode] = {k: statistics.median(r[k] for r in runs) for k in runs[0]}
+    return results
+
+
+def output_sizes():
+    '''各图在不同字体嵌入方式下的字节数'''
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from econ1210.export import to_bytes
+    from econ1210.figures import FIGURES, get_figure
+    from econ1210.fonts import configure_fonts
+
+    variants = {
+        'pdf type3': ('pdf', {'pdf.fonttype': 3}),
+        'pdf type42': ('pdf', {'pdf.fonttype': 42}),
+        'svg 路径': ('svg', {'svg.fonttype': 'path'}),
+        'svg 文字': ('svg', {'svg.fonttype': 'none'}),
+    }
+    configure_fonts()
+    sizes = {}
+    for name in sorted(FIGURES):
+        sizes[name] = {}
+        for label, (fmt, rc) in variants.items():
+            with plt.rc_context(rc):
+                fig = get_figure(name)()
+                data = to_bytes(fig, fmt)
+                plt.close(fig)
+            sizes[name][label] = len(data)
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='字体设置的启动耗时、警告数和输出大小')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--out', default=None, help='结果 JSON 路径')
+    args = parser.parse_args()
+
+    from econ1210.fonts import resolve_cjk_font
+    print(f"中文字体: {resolve_cjk_font()['family'] or '未找到'}")
+    timings = startup(args.repeat)
+    print(f'{"情况":10s} {"设置(ms)":>9s} {"渲染(ms)":>9s} {"警告":>6s}')
+    for mode, r in timings.items():
+        print(f'{mode:10s} {r["setup"]*1000:9.1f} {r["render"]*1000:9.1f} {r["warnings"]:6.0f}')
+
+    sizes = output_sizes()
+    labels = list(next(iter(sizes.values())))
+    print(f'\n{"图形":18s}' + ''.join(f'{label:>12s}' for label in labels) + '  (KB)')
+    for name, row in sizes.items():
+        print(f'{name:18s}' + ''.join(f'{row[label]/1024:12.1f}' for label in labels))
+
+    if args.out:
+        Path(args.out).write_text(json.dumps({'startup': timings, 'sizes': sizes}, indent=2,
+                                             ensure_ascii=False), encoding='utf-8')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+'''
+Chapter 11 补贴图的帧时间对比 (Agg 画布, 不开窗口):
+  重建: 每帧重新调用 monopoly_figure() 并完整绘制
+  全量重绘: 保留 MonopolyView, update() 后 canvas.draw()
+  blitting: 保留 MonopolyView, update() 后由 Blitter 恢复背景只画动态 artist (对比不缓存文字行位图)
+  滑块: 与 monopoly_slider 相同的接法逐帧 set_val; drawon=True 时每次还会整张重绘
+用法: python benchmarks/bench_frames.py [--frames 60]
+'''
+import argparse
+import contextlib
+import sys
+import time
+from pathlib import Path
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from econ1210.figures.monopoly import MonopolyView, monopoly_figure
+from econ1210.interactive import Blitter, slider_artists
+
+
+def bench_rebuild(subsidies):
+    times = []
+    for s in subsidies:
+        start = time.perf_counter()
+        fig = monopoly_figure(subsidy=s)
+        fig.canvas.draw()
+        times.append(time.perf_counter() - start)
+        plt.close(fig)
+    return times
+
+
+def bench_update(subsidies):
+    view = MonopolyView(subsidy=subsidies[0])
+    view.fig.canvas.draw()
+    times = []
+    for s in subsidies:
+        start = time.perf_counter()
+        view.update(s)
+        view.fig.canvas.draw()
+        times.append(time.perf_counter() - start)
+    plt.close(view.fig)
+    return times
+
+
+def bench_blit(subsidies, cache_lines=True):
+    view = MonopolyView(subsidy=subsidies[0], animated=True)
+    blitter = Blitter(view.fig.canvas, view.dynamic_artists)
+    if not cache_lines:
+        blitter.lines.installed = lambda renderer: contextlib.nullcontext()
+    view.fig.canvas.draw()
+    times = []
+    for s in subsidies:
+        start = time.perf_counter()
+        view.update(s)
+        blitter.refresh()
+        times.append(time.perf_counter() - start)
+    plt.close(view.fig)
+    return times
+
+
+def bench_slider(subsidies, drawon=False):
+    '''与 monopoly_slider 相同的接法, 用 set_val 模拟拖动滑块'''
+    from matplotlib.widgets import Slider
+
+    view = MonopolyView(subsidy=subsidies[0], animated=True)
+    view.fig.subplots_adjust(bottom=0.14)
+    slider = Slider(view.fig.add_axes([0.15, 0.03, 0.7, 0.03]), '补贴', 0.0, 80.0, valinit=subsidies[0])
+    slider.drawon = drawon
+    moving = slider_artists(slider)
+    for artist in moving:
+        artist.set_animated(True)
+    blitter = Blitter(view.fig.canvas, view.dynamic_artists + moving)
+
+    def on_change(value):
+        view.update(value)
+        blitter.refresh()
+
+    slider.on_changed(on_change)
+    view.fig.canvas.draw()
+    times = []
+    for s in subsidies:
+        start = time.perf_counter()
+        slider.set_val(s)
+        times.append(time.perf_counter() - start)
+    plt.close(view.fig)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=60)
+    args = parser.parse_args()
+
+    subsidies = np.linspace(0, 80, args.frames)
+    for label, bench in (('重建图形', bench_rebuild), ('update + 全量重绘', bench_update),
+                         ('blitting (不缓存行)', lambda s: bench_blit(s, cache_lines=False)),
+                         ('blitting', bench_blit),
+                         ('滑块 drawon=True', lambda s: bench_slider(s, drawon=True)),
+                         ('滑块 drawon=False', bench_slider)):
+        times = np.array(bench(subsidies)[1:])  # 去掉第一帧 (字体缓存等预热)
+        print(f'{label:20s} 中位帧时间 {np.median(times)*1000:7.1f}ms  '
+              f'p95 {np.percentile(times, 95)*1000:7.1f}ms  约 {1/np.median(times):6.1f} fps')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+'''
+启动开销对比: 纯计算路径 vs 绘图路径
+用 python -X importtime 在独立子进程里分别导入, 汇总累计导入时间
+用法: python benchmarks/bench_import.py [--repeat 5]
+'''
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+CASES = {
+    '纯计算 (econ1210.discrimination)':
+        'import econ1210.discrimination as d; d.two_market_model()',
+    '绘图 (econ1210.figures.two_market)':
+        'import econ1210.figures.two_market',
+    '绘图 + 渲染 (300 dpi)':
+        'import matplotlib; matplotlib.use("Agg"); import io;'
+        'from econ1210.figures.two_market import two_market_figure;'
+        'two_market_figure().savefig(io.BytesIO(), dpi=300, bbox_inches="tight")',
+}
+
+# -X importtime 的输出行: "import time:  self [us] | cumulative | imported package"
+_LINE = re.compile(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def import_profile(code):
+    '''返回 (顶层模块累计导入时间 us, 子进程总时间 s, 导入的模块数)'''
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          cwd=ROOT, capture_output=True, text=True, check=True)
+    elapsed = time.perf_counter() - start
+    total_us = 0
+    n_modules = 0
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        n_modules += 1
+        # 缩进为 1 个空格的是顶层导入, 其累计时间互不重叠
+        if len(match.group(3)) == 1:
+            total_us += int(match.group(2))
+    return total_us, elapsed, n_modules
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    for label, code in CASES.items():
+        runs = [import_profile(code) for _ in range(args.repeat)]
+        imp = statistics.median(r[0] for r in runs) / 1000
+        wall = statistics.median(r[1] for r in runs) * 1000
+        print(f'{label:36s} 导入 {imp:8.1f}ms  进程总计 {wall:8.1f}ms  模块数 {runs[0][2]}')
+
+
+if __name__ == '__main__':
+    main()
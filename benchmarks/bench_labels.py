@@ -0,0 +1,89 @@
+'''
+文字层 (econ1210.labels) 的效果: 渲染多个参数变体, 分别记录构建 (含 tight_layout) 和 PNG 编码的耗时,
+四种方式轮流各跑一轮、重复 --rounds 轮后取中位数 (减少机器负载波动的影响)
+  off       matplotlib 原来的按渲染器缓存 + 普通 fig.tight_layout
+  cache     跨图的文字尺寸缓存
+  layout    坐标轴内的文字不参与 tight_layout 的测量
+  both      两者都开 (图形函数的默认做法)
+并核对四种方式输出的像素完全相同, 以及每张图有几个文字被排除在 tight_layout 之外
+用法:
+    python benchmarks/bench_labels.py --variants 5 --rounds 4
+'''
+import argparse
+import math
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+from econ1210 import labels
+from econ1210.export import to_array, to_bytes
+from econ1210.figures import FIGURES, get_figure
+
+MODES = {'off': (False, False), 'cache': (True, False), 'layout': (False, True), 'both': (True, True)}
+
+
+def run(name, values, cache, layout, images=None):
+    '''返回每个变体的 (构建, 编码) 耗时; images 不为 None 时收集像素用于核对'''
+    labels.set_text_cache(cache)
+    labels.PAD_POINTS = 4.0 if layout else math.inf
+    key = FIGURES[name]['sweep'][0]
+    build = get_figure(name)
+    times = []
+    for value in values:
+        start = time.perf_counter()
+        fig = build(**{key: float(value)})
+        built = time.perf_counter()
+        to_bytes(fig, 'png')
+        times.append((built - start, time.perf_counter() - built))
+        if images is not None:
+            images.append(to_array(fig, 72, copy=True))
+        plt.close(fig)
+    return times
+
+
+def excluded(name):
+    labels.PAD_POINTS = 4.0
+    fig = get_figure(name)()
+    count = labels.tight_layout(fig)
+    total = sum(len(ax.texts) for ax in fig.axes)
+    plt.close(fig)
+    return count, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description='文字尺寸缓存与 tight_layout 排除的效果')
+    parser.add_argument('figures', nargs='*', default=sorted(FIGURES))
+    parser.add_argument('--variants', type=int, default=5)
+    parser.add_argument('--rounds', type=int, default=4)
+    args = parser.parse_args()
+
+    for name in args.figures:
+        _, lo, hi = FIGURES[name]['sweep']
+        run(name, [lo], True, True)  # 预热: 导入、字体解析
+        times = {mode: [] for mode in MODES}
+        images = {mode: [] for mode in MODES}
+        for i in range(args.rounds):
+            values = np.linspace(lo, hi, args.variants) + i * 0.01 * (hi - lo)  # 每轮换一组参数, 避免命中同一字符串
+            for mode, flags in MODES.items():
+                times[mode] += run(name, values, *flags, images=images[mode] if i == 0 else None)
+        same = all(np.array_equal(a, b) for mode in MODES for a, b in zip(images['off'], images[mode]))
+        total = {mode: statistics.median(b + e for b, e in rows) for mode, rows in times.items()}
+        count, texts = excluded(name)
+        print(f'{name}  排除 {count}/{texts} 个文字  像素一致={same}')
+        for mode, rows in times.items():
+            print(f'  {mode:7s} 构建 {statistics.median(b for b, _ in rows)*1000:6.1f}ms  '
+                  f'编码 {statistics.median(e for _, e in rows)*1000:6.1f}ms  '
+                  f'合计 {total[mode]*1000:6.1f}ms ({total["off"] / total[mode]:4.2f}x)')
+    print('文字尺寸缓存:', labels.text_cache_info())
+
+
+if __name__ == '__main__':
+    main()
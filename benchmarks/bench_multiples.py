@@ -0,0 +1,80 @@
+'''
+多情景小图阵列的开销: 单个小图 vs 10x10 网格 (共用坐标轴 + 集合),
+以及朴素做法 (plt.subplots(10, 10), 每个小图单独 plot/fill) 作对照
+用法: python benchmarks/bench_multiples.py [--n 100] [--repeat 3]
+'''
+import argparse
+import math
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from econ1210.figures.multiples import monopoly_multiples
+from econ1210.monopoly import solve_monopoly_subsidy
+
+
+def naive_grid(subsidies, a=146.0, b=0.5, mc=4.0):
+    '''每个情景一个 Axes, 每条线/每块区域一个 artist'''
+    n = len(subsidies)
+    ncols = math.ceil(math.sqrt(n))
+    nrows = math.ceil(n / ncols)
+    fig, axes = plt.subplots(nrows, ncols, figsize=(2.2 * ncols + 1, 1.65 * nrows + 1.6),
+                             sharex=True, sharey=True, squeeze=False)
+    x = np.array([0.0, 300.0])
+    eq = solve_monopoly_subsidy(a, b, mc, subsidies)
+    for i, (ax, s) in enumerate(zip(axes.flat, subsidies)):
+        ax.plot(x, a - b * x, 'b-')
+        ax.plot(x, a - 2 * b * x, 'b--')
+        ax.plot(x, [mc, mc], 'g-')
+        ax.plot(x, a + s - b * x, 'r-')
+        ax.plot(x, a + s - 2 * b * x, 'r--')
+        q_s, q_c = eq['q_subsidy'][i], eq['q_competitive'][i]
+        ax.fill([q_s, q_c, q_c, q_s], [mc, mc, a - b * q_c, a - b * q_s], color='red', alpha=0.3)
+        ax.plot([q_s, q_s], [eq['p_consumer'][i], eq['p_producer'][i]], 'ro', markersize=3)
+        ax.set_title(f's={s:.3g}', fontsize=8)
+        ax.set_xlim(0, 300)
+        ax.set_ylim(0, 180)
+    fig.tight_layout()
+    return fig
+
+
+def timed(build, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fig = build()
+        fig.canvas.draw()
+        times.append(time.perf_counter() - start)
+        n_artists = len(fig.axes) + sum(len(ax.get_children()) for ax in fig.axes)
+        plt.close(fig)
+    return statistics.median(times), n_artists
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--n', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    subsidies = np.linspace(0, 80, args.n)
+    timed(lambda: monopoly_multiples(subsidies[:1]), 1)  # 预热
+    one, _ = timed(lambda: monopoly_multiples(subsidies[:1]), args.repeat)
+    cases = [
+        ('单个小图', lambda: monopoly_multiples(subsidies[:1])),
+        (f'{args.n} 个小图 (共用坐标轴 + 集合)', lambda: monopoly_multiples(subsidies)),
+        (f'{args.n} 个小图 (朴素 subplots)', lambda: naive_grid(subsidies)),
+    ]
+    for label, build in cases:
+        elapsed, n_artists = timed(build, args.repeat)
+        print(f'{label:28s} 构建+绘制 {elapsed*1000:7.1f}ms  ({elapsed/one:5.1f} 倍单图)  artist 数 {n_artists}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+'''
+分阶段计时 (econ1210.profiling) 的开销
+  noop     未开启时 stage() / step() / track() 每次调用的耗时 (纳秒)
+  figures  每张图在关闭 / 只计时 / 计时 + cProfile / 计时 + tracemalloc 下的构建时间 (中位数, 不含编码)
+关闭时每张图只调用十来次埋点, 开销按 noop 的单次耗时估算
+用法:
+    python benchmarks/bench_profiling.py --repeat 5
+'''
+import argparse
+import statistics
+import sys
+import time
+import timeit
+from pathlib import Path
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+from econ1210 import profiling
+from econ1210.figures import FIGURES, get_figure
+
+
+def noop_cost(number=1_000_000):
+    assert profiling.current() is None
+    costs = {}
+    for label, stmt in (('stage', 'with stage("x"): pass'), ('step', 'step("x")'), ('track', 'track(None)')):
+        seconds = min(timeit.repeat(stmt, globals=vars(profiling), number=number, repeat=3))
+        costs[label] = seconds / number * 1e9
+    return costs
+
+
+def build_time(build, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fig = build()
+        times.append(time.perf_counter() - start)
+        plt.close(fig)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='埋点开销')
+    parser.add_argument('figures', nargs='*', default=sorted(FIGURES))
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    costs = noop_cost()
+    print('未开启时单次调用: ' + ', '.join(f'{name} {ns:.0f}ns' for name, ns in costs.items()))
+    modes = {'off': None, 'time': {}, 'cprofile': {'cprofile': True}, 'tracemalloc': {'tracemalloc': True}}
+    for name in args.figures:
+        build = get_figure(name)
+        plt.close(build())  # 预热: 导入、字体解析
+        row = {}
+        for mode, options in modes.items():
+            if options is None:
+                row[mode] = build_time(build, args.repeat)
+            else:
+                with profiling.profile(**options) as prof:
+                    row[mode] = build_time(build, args.repeat)
+                calls = sum(event['depth'] <= 1 for event in prof.events) // args.repeat + 1
+        off = row['off']
+        print(f'{name:16s} ' + '  '.join(f'{mode} {t*1000:7.1f}ms ({t/off:4.2f}x)' for mode, t in row.items())
+              + f'  关闭时埋点约 {calls} 次 ≈ {calls * costs["stage"] / 1e3:.1f}µs ({calls * costs["stage"] / 1e9 / off:.1e})')
+
+
+if __name__ == '__main__':
+    main()
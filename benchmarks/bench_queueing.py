@@ -0,0 +1,76 @@
+'''
+排队个体模拟 (econ1210.queueing) 的规模与并行
+  单次模拟: 不同人数下的耗时, 以及找排队门槛时 argpartition 与整体 argsort 的对比
+  扫描: 一组价格上限在 workers=1 与多进程下的耗时, 结果逐项相同 (每个上限的随机数流固定)
+用法:
+    python benchmarks/bench_queueing.py --agents 1e5 1e6 1e7 --ceilings 16 --workers 1 4
+'''
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from econ1210.queueing import simulate_queue, sweep_queue
+
+
+def _time(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def threshold_methods(n, k, seed=0):
+    rng = np.random.default_rng(seed)
+    patience = rng.random(n) / rng.lognormal(0.0, 0.5, n)
+
+    def partition():
+        order = np.argpartition(patience, n - k - 1)
+        return patience[order[n - k - 1]], order[n - k:]
+
+    def full_sort():
+        order = np.argsort(patience)
+        return patience[order[n - k - 1]], order[n - k:]
+
+    return {'argpartition': partition, 'argsort': full_sort}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='排队个体模拟的规模与并行')
+    parser.add_argument('--agents', type=float, nargs='+', default=[1e5, 1e6, 1e7])
+    parser.add_argument('--ceilings', type=int, default=16, help='扫描的价格上限个数')
+    parser.add_argument('--sweep-agents', type=float, default=1e6)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print('单次模拟 (P=25, 40% 的人买到)')
+    for n in map(int, args.agents):
+        total = _time(lambda: simulate_queue(25.0, n_agents=n, seed=0), args.repeat)
+        threshold = {name: _time(func, args.repeat)
+                     for name, func in threshold_methods(n, int(n * 0.4)).items()}
+        print(f'  {n:>11,} 人  {total * 1000:8.1f}ms ({n / total / 1e6:5.1f} M 人/秒)  门槛: ' +
+              '  '.join(f'{name} {t * 1000:7.1f}ms' for name, t in threshold.items()))
+
+    prices = np.linspace(12.0, 38.0, args.ceilings)
+    n = int(args.sweep_agents)
+    print(f'扫描 {prices.size} 个上限 x {n:,} 人')
+    reference = None
+    for workers in args.workers:
+        start = time.perf_counter()
+        result = sweep_queue(prices, n_agents=n, seed=0, workers=workers)
+        elapsed = time.perf_counter() - start
+        same = reference is None or all(np.array_equal(result[k], reference[k]) for k in result)
+        reference = reference or result
+        print(f'  workers={workers:<3d} {elapsed:7.2f}s  结果与 workers={args.workers[0]} 相同: {same}')
+    print('  每单位浪费: ' + ' '.join(f'{w:.1f}' for w in reference['waste_per_unit']))
+
+
+if __name__ == '__main__':
+    main()
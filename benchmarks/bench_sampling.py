@@ -0,0 +1,71 @@
+'''
+固定密集网格 vs 自适应采样: 顶点数、SVG/PDF 文件大小和渲染时间
+密集网格按原脚本的取值 (Chapter 7/11 每条曲线 500 点, Chapter 12 每个市场 200 点)
+用法: python benchmarks/bench_sampling.py [--repeat 3]
+'''
+import argparse
+import io
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from econ1210.figures import FIGURES
+from econ1210.spec import SPEC_DIR, RenderPlan, parse_spec, with_samples
+
+DENSE = {'ch07_four_case': 500, 'ch11_monopoly': 500, 'ch12_two_market': 200}
+
+
+def count_vertices(fig):
+    '''所有坐标轴上线条和填充/多边形路径的顶点总数'''
+    total = 0
+    for ax in fig.axes:
+        total += sum(len(line.get_xydata()) for line in ax.lines)
+        total += sum(len(path.vertices) for c in ax.collections for path in c.get_paths())
+        total += sum(len(p.get_path().vertices) for p in ax.patches)
+    return total
+
+
+def measure(plan, repeat):
+    fig = plan.render()
+    vertices = count_vertices(fig)
+    sizes = {}
+    for fmt in ('svg', 'pdf'):
+        buf = io.BytesIO()
+        fig.savefig(buf, format=fmt)
+        sizes[fmt] = buf.tell()
+    plt.close(fig)
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fig = plan.render()
+        fig.savefig(io.BytesIO(), format='svg')
+        times.append(time.perf_counter() - start)
+        plt.close(fig)
+    return vertices, sizes, statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    for name, entry in FIGURES.items():
+        raw = parse_spec((SPEC_DIR / entry['spec']).read_text(encoding='utf-8'))
+        measure(RenderPlan(raw, name=name), 1)  # 预热
+        dense = measure(RenderPlan(with_samples(raw, DENSE[name]), name=name), args.repeat)
+        adaptive = measure(RenderPlan(with_samples(raw, None), name=name), args.repeat)
+        print(name)
+        for label, (vertices, sizes, elapsed) in (('密集网格', dense), ('自适应', adaptive)):
+            print(f'  {label:6s} 顶点 {vertices:6d}  SVG {sizes["svg"]/1024:7.1f}KB  '
+                  f'PDF {sizes["pdf"]/1024:6.1f}KB  渲染+SVG {elapsed*1000:6.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+'''
+渲染服务的压测: 并发长连接向 localhost 发请求, 报告 p50/p90/p99 延迟和吞吐量
+参数取自各图扫描参数上的 --distinct 个取值, 取值越少缓存命中越多
+--spawn 时自动启动一个使用临时缓存目录的服务, 测完关闭
+--baseline N 额外测量 "每个请求启动一次 Python 渲染" 的耗时作对照
+用法:
+    python benchmarks/load_test.py --spawn --workers 4 --requests 2000 --concurrency 32 --distinct 50
+    python benchmarks/load_test.py --url http://127.0.0.1:8050 --figures ch11_monopoly --baseline 5
+'''
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+from econ1210.figures import FIGURES
+
+
+async def _request(reader, writer, host, path):
+    writer.write(f'GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n'.encode())
+    await writer.drain()
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split(' ')[1])
+    headers = {k.strip().lower(): v.strip() for k, _, v in (line.partition(':') for line in lines[1:] if line)}
+    body = await reader.readexactly(int(headers.get('content-length', 0)))
+    if headers.get('connection', '').lower() == 'close':
+        raise ConnectionResetError
+    return status, headers.get('x-cache', '-'), len(body)
+
+
+async def _client(host, port, paths, latencies, statuses):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for path in paths:
+            start = time.perf_counter()
+            try:
+                status, source, _ = await _request(reader, writer, host, path)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                reader, writer = await asyncio.open_connection(host, port)
+                status, source = 'reset', '-'
+            latencies.append(time.perf_counter() - start)
+            statuses[(status, source)] += 1
+    finally:
+        writer.close()
+
+
+def make_paths(figures, n, distinct, fmt, dpi, seed=0):
+    '''在每张图的扫描区间内取 distinct 个取值, 随机生成 n 个请求路径'''
+    rng = random.Random(seed)
+    choices = []
+    for name in figures:
+        key, low, high = FIGURES[name]['sweep']
+        for value in np.linspace(low, high, distinct):
+            choices.append(f'/render/{name}?{key}={value:.4f}&format={fmt}&dpi={dpi}')
+    return [rng.choice(choices) for _ in range(n)]
+
+
+async def load(url, paths, concurrency):
+    parts = urlsplit(url)
+    latencies, statuses = [], Counter()
+    chunks = [paths[i::concurrency] for i in range(concurrency)]
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(parts.hostname, parts.port, chunk, latencies, statuses)
+                           for chunk in chunks if chunk))
+    return latencies, statuses, time.perf_counter() - start
+
+
+def report(latencies, statuses, wall):
+    ms = np.array(latencies) * 1000
+    p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+    print(f'{len(ms)} 个请求, 墙钟 {wall:.2f}s, 吞吐量 {len(ms) / wall:.0f} 请求/秒')
+    print(f'延迟 (ms): p50 {p50:.1f}  p90 {p90:.1f}  p99 {p99:.1f}  最大 {ms.max():.1f}')
+    for (status, source), count in sorted(statuses.items(), key=str):
+        print(f'  {status} {source:6s} {count}')
+
+
+def baseline(name, n):
+    '''每次启动新的 Python 进程渲染一张图 (原来的做法), 返回各次耗时秒'''
+    code = (f'import sys; sys.path.insert(0, {str(ROOT)!r}); import matplotlib; matplotlib.use("Agg"); '
+            f'from econ1210.cache import render_bytes; render_bytes({name!r}, {{}}, "png", 100)')
+    times = []
+    for _ in range(n):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-W', 'ignore', '-c', code], check=True, capture_output=True)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def _wait_ready(url, process, timeout=120):
+    import urllib.request
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('渲染服务启动失败')
+        try:
+            with urllib.request.urlopen(f'{url}/stats', timeout=1) as r:
+                return json.load(r)
+        except OSError:
+            time.sleep(0.2)
+    raise TimeoutError('等待渲染服务启动超时')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='渲染服务压测')
+    parser.add_argument('--url', default='http://127.0.0.1:8050')
+    parser.add_argument('--figures', nargs='+', default=sorted(FIGURES))
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--distinct', type=int, default=50, help='每张图的不同参数取值数')
+    parser.add_argument('--format', default='png')
+    parser.add_argument('--dpi', type=int, default=100)
+    parser.add_argument('--spawn', action='store_true', help='启动临时服务 (临时缓存目录)')
+    parser.add_argument('--workers', type=int, default=None, help='--spawn 时的渲染进程数')
+    parser.add_argument('--baseline', type=int, default=0, metavar='N',
+                        help='另测 N 次每请求启动 Python 的耗时')
+    args = parser.parse_args()
+
+    process = tmp = None
+    if args.spawn:
+        tmp = tempfile.TemporaryDirectory()
+        port = urlsplit(args.url).port
+        cmd = [sys.executable, '-W', 'ignore', '-m', 'econ1210.server', '--port', str(port),
+               '--cache', tmp.name]
+        if args.workers:
+            cmd += ['--workers', str(args.workers)]
+        start = time.perf_counter()
+        process = subprocess.Popen(cmd, cwd=ROOT, stdout=subprocess.DEVNULL)
+        _wait_ready(args.url, process)
+        print(f'服务启动并预热用时 {time.perf_counter() - start:.1f}s')
+    try:
+        paths = make_paths(args.figures, args.requests, args.distinct, args.format, args.dpi)
+        report(*asyncio.run(load(args.url, paths, args.concurrency)))
+        import urllib.request
+        with urllib.request.urlopen(f'{args.url}/stats') as r:
+            stats = json.load(r)
+        print(f"服务端: 渲染 {stats['rendered']}, 缓存命中 {stats['hits']}, 合并 {stats['shared']}, "
+              f"拒绝 {stats['rejected']}, 超时 {stats['timeouts']}")
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+            tmp.cleanup()
+
+    if args.baseline:
+        times = baseline(args.figures[0], args.baseline)
+        print(f'对照 (每请求启动 Python 渲染 {args.figures[0]}): 中位数 {statistics.median(times)*1000:.0f}ms')
+
+
+if __name__ == '__main__':
+    main()
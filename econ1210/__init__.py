@@ -0,0 +1,4 @@
+'''
+ECON1210 图形的公共模型与工具
+各章节脚本 (Chapter 7 / 11 / 12) 从这里导入计算函数
+'''
@@ -0,0 +1,146 @@
+'''
+按模型参数做内容寻址的图形缓存
+键 = sha256(图形名 + 模型参数 + 样式设置 + 输出格式/dpi + 中文字体 + 代码版本),
+值 = 渲染好的 PNG/SVG/PDF 字节, 存放在本地目录, 按总大小做 LRU 淘汰
+(最近使用时间记录在文件 mtime 上, 命中时刷新)
+'''
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from econ1210.fonts import font_key
+from econ1210.labels import language
+
+_PACKAGE_DIR = Path(__file__).resolve().parent
+_code_version = None
+
+
+def code_version():
+    '''econ1210 包内全部源码的哈希, 代码一改旧缓存自动失效'''
+    global _code_version
+    if _code_version is None:
+        h = hashlib.sha256()
+        for path in sorted(_PACKAGE_DIR.rglob('*.py')):
+            h.update(str(path.relative_to(_PACKAGE_DIR)).encode())
+            h.update(path.read_bytes())
+        _code_version = h.hexdigest()[:16]
+    return _code_version
+
+
+def cache_key(name, params, fmt='png', dpi=100, style=None):
+    '''图形 + 参数 + 样式 + 中文字体 + 图中文字语言 + 代码版本 的内容哈希'''
+    payload = json.dumps({
+        'figure': name,
+        'params': params,
+        'format': fmt,
+        'dpi': dpi,
+        'style': style or {},
+        'font': font_key(),
+        'lang': language(),
+        'code': code_version(),
+    }, sort_keys=True, default=float)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def render_bytes(name, params, fmt='png', dpi=100, style=None):
+    '''在内存中渲染一个图形并返回编码后的字节'''
+    import matplotlib.pyplot as plt
+    from econ1210.export import render_figure
+
+    with plt.rc_context(style or {}):
+        return render_figure(name, params, fmt, dpi)
+
+
+class FigureCache:
+    '''
+    磁盘上的 LRU 图形缓存
+    max_bytes: 目录总大小上限, 超出后按最近使用时间从旧到新删除
+    hits / misses / evictions: 计数器, 用于确定缓存大小
+    '''
+
+    def __init__(self, directory, max_bytes=512 * 1024 ** 2):
+        self.directory = Path(directory).expanduser()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._total = sum(p.stat().st_size for p in self._entries())
+
+    def _entries(self):
+        return self.directory.glob('*.bin')
+
+    def _path(self, key):
+        return self.directory / f'{key}.bin'
+
+    def get(self, key):
+        '''命中时返回字节并刷新使用时间, 否则返回 None'''
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        os.utime(path)
+        self.hits += 1
+        return data
+
+    def put(self, key, data):
+        '''原子写入 (临时文件 + rename), 然后按需淘汰'''
+        path = self._path(key)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        old_size = path.stat().st_size if path.exists() else 0
+        os.replace(tmp, path)
+        self._total += len(data) - old_size
+        if self._total > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        entries = []
+        for p in self._entries():
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        entries.sort()
+        self._total = sum(size for _, size, _ in entries)
+        for _, size, p in entries:
+            if self._total <= self.max_bytes:
+                break
+            try:
+                p.unlink()
+            except FileNotFoundError:
+                pass
+            self._total -= size
+            self.evictions += 1
+
+    def render(self, name, params, fmt='png', dpi=100, style=None):
+        '''返回缓存中的图形字节, 未命中时渲染并写入缓存'''
+        key = cache_key(name, params, fmt, dpi, style)
+        data = self.get(key)
+        if data is None:
+            data = render_bytes(name, params, fmt, dpi, style)
+            self.put(key, data)
+        return data
+
+    def clear(self):
+        for p in self._entries():
+            p.unlink()
+        self._total = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': sum(1 for _ in self._entries()),
+            'total_bytes': self._total,
+            'max_bytes': self.max_bytes,
+        }
@@ -0,0 +1,103 @@
+'''
+三级价格歧视模型 (Chapter 12): 统一定价 vs 分市场定价
+N 个线性市场 P_i = a_i - b_i*Q_i, 共同边际成本 MC = c
+不导入 matplotlib, 供只需要数值结果的调用方(如评分服务)使用
+'''
+import numpy as np
+
+from econ1210.welfare import consumer_surplus, deadweight_loss, linear_demand, producer_surplus
+
+
+def _market_welfare(a, b, c, price, q):
+    '''给定各市场价格和数量, 计算 CS / PS / DWL'''
+    demand = linear_demand(a, b)
+    return {
+        'cs': consumer_surplus(demand, price, q),
+        'ps': producer_surplus(c, price, q),
+        'dwl': deadweight_loss(demand, c, q, np.maximum((a - c) / b, 0.0)),
+    }
+
+
+def uniform_price(a, b, c):
+    '''
+    对所有市场收取同一价格时的利润最大化价格
+    总需求 Q(P) = sum_i max(a_i - P, 0) / b_i 在每个 a_i 处有折点:
+    按截距从高到低排序后, 前 k 个市场有需求的区间为 [a_(k+1), a_(k)],
+    区间内 Q = A_k - B_k*P, 利润是凹函数, 最优价为 (A_k/B_k + c)/2 截断到区间内;
+    再在 N 个区间的候选价格中取利润最大者
+    a, b: (..., N), c: 可广播到 (...,), 返回形状 (...,) 的价格
+    '''
+    a, b = np.broadcast_arrays(np.asarray(a, dtype=float), np.asarray(b, dtype=float))
+    c = np.asarray(c, dtype=float)[..., None]
+
+    order = np.argsort(-a, axis=-1)
+    a_sorted = np.take_along_axis(a, order, axis=-1)
+    b_sorted = np.take_along_axis(b, order, axis=-1)
+
+    A = np.cumsum(a_sorted / b_sorted, axis=-1)
+    B = np.cumsum(1.0 / b_sorted, axis=-1)
+
+    hi = a_sorted
+    lo = np.concatenate([a_sorted[..., 1:], np.full_like(a_sorted[..., :1], -np.inf)], axis=-1)
+    candidates = np.clip(0.5 * (A / B + c), lo, hi)
+    profit = (candidates - c) * (A - B * candidates)
+
+    best = np.argmax(profit, axis=-1)[..., None]
+    return np.take_along_axis(candidates, best, axis=-1)[..., 0]
+
+
+def solve_price_discrimination(a, b, c):
+    '''
+    同时求解统一定价和三级价格歧视 (各市场 MR_i = MC)
+    a, b: 形状 (..., N) 的需求截距和斜率(取正值), c: 可广播到 (...,) 的边际成本
+    返回字典: p_uniform 形状 (...,), 其余每个市场的量形状 (..., N)
+    '''
+    a, b = np.broadcast_arrays(np.asarray(a, dtype=float), np.asarray(b, dtype=float))
+    c_batch = np.asarray(c, dtype=float)
+    c = c_batch[..., None]
+
+    # 统一定价: 价格高于 a_i 的市场退出
+    p_uniform = uniform_price(a, b, c_batch)
+    q_uniform = np.maximum((a - p_uniform[..., None]) / b, 0.0)
+    uniform = _market_welfare(a, b, c, p_uniform[..., None], q_uniform)
+
+    # 价格歧视: MR_i = a_i - 2b_i*Q_i = c
+    q_discrim = np.maximum((a - c) / (2.0 * b), 0.0)
+    p_discrim = a - b * q_discrim
+    discrim = _market_welfare(a, b, c, p_discrim, q_discrim)
+
+    return {
+        'p_uniform': p_uniform,
+        'q_uniform': q_uniform,
+        'cs_uniform': uniform['cs'],
+        'ps_uniform': uniform['ps'],
+        'dwl_uniform': uniform['dwl'],
+        'p_discrim': p_discrim,
+        'q_discrim': q_discrim,
+        'cs_discrim': discrim['cs'],
+        'ps_discrim': discrim['ps'],
+        'dwl_discrim': discrim['dwl'],
+    }
+
+
+def two_market_model(a_asia=92.0, b_asia=2.0, a_europe=64.0, b_europe=2.0, mc=9.0):
+    '''计算亚洲/欧洲两个市场统一定价、双定价下的价格、数量和消费者剩余'''
+    r = solve_price_discrimination(np.stack(np.broadcast_arrays(a_asia, a_europe), axis=-1),
+                                   np.stack(np.broadcast_arrays(b_asia, b_europe), axis=-1),
+                                   mc)
+    return {
+        'a_asia': a_asia, 'b_asia': b_asia,
+        'a_europe': a_europe, 'b_europe': b_europe,
+        'mc': mc,
+        'P_single': r['p_uniform'],
+        'Q_asia_single': r['q_uniform'][..., 0],
+        'Q_europe_single': r['q_uniform'][..., 1],
+        'P_asia_dual': r['p_discrim'][..., 0],
+        'P_europe_dual': r['p_discrim'][..., 1],
+        'Q_asia_dual': r['q_discrim'][..., 0],
+        'Q_europe_dual': r['q_discrim'][..., 1],
+        'cs_asia_single': r['cs_uniform'][..., 0],
+        'cs_asia_dual': r['cs_discrim'][..., 0],
+        'cs_europe_single': r['cs_uniform'][..., 1],
+        'cs_europe_dual': r['cs_discrim'][..., 1],
+    }
@@ -0,0 +1,515 @@
+'''
+从成交记录估计需求曲线, 直接交给各章的求解器
+各章的需求参数都是手填的 (垄断 P = 146 - 0.5Q, 亚洲/欧洲 Q = 46 - 0.5P / Q = 32 - 0.5P);
+这里按市场对 (价格, 数量) 做 OLS:
+  linear:     Q = alpha + beta*P  ->  反需求 P = a - b*Q, a = -alpha/beta, b = -1/beta (LinearDemand)
+  loglinear:  ln Q = alpha - beta*P                                                (nonlinear.LogLinear)
+每个分块只累积各市场的充分统计量 (个数, 均值, 离差平方和与交叉积和), 内存与行数无关;
+分块之间用并行方差公式合并 (与 rationing 的合并方式相同), 所以可以在进程池里并行, 也可以把多次运行的结果再合并
+数据来源:
+  .csv      有表头; 按字节范围切分 (每块从换行处开始), 各进程只读自己的范围
+  .parquet  按 row group 切分 (需要 pyarrow)
+  .npy      以内存映射打开, 按行切分; 结构化数组 (字段名即列名) 或 (行数, 3) 的 [市场编号, 价格, 数量]
+用法:
+    python -m econ1210.estimation synth build/sales.npy --rows 20000000 --market 92 2 --market 64 2
+    python -m econ1210.estimation fit build/sales.npy --names asia europe --mc 9 --plot build/fitted.png
+'''
+import argparse
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+from pathlib import Path
+
+import numpy as np
+
+MODELS = ('linear', 'loglinear')
+COLUMNS = ('market', 'price', 'quantity')
+CHUNK_ROWS = 1 << 20
+_CSV_BLOCK = 1 << 22  # CSV 每次读入的字节数
+
+
+# ---------- 充分统计量 ----------
+
+def _chunk_stats(market, x, y):
+    '''一个分块里各市场的 {市场: [个数, x 均值, y 均值, Sxx, Sxy, Syy]}'''
+    if market is None:
+        keys, inv = np.array([0]), np.zeros(x.size, dtype=np.intp)
+    elif market.dtype.kind in 'iu' and market.size and market.min() >= 0 and market.max() < 1 << 16:
+        # 小的非负整数编号直接当下标, 省去排序
+        inv = market.astype(np.intp, copy=False)
+        keys = np.arange(inv.max() + 1)
+    elif market.dtype.kind in 'USO':
+        # 市场名通常只有几个, 查表编码比对字符串排序 (np.unique) 快得多
+        codes = {}
+        inv = np.fromiter((codes.setdefault(m, len(codes)) for m in market.tolist()), np.intp, market.size)
+        keys = np.array(list(codes), dtype=object)
+    else:
+        keys, inv = np.unique(market, return_inverse=True)
+    k = keys.size
+    n = np.bincount(inv, minlength=k).astype(float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mx = np.bincount(inv, x, minlength=k) / n
+        my = np.bincount(inv, y, minlength=k) / n
+    dx = x - mx[inv]
+    dy = y - my[inv]
+    moments = np.column_stack([n, mx, my, np.bincount(inv, dx * dx, minlength=k),
+                               np.bincount(inv, dx * dy, minlength=k), np.bincount(inv, dy * dy, minlength=k)])
+    return {_key(key): row for key, row in zip(keys.tolist(), moments) if row[0] > 0}
+
+
+def _key(key):
+    # 浮点编号 (二维 .npy 的第一列) 统一成整数, 其余原样
+    return int(key) if isinstance(key, float) and key.is_integer() else key
+
+
+def _merge_moments(s1, s2):
+    '''合并两组 [个数, x 均值, y 均值, Sxx, Sxy, Syy] (Chan 等人的并行公式)'''
+    n1, mx1, my1, sxx1, sxy1, syy1 = s1
+    n2, mx2, my2, sxx2, sxy2, syy2 = s2
+    n = n1 + n2
+    if n == 0:
+        return np.zeros(6)
+    dx, dy = mx2 - mx1, my2 - my1
+    f = n1 * n2 / n
+    return np.array([n, mx1 + dx * n2 / n, my1 + dy * n2 / n,
+                     sxx1 + sxx2 + dx * dx * f, sxy1 + sxy2 + dx * dy * f, syy1 + syy2 + dy * dy * f])
+
+
+def _merge(a, b):
+    '''合并两个分块结果 ({市场: 统计量}, 丢弃行数)'''
+    stats = dict(a[0])
+    for key, row in b[0].items():
+        stats[key] = _merge_moments(stats[key], row) if key in stats else row
+    return stats, a[1] + b[1]
+
+
+def _transform(model, market, price, quantity):
+    '''按模型得到回归的 (市场, x, y) 并去掉无效行, 返回丢弃的行数'''
+    price = np.asarray(price, dtype=float)
+    quantity = np.asarray(quantity, dtype=float)
+    if model == 'loglinear':
+        ok = np.isfinite(price) & (quantity > 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            y = np.log(quantity)
+    else:
+        ok = np.isfinite(price) & np.isfinite(quantity)
+        y = quantity
+    dropped = int(ok.size - np.count_nonzero(ok))
+    if dropped:
+        price, y = price[ok], y[ok]
+        market = None if market is None else market[ok]
+    return market, price, y, dropped
+
+
+def _accumulate(model, chunks):
+    '''对一串 (市场, 价格, 数量) 分块累积, 返回 ({市场: 统计量}, 丢弃行数)'''
+    total = ({}, 0)
+    for market, price, quantity in chunks:
+        market, x, y, dropped = _transform(model, market, price, quantity)
+        total = _merge(total, (_chunk_stats(market, x, y), dropped))
+    return total
+
+
+# ---------- 数据来源与切分 ----------
+
+def _csv_header(path, columns):
+    with open(path, encoding='utf-8') as f:
+        header = f.readline()
+        start = f.tell()
+    names = [name.strip() for name in header.strip().split(',')]
+    missing = [c for c in columns[1:] if c not in names]
+    if missing:
+        raise ValueError(f'{path} 缺少列 {missing}, 表头为 {names}')
+    usecols = [names.index(c) for c in columns if c in names]
+    return start, usecols, columns[0] in names
+
+
+def _csv_lines(path, start, end, block=_CSV_BLOCK):
+    '''逐块产出起始位置在 [start, end) 内的完整行'''
+    with open(path, 'rb') as f:
+        if start > 0:
+            # 从 start 前一个字节读到换行: 正好落在行首时只吃掉那个换行, 否则跳过不完整的一行
+            f.seek(start - 1)
+            f.readline()
+        pos = f.tell()
+        carry = b''
+        while pos < end:
+            data = f.read(min(block, end - pos))
+            if not data:
+                break
+            pos += len(data)
+            if pos >= end and not data.endswith(b'\n'):
+                data += f.readline()
+            data = carry + data
+            cut = data.rfind(b'\n') + 1
+            if pos >= end:
+                cut = len(data)
+            carry = data[cut:]
+            if cut:
+                yield data[:cut].decode('utf-8').splitlines()
+        if carry:
+            yield carry.decode('utf-8').splitlines()
+
+
+def _csv_chunks(path, start, end, usecols, has_market):
+    values = [('price', 'f8'), ('quantity', 'f8')]
+    numeric = True  # 市场列先按整数编号解析, 遇到名字再改按字符串
+    for lines in _csv_lines(path, start, end):
+        if not has_market:
+            rows = np.loadtxt(lines, delimiter=',', usecols=usecols, dtype=values, ndmin=1)
+            yield None, rows['price'], rows['quantity']
+            continue
+        if numeric:
+            try:
+                rows = np.loadtxt(lines, delimiter=',', usecols=usecols, dtype=[('market', 'i8')] + values, ndmin=1)
+            except ValueError:
+                numeric = False
+        if not numeric:
+            rows = np.loadtxt(lines, delimiter=',', usecols=usecols, dtype=[('market', 'U64')] + values, ndmin=1)
+        yield rows['market'], rows['price'], rows['quantity']
+
+
+def _npy_columns(array, columns):
+    if array.dtype.names:
+        missing = [c for c in columns[1:] if c not in array.dtype.names]
+        if missing:
+            raise ValueError(f'结构化数组缺少字段 {missing}, 现有 {array.dtype.names}')
+        return (array[columns[0]] if columns[0] in array.dtype.names else None,
+                array[columns[1]], array[columns[2]])
+    if array.ndim != 2 or array.shape[1] not in (2, 3):
+        raise ValueError('二维 .npy 的列应为 [市场编号, 价格, 数量] 或 [价格, 数量]')
+    if array.shape[1] == 2:
+        return None, array[:, 0], array[:, 1]
+    return array[:, 0], array[:, 1], array[:, 2]
+
+
+def _npy_chunks(path, start, stop, columns, chunk_rows):
+    array = np.load(path, mmap_mode='r')
+    for s in range(start, stop, chunk_rows):
+        market, price, quantity = _npy_columns(array[s:min(s + chunk_rows, stop)], columns)
+        if market is not None and market.dtype.kind == 'f':
+            market = market.astype(np.int64)
+        yield market, np.asarray(price), np.asarray(quantity)
+
+
+def _parquet():
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ImportError('读取 Parquet 需要 pyarrow: pip install pyarrow') from exc
+    return pq
+
+
+def _parquet_chunks(path, row_groups, columns, chunk_rows):
+    pq = _parquet()
+    source = pq.ParquetFile(path)
+    names = source.schema_arrow.names
+    wanted = [c for c in columns if c in names]
+    for batch in source.iter_batches(batch_size=chunk_rows, row_groups=row_groups, columns=wanted):
+        data = {name: batch.column(name).to_numpy(zero_copy_only=False) for name in wanted}
+        market = data.get(columns[0])
+        if market is not None and market.dtype == object:
+            market = market.astype(str)
+        yield market, data[columns[1]], data[columns[2]]
+
+
+def _partitions(path, columns, chunk_rows, parts):
+    '''把数据切成若干独立的任务 (可 pickle 的元组), 每个任务由 _fit_partition 处理'''
+    path = str(path)
+    suffix = Path(path).suffix.lower()
+    if suffix == '.csv':
+        start, usecols, has_market = _csv_header(path, columns)
+        size = os.path.getsize(path)
+        step = max(1, math.ceil((size - start) / parts))
+        return [('csv', path, s, min(s + step, size), usecols, has_market) for s in range(start, size, step)]
+    if suffix == '.npy':
+        rows = np.load(path, mmap_mode='r').shape[0]
+        step = max(chunk_rows, math.ceil(rows / parts))
+        return [('npy', path, s, min(s + step, rows), columns, chunk_rows) for s in range(0, rows, step)]
+    if suffix in ('.parquet', '.pq'):
+        groups = list(range(_parquet().ParquetFile(path).num_row_groups))
+        step = max(1, math.ceil(len(groups) / parts))
+        return [('parquet', path, groups[i:i + step], columns, chunk_rows) for i in range(0, len(groups), step)]
+    raise ValueError(f'不支持的文件类型 {suffix!r}, 可用 .csv / .parquet / .npy')
+
+
+def _fit_partition(model, task):
+    kind, path, *args = task
+    if kind == 'csv':
+        chunks = _csv_chunks(path, *args)
+    elif kind == 'npy':
+        chunks = _npy_chunks(path, *args)
+    else:
+        chunks = _parquet_chunks(path, *args)
+    return _accumulate(model, chunks)
+
+
+# ---------- 估计结果 ----------
+
+class DemandFit:
+    '''
+    各市场的 OLS 充分统计量及由此得到的需求曲线
+    stats: {市场: [个数, x 均值, y 均值, Sxx, Sxy, Syy]}, x 为价格, y 为数量 (loglinear 为 ln 数量)
+    '''
+
+    def __init__(self, model, stats, dropped=0):
+        if model not in MODELS:
+            raise ValueError(f'未知模型 {model!r}, 可用: {MODELS}')
+        self.model = model
+        self.stats = {key: np.asarray(row, dtype=float) for key, row in stats.items()}
+        self.dropped = dropped
+
+    @property
+    def markets(self):
+        return sorted(self.stats, key=str)
+
+    def merge(self, other):
+        '''与另一批数据 (同一模型) 的估计合并, 结果等于对两批数据一起估计'''
+        if other.model != self.model:
+            raise ValueError('只能合并同一模型的估计')
+        stats, dropped = _merge((self.stats, self.dropped), (other.stats, other.dropped))
+        return DemandFit(self.model, stats, dropped)
+
+    def coefficients(self, market):
+        '''回归系数、标准误和 R^2, 以及对应的需求曲线参数'''
+        n, mx, my, sxx, sxy, syy = self.stats[market]
+        if n < 3 or sxx <= 0:
+            raise ValueError(f'市场 {market!r} 的观测不足或价格没有变化, 无法估计')
+        slope = sxy / sxx
+        intercept = my - slope * mx
+        rss = max(syy - slope * sxy, 0.0)
+        sigma2 = rss / (n - 2)
+        result = {
+            'n': int(n),
+            'intercept': intercept,
+            'slope': slope,
+            'se_intercept': math.sqrt(sigma2 * (1.0 / n + mx * mx / sxx)),
+            'se_slope': math.sqrt(sigma2 / sxx),
+            'r2': 1.0 - rss / syy if syy > 0 else 1.0,
+        }
+        if self.model == 'linear':
+            # Q = alpha + beta*P  ->  P = a - b*Q
+            result.update(a=-intercept / slope, b=-1.0 / slope)
+        else:
+            result.update(alpha=intercept, beta=-slope)
+        return result
+
+    def table(self):
+        return {market: self.coefficients(market) for market in self.markets}
+
+    def demand(self, markets=None):
+        '''
+        需求曲线对象: 单个市场名返回标量参数, 市场列表 (默认全部) 返回最后一维为市场的参数
+        linear -> nonlinear.LinearDemand(a, b), loglinear -> nonlinear.LogLinear(alpha, beta)
+        '''
+        from econ1210.nonlinear import LinearDemand, LogLinear
+
+        single = markets is not None and not isinstance(markets, (list, tuple))
+        keys = [markets] if single else list(markets or self.markets)
+        coef = [self.coefficients(key) for key in keys]
+        names = ('a', 'b') if self.model == 'linear' else ('alpha', 'beta')
+        params = [np.array([c[name] for c in coef]) for name in names]
+        if single:
+            params = [p[0] for p in params]
+        return (LinearDemand if self.model == 'linear' else LogLinear)(*params)
+
+    def monopoly(self, market, mc, subsidy=0.0):
+        '''
+        该市场的垄断 / 补贴 / 竞争均衡; mc 与 subsidy 可以是数组
+        线性需求用 monopoly.solve_monopoly_subsidy 的闭式解, 其余用 nonlinear.solve_monopoly
+        '''
+        if self.model == 'linear':
+            from econ1210.monopoly import solve_monopoly_subsidy
+            c = self.coefficients(market)
+            return solve_monopoly_subsidy(c['a'], c['b'], mc, subsidy)
+        from econ1210.nonlinear import PowerCost, solve_monopoly
+        return solve_monopoly(self.demand(market), PowerCost(mc), subsidy)
+
+    def discrimination(self, mc, markets=None):
+        '''统一定价与分市场定价 (市场顺序同 markets, 默认按名字排序)'''
+        demand = self.demand(list(markets or self.markets))
+        if self.model == 'linear':
+            from econ1210.discrimination import solve_price_discrimination
+            return solve_price_discrimination(demand.a, demand.b, mc)
+        from econ1210.nonlinear import PowerCost, solve_discrimination
+        return solve_discrimination(demand, PowerCost(mc))
+
+    def two_market_params(self, asia, europe, mc):
+        '''discrimination.two_market_model / two_market_figure 的参数 (仅线性需求)'''
+        if self.model != 'linear':
+            raise ValueError('第 12 章的图只支持线性需求')
+        a_asia, a_europe = self.coefficients(asia), self.coefficients(europe)
+        return {'a_asia': a_asia['a'], 'b_asia': a_asia['b'],
+                'a_europe': a_europe['a'], 'b_europe': a_europe['b'], 'mc': mc}
+
+    def to_dict(self):
+        return {'model': self.model, 'dropped': self.dropped,
+                'stats': [[market, *map(float, self.stats[market])] for market in self.markets]}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['model'], {row[0]: row[1:] for row in data['stats']}, data.get('dropped', 0))
+
+
+def fit_arrays(price, quantity, market=None, model='linear', chunk_rows=CHUNK_ROWS):
+    '''对内存中的数组 (或内存映射) 分块估计'''
+    price, quantity = np.asarray(price), np.asarray(quantity)
+    market = None if market is None else np.asarray(market)
+    chunks = ((None if market is None else market[s:s + chunk_rows], price[s:s + chunk_rows],
+               quantity[s:s + chunk_rows]) for s in range(0, price.shape[0], chunk_rows))
+    return DemandFit(model, *_accumulate(model, chunks))
+
+
+def fit_file(path, model='linear', columns=COLUMNS, workers=None, chunk_rows=CHUNK_ROWS):
+    '''
+    对 CSV / Parquet / .npy 文件分块估计; workers > 1 时各部分在进程池里并行, 最后合并
+    columns: (市场列, 价格列, 数量列); 没有市场列时全部数据视为一个市场 (编号 0)
+    '''
+    if model not in MODELS:
+        raise ValueError(f'未知模型 {model!r}, 可用: {MODELS}')
+    workers = workers or os.cpu_count() or 1
+    # 每个进程分几块, 块大小不均时负载更平衡
+    tasks = _partitions(path, tuple(columns), chunk_rows, workers * 4 if workers > 1 else 1)
+    if workers == 1 or len(tasks) == 1:
+        results = [_fit_partition(model, task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_fit_partition, [model] * len(tasks), tasks))
+    return DemandFit(model, *reduce(_merge, results, ({}, 0)))
+
+
+# ---------- 合成数据与命令行 ----------
+
+def synthesize(path, rows, markets, noise=1.0, price_range=(0.05, 0.95), model='linear',
+               chunk_rows=CHUNK_ROWS, seed=None):
+    '''
+    按已知需求生成成交记录, 用于检验估计和计时
+    markets: [(a, b), ...] 反需求 P = a - b*Q (loglinear 时为 (alpha, beta): ln Q = alpha - beta*P)
+    价格在各市场 [lo, hi] * 价格上限内均匀抽取; .npy 写结构化内存映射, .csv 写文本
+    '''
+    rng = np.random.default_rng(seed)
+    params = np.asarray(markets, dtype=float)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix == '.npy':
+        dtype = [('market', 'i4'), ('price', 'f8'), ('quantity', 'f8')]
+        out = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=(rows,))
+    elif path.suffix == '.csv':
+        out = open(path, 'w', encoding='utf-8')
+        out.write('market,price,quantity\n')
+    else:
+        raise ValueError('synthesize 只写 .npy 或 .csv')
+    lo, hi = price_range
+    try:
+        for s in range(0, rows, chunk_rows):
+            m = min(chunk_rows, rows - s)
+            market = rng.integers(0, len(params), m)
+            first, second = params[market, 0], params[market, 1]
+            if model == 'linear':
+                price = first * rng.uniform(lo, hi, m)
+                quantity = (first - price) / second + rng.normal(0.0, noise, m)
+            else:
+                price = rng.uniform(lo, hi, m) * first / second
+                quantity = np.exp(first - second * price + rng.normal(0.0, noise, m))
+            if path.suffix == '.npy':
+                out['market'][s:s + m] = market
+                out['price'][s:s + m] = price
+                out['quantity'][s:s + m] = quantity
+            else:
+                np.savetxt(out, np.column_stack([market, price, quantity]), fmt=['%d', '%.6f', '%.6f'], delimiter=',')
+    finally:
+        if path.suffix == '.npy':
+            out.flush()
+            del out
+        else:
+            out.close()
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='从成交记录估计需求曲线')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    synth = sub.add_parser('synth', help='按已知需求生成成交记录')
+    synth.add_argument('out')
+    synth.add_argument('--rows', type=float, default=1e7)
+    synth.add_argument('--market', nargs=2, type=float, action='append', metavar=('A', 'B'),
+                       help='反需求 P = A - B*Q (可重复); 默认第 12 章的亚洲和欧洲')
+    synth.add_argument('--model', choices=MODELS, default='linear')
+    synth.add_argument('--noise', type=float, default=1.0)
+    synth.add_argument('--seed', type=int, default=0)
+
+    fit = sub.add_parser('fit', help='估计需求并代入求解器')
+    fit.add_argument('path')
+    fit.add_argument('--model', choices=MODELS, default='linear')
+    fit.add_argument('--columns', nargs=3, default=list(COLUMNS), metavar=('MARKET', 'PRICE', 'QUANTITY'))
+    fit.add_argument('--names', nargs='+', help='把市场编号 0, 1, ... 换成名字')
+    fit.add_argument('--workers', type=int, default=None)
+    fit.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    fit.add_argument('--mc', type=float, help='给定边际成本时求解: 一个市场为垄断, 多个市场为统一定价 vs 分市场定价')
+    fit.add_argument('--subsidy', type=float, default=0.0)
+    fit.add_argument('--plot', help='两个市场 (线性) 时按估计结果画第 12 章的图, 一个市场时画第 11 章的图')
+    fit.add_argument('--save', help='把充分统计量写成 JSON, 以后可与新数据的估计合并')
+    args = parser.parse_args(argv)
+
+    if args.command == 'synth':
+        markets = args.market or [(92.0, 2.0), (64.0, 2.0)]
+        start = time.perf_counter()
+        path = synthesize(args.out, int(args.rows), markets, args.noise, model=args.model, seed=args.seed)
+        print(f'{int(args.rows):,} 行 -> {path} ({path.stat().st_size / 2**20:.0f} MB), '
+              f'{time.perf_counter() - start:.1f}s')
+        return
+
+    start = time.perf_counter()
+    result = fit_file(args.path, args.model, args.columns, args.workers, args.chunk_rows)
+    elapsed = time.perf_counter() - start
+    if args.names:
+        result = DemandFit(result.model, {args.names[k] if isinstance(k, int) and k < len(args.names) else k: v
+                                          for k, v in result.stats.items()}, result.dropped)
+    rows = sum(int(s[0]) for s in result.stats.values())
+    print(f'{rows:,} 行 ({result.dropped:,} 行无效), {elapsed:.2f}s, {rows / elapsed / 1e6:.1f} M 行/秒')
+    table = result.table()
+    for market, c in table.items():
+        curve = (f'P = {c["a"]:.4f} - {c["b"]:.4f}Q' if result.model == 'linear'
+                 else f'ln Q = {c["alpha"]:.4f} - {c["beta"]:.4f}P')
+        print(f'  {str(market):10s} n={c["n"]:,}  {curve}  '
+              f'(se {c["se_intercept"]:.2g} / {c["se_slope"]:.2g}, R^2={c["r2"]:.4f})')
+    if args.save:
+        Path(args.save).write_text(json.dumps(result.to_dict(), ensure_ascii=False, indent=1), encoding='utf-8')
+
+    if args.mc is None:
+        return
+    markets = result.markets
+    if len(markets) == 1:
+        eq = result.monopoly(markets[0], args.mc, args.subsidy)
+        print(f'垄断: Q={float(eq["q_monopoly"]):.3f} P={float(eq["p_monopoly"]):.3f}  '
+              f'补贴 {args.subsidy:g}: Q={float(eq["q_subsidy"]):.3f}  DWL={float(eq["dwl_subsidy"]):.3f}')
+    else:
+        r = result.discrimination(args.mc, markets)
+        print(f'统一定价 P={float(r["p_uniform"]):.3f}')
+        for i, market in enumerate(markets):
+            print(f'  {str(market):10s} 分市场定价 P={float(r["p_discrim"][i]):.3f} Q={float(r["q_discrim"][i]):.3f}  '
+                  f'CS 统一 {float(r["cs_uniform"][i]):.3f} / 分市场 {float(r["cs_discrim"][i]):.3f}')
+    if args.plot:
+        import matplotlib
+        matplotlib.use('Agg')
+        if len(markets) == 1 and result.model == 'linear':
+            from econ1210.figures.monopoly import monopoly_figure
+            c = result.coefficients(markets[0])
+            fig = monopoly_figure(a=c['a'], b=c['b'], mc=args.mc, subsidy=args.subsidy)
+        elif len(markets) == 2:
+            from econ1210.figures.two_market import two_market_figure
+            fig = two_market_figure(**result.two_market_params(markets[0], markets[1], args.mc))
+        else:
+            raise SystemExit('--plot 只支持一个市场 (线性) 或两个市场')
+        from econ1210.fonts import quiet_missing_glyphs
+        with quiet_missing_glyphs():
+            fig.savefig(args.plot, dpi=100)
+        print(f'图 -> {args.plot}')
+
+
+if __name__ == '__main__':
+    main()
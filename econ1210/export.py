@@ -0,0 +1,98 @@
+'''
+图形的内存导出: 不写临时文件, 直接得到像素数组或编码后的字节
+  to_array:  Agg 画布 buffer_rgba 上的 (高, 宽, 4) uint8 数组视图, 不复制
+  to_bytes:  savefig 到 BytesIO; 默认不用 bbox_inches='tight' (它要多画一遍来测量边界),
+             矢量格式可以把面积大的填充层 (fill_between / Polygon) 栅格化
+  render_figure: 按注册名渲染并返回上述结果, 渲染后关闭 Figure
+绘制时套上 labels.text_cache() (批量导出时重复的文字只测一次) 和 fonts.quiet_missing_glyphs()
+'''
+import io
+
+import numpy as np
+
+from econ1210.fonts import quiet_missing_glyphs
+from econ1210.labels import text_cache
+from econ1210.profiling import stage
+
+VECTOR_FORMATS = ('svg', 'pdf', 'eps', 'ps')
+
+
+def _agg_canvas(fig):
+    '''Figure 已经挂在 Agg 画布 (或其子类, 如 TkAgg) 上时直接使用, 否则换成 Agg'''
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    return fig.canvas if isinstance(fig.canvas, FigureCanvasAgg) else FigureCanvasAgg(fig)
+
+
+def to_array(fig, dpi=None, copy=False):
+    '''
+    画一遍并返回像素数组 (高, 宽, 4), RGBA uint8
+    默认是画布缓冲区的视图: 不复制, 但下次重画或改变尺寸后内容会变; 需要保留时 copy=True
+    '''
+    if dpi is not None:
+        fig.set_dpi(dpi)
+    canvas = _agg_canvas(fig)
+    with stage('rasterize', dpi=fig.dpi), text_cache(), quiet_missing_glyphs():
+        canvas.draw()
+    view = np.asarray(canvas.buffer_rgba())
+    return view.copy() if copy else view
+
+
+def _fill_artists(fig, min_area):
+    '''各坐标轴里面积不小于 min_area (占坐标轴显示区域的比例) 的填充层'''
+    from matplotlib.collections import PolyCollection
+    from matplotlib.patches import Polygon
+
+    for ax in fig.axes:
+        box = ax.bbox
+        axes_area = box.width * box.height
+        for artist in (*ax.collections, *ax.patches):
+            if not isinstance(artist, (PolyCollection, Polygon)) or artist.get_rasterized():
+                continue
+            extent = artist.get_window_extent()
+            if axes_area and extent.width * extent.height >= min_area * axes_area:
+                yield artist
+
+
+def to_bytes(fig, fmt='png', dpi=None, tight=False, rasterize_fills=False, min_fill_area=0.02, **kwargs):
+    '''
+    把 Figure 编码成 fmt 格式的字节
+    tight: 是否使用 bbox_inches='tight' (与章节脚本的保存方式一致, 但多一次绘制)
+    rasterize_fills: 矢量格式下把面积不小于 min_fill_area 的 fill_between / Polygon 栅格化
+    (按 dpi 嵌入为图像, 文字和线条仍是矢量); 保存后恢复原设置
+    其余参数原样传给 savefig
+    '''
+    fills = []
+    if rasterize_fills and fmt in VECTOR_FORMATS:
+        fills = list(_fill_artists(fig, min_fill_area))
+        for artist in fills:
+            artist.set_rasterized(True)
+    if tight:
+        kwargs.setdefault('bbox_inches', 'tight')
+    if dpi is not None:
+        kwargs['dpi'] = dpi
+    buf = io.BytesIO()
+    try:
+        with stage('encode', format=fmt), text_cache(), quiet_missing_glyphs():
+            fig.savefig(buf, format=fmt, **kwargs)
+    finally:
+        for artist in fills:
+            artist.set_rasterized(False)
+    return buf.getvalue()
+
+
+def render_figure(name, params=None, output='array', dpi=100, **kwargs):
+    '''
+    渲染注册图形 name; output='array' 返回像素数组视图, 否则为编码格式 (png/svg/pdf...) 并返回字节
+    kwargs 传给 to_bytes (tight / rasterize_fills 等)
+    Figure 用完即关闭; 数组视图引用着画布缓冲区, 关闭后仍然有效
+    '''
+    import matplotlib.pyplot as plt
+    from econ1210.figures import get_figure
+
+    fig = get_figure(name)(**(params or {}))
+    try:
+        if output == 'array':
+            return to_array(fig, dpi)
+        return to_bytes(fig, output, dpi, **kwargs)
+    finally:
+        plt.close(fig)
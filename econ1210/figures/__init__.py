@@ -0,0 +1,37 @@
+'''
+各章节图形的函数化版本
+每个图形函数接收模型参数(关键字参数), 返回 matplotlib Figure, 不调用 plt.show()
+FIGURES 注册表供批量渲染等工具按名字查找, 模块在用到时才导入
+'''
+import importlib
+
+from econ1210.fonts import configure_fonts  # 中文字体只解析一次并持久化, 见 econ1210/fonts.py
+
+# 名字 -> 所在模块 / 函数名 / 批量渲染时扫描的参数及其范围 / 等价的声明式描述 (econ1210/specs)
+FIGURES = {
+    'ch07_four_case': {
+        'module': 'econ1210.figures.four_case',
+        'function': 'four_case_figure',
+        'sweep': ('p_ceiling', 12.0, 38.0),
+        'spec': 'four_case.json',
+    },
+    'ch11_monopoly': {
+        'module': 'econ1210.figures.monopoly',
+        'function': 'monopoly_figure',
+        'sweep': ('subsidy', 0.0, 60.0),
+        'spec': 'monopoly.json',
+    },
+    'ch12_two_market': {
+        'module': 'econ1210.figures.two_market',
+        'function': 'two_market_figure',
+        'sweep': ('mc', 0.0, 30.0),
+        'spec': 'two_market.json',
+    },
+}
+
+
+def get_figure(name):
+    '''按注册名返回图形函数'''
+    entry = FIGURES[name]
+    module = importlib.import_module(entry['module'])
+    return getattr(module, entry['function'])
@@ -0,0 +1,167 @@
+'''
+价格上限下的四种分配机制 (Chapter 7, Source: ECON1210 Question Bank 7 Q18)
+需求: P = a - b*Q, 供给: P = c + d*Q
+'''
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.patches import Polygon
+
+from econ1210.figures import configure_fonts
+from econ1210.labels import label, tight_layout
+from econ1210.price_control import four_case_model
+from econ1210.profiling import profiled, step, track
+from econ1210.sampling import sample_curve
+from econ1210.welfare import linear_demand, linear_supply
+
+# 颜色定义
+colors = {
+    'demand': '#1f77b4',
+    'supply': '#ff7f0e',
+    'ceiling': '#d62728',
+    'consumer_surplus': 'lightblue',
+    'producer_surplus': 'lightcoral',
+    'deadweight_loss': 'lightgray',
+    'bribery': 'purple',
+    'waste': 'brown'
+}
+
+
+def _base_layers(ax, m):
+    '''每个子图共用的需求/供给/上限/均衡点'''
+    ax.plot(*sample_curve(linear_demand(m['a'], m['b']), 0, 50), color=colors['demand'], label=label('four_case.demand'), lw=2)
+    ax.plot(*sample_curve(linear_supply(m['c'], m['d']), 0, 50), color=colors['supply'], label=label('four_case.supply'), lw=2)
+    ax.axhline(m['p_ceiling'], color=colors['ceiling'], linestyle='--',
+               label=label('four_case.ceiling', p=m['p_ceiling']))
+
+
+def _cs_points(m, level):
+    '''需求曲线与价格水平 level 之间、0 到 q_ceiling 的梯形顶点'''
+    return np.column_stack([[0, 0, m['q_ceiling'], m['q_ceiling']],
+                            [m['a'], level, level, m['p_max_willing']]])
+
+
+def _finish(ax, title):
+    ax.set_xlim(0, 50)
+    ax.set_ylim(0, 110)
+    ax.set_xlabel(label('four_case.xlabel'))
+    ax.set_ylabel(label('four_case.ylabel'))
+    ax.set_title(title)
+    ax.legend(loc='upper right')
+    ax.grid(True, alpha=0.3)
+
+
+@profiled('ch07_four_case')
+def four_case_figure(**params):
+    '''绘制四种分配机制的 2x2 对比图, 返回 Figure'''
+    configure_fonts()
+    step('model')
+    m = four_case_model(**params)
+    p_ceiling = m['p_ceiling']
+    q_ceiling = m['q_ceiling']
+    q_eq, p_eq = m['q_eq'], m['p_eq']
+    p_max_willing = m['p_max_willing']
+    bribe_amount = m['bribe_amount']
+    waste_per_unit = m['waste_per_unit']
+    # 上限不起作用时模型里没有贿赂和浪费, 图上也不画
+    binding = m['binding']
+
+    step('artists')
+    fig, axes = plt.subplots(2, 2, figsize=(12, 10))
+    track(fig)
+    fig.suptitle(label('four_case.suptitle'), fontsize=16)
+
+    # 生产者剩余：价格上限与供给曲线之间的三角形（四种情况相同）
+    ps_points = np.column_stack([[0, 0, q_ceiling], [m['c'], p_ceiling, p_ceiling]])
+
+    # 情况1：理想分配（按支付意愿分配）
+    ax = axes[0, 0]
+    _base_layers(ax, m)
+    ax.plot(q_eq, p_eq, 'ko', markersize=8, label=label('four_case.equilibrium_at', q=q_eq, p=p_eq))
+    ax.axvline(q_ceiling, color='gray', linestyle=':', alpha=0.5)
+
+    # 消费者剩余：需求曲线与价格上限之间的区域
+    ax.add_patch(Polygon(_cs_points(m, p_ceiling), closed=True, color=colors['consumer_surplus'], alpha=0.5))
+    ax.add_patch(Polygon(ps_points, closed=True, color=colors['producer_surplus'], alpha=0.5))
+
+    # 无谓损失
+    dwl_points = np.column_stack([[q_ceiling, q_ceiling, q_eq], [p_ceiling, p_max_willing, p_eq]])
+    ax.add_patch(Polygon(dwl_points, closed=True, color=colors['deadweight_loss'], alpha=0.5))
+
+    _finish(ax, label('four_case.title_ideal'))
+    ax.text(5, 95, label('four_case.cs', v=m['cs_ideal']), fontsize=9)
+    ax.text(5, 20, label('four_case.ps', v=m['ps_ideal']), fontsize=9)
+    ax.text(25, 45, label('four_case.dwl', v=m['dwl']), fontsize=9)
+
+    # 情况2：行贿分配
+    ax = axes[0, 1]
+    _base_layers(ax, m)
+    ax.plot(q_eq, p_eq, 'ko', markersize=8, label=label('four_case.equilibrium'))
+    ax.axvline(q_ceiling, color='gray', linestyle=':', alpha=0.5)
+
+    # 行贿示意：实际支付价格 = 价格上限 + 贿赂
+    effective_price = p_ceiling + bribe_amount if binding else p_ceiling
+    ax.add_patch(Polygon(ps_points, closed=True, color=colors['producer_surplus'], alpha=0.5))
+
+    # 消费者剩余减少（因为支付了贿赂）
+    ax.add_patch(Polygon(_cs_points(m, effective_price), closed=True, color=colors['consumer_surplus'], alpha=0.5))
+
+    # 贿赂转移（从消费者到官员）
+    if binding:
+        ax.add_patch(plt.Rectangle((0, p_ceiling), q_ceiling, bribe_amount,
+                                   color=colors['bribery'], alpha=0.5, label=label('four_case.bribe')))
+
+    _finish(ax, label('four_case.title_bribe'))
+    ax.text(5, 95, label('four_case.cs_net', v=m['cs_bribe']), fontsize=9)
+    if binding:
+        ax.text(5, 30, label('four_case.bribe_value', v=m['bribe_transfer']), fontsize=9)
+    ax.text(25, 45, label('four_case.ps_unchanged'), fontsize=9)
+
+    # 情况3：浪费性竞争
+    ax = axes[1, 0]
+    _base_layers(ax, m)
+    ax.plot(q_eq, p_eq, 'ko', markersize=8, label=label('four_case.equilibrium'))
+    ax.axvline(q_ceiling, color='gray', linestyle=':', alpha=0.5)
+    ax.add_patch(Polygon(ps_points, closed=True, color=colors['producer_surplus'], alpha=0.5))
+
+    # 消费者剩余（考虑浪费成本后的净剩余）
+    waste_level = p_ceiling + waste_per_unit if binding else p_ceiling
+    ax.add_patch(Polygon(_cs_points(m, waste_level), closed=True, color=colors['consumer_surplus'], alpha=0.5))
+
+    # 浪费的区域（无谓损失增加）
+    if binding:
+        ax.add_patch(plt.Rectangle((0, p_ceiling), q_ceiling, waste_per_unit,
+                                   color=colors['waste'], alpha=0.5, label=label('four_case.waste')))
+
+    _finish(ax, label('four_case.title_waste'))
+    ax.text(5, 95, label('four_case.cs_net', v=m['cs_waste']), fontsize=9)
+    if binding:
+        ax.text(5, 30, label('four_case.waste_value', v=m['waste_cost']), fontsize=9)
+        ax.text(25, 45, label('four_case.surplus_falls'), fontsize=9)
+    if m['allocation_loss'] > 0:
+        # 排队时东西不一定给支付意愿最高的人, 这部分已从消费者净剩余中扣除
+        ax.text(25, 38, label('four_case.allocation_loss', v=m['allocation_loss']), fontsize=9)
+
+    # 情况4：随机分配（未分配给评价最高者）
+    ax = axes[1, 1]
+    _base_layers(ax, m)
+    ax.plot(q_eq, p_eq, 'ko', markersize=8, label=label('four_case.equilibrium'))
+    ax.axvline(q_ceiling, color='gray', linestyle=':', alpha=0.5)
+    ax.add_patch(Polygon(ps_points, closed=True, color=colors['producer_surplus'], alpha=0.5))
+
+    # 随机分配下的消费者剩余（低于理想分配）: 买到者的平均支付意愿与上限价之间的矩形
+    avg_willingness = m['avg_willingness']
+    ax.add_patch(plt.Rectangle((0, p_ceiling), q_ceiling, avg_willingness - p_ceiling,
+                               color=colors['consumer_surplus'], alpha=0.5))
+
+    # 效率损失区域: 理想分配的剩余中随机分配拿不到的部分
+    ax.add_patch(Polygon(_cs_points(m, avg_willingness), closed=True, color='yellow', alpha=0.3,
+                         label=label('four_case.efficiency_loss')))
+
+    _finish(ax, label('four_case.title_random'))
+    ax.text(5, 95, label('four_case.cs', v=m['cs_random']), fontsize=9)
+    ax.text(5, 30, label('four_case.efficiency_loss_value', v=m['efficiency_loss']), fontsize=9)
+    ax.text(25, 45, label('four_case.ps_unchanged'), fontsize=9)
+
+    step('layout')
+    tight_layout(fig)
+    return fig
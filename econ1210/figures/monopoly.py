@@ -0,0 +1,187 @@
+'''
+垄断市场补贴政策对无谓损失的影响 (Chapter 11)
+(Source: ECON1210 Weekly Quiz 11 Q1 / 2022 Spring Final Q65-69)
+'''
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.patches import Polygon
+
+from econ1210.figures import configure_fonts
+from econ1210.labels import label, tight_layout
+from econ1210.monopoly import solve_monopoly_subsidy
+from econ1210.profiling import profiled, step, track
+from econ1210.sampling import sample_curve
+from econ1210.welfare import linear_demand
+
+
+def _dwl_vertices(a, b, mc, q_from, q_to):
+    '''需求曲线与MC之间、q_from 到 q_to 的无谓损失四边形'''
+    return [(q_from, mc), (q_to, mc), (q_to, a - b * q_to), (q_from, a - b * q_from)]
+
+
+class MonopolyView:
+    '''
+    补贴图的所有 artist 只创建一次并保留句柄
+    update(subsidy) 只修改随补贴变化的线条数据、多边形顶点和文字, 不重建图形
+    animated=True 时这些 artist 不画进背景, 交给调用方用 blitting 单独重绘
+    '''
+
+    @profiled('ch11_monopoly')
+    def __init__(self, a=146.0, b=0.5, mc=4.0, subsidy=29.0, animated=False):
+        configure_fonts()
+        step('model')
+        self.a, self.b, self.mc = a, b, mc
+        eq = solve_monopoly_subsidy(a, b, mc, subsidy)
+        Q_monopoly = eq['q_monopoly'].item()
+        P_monopoly = eq['p_monopoly'].item()
+        Q_competitive = eq['q_competitive'].item()
+        P_competitive = eq['p_competitive'].item()
+        DWL_monopoly = eq['dwl_monopoly'].item()
+
+        # 需求、MR、MC 及补贴后的曲线都是直线, 两个端点即可精确绘制
+        self.Q = Q = sample_curve(linear_demand(a, b), 0, 300)[0]
+        step('artists')
+        self.fig, self.ax = plt.subplots(figsize=(12, 8))
+        track(self.fig)
+        ax = self.ax
+
+        # 绘制曲线 (补贴相关的两条线在 update() 里设置数据)
+        ax.plot(Q, a - b * Q, 'b-', linewidth=2.5, label=label('monopoly.demand', a=a, b=b))
+        self.line_ps, = ax.plot(Q, Q, 'r-', linewidth=2.5, label=' ')
+        ax.plot(Q, np.full_like(Q, mc), 'g-', linewidth=2.5, label=label('monopoly.mc', mc=mc))
+        ax.plot(Q, a - 2 * b * Q, 'b--', linewidth=1.5, alpha=0.7, label=label('monopoly.mr', a=a, b2=2*b))
+        self.line_mr_s, = ax.plot(Q, Q, 'r--', linewidth=1.5, alpha=0.7, label=' ')
+
+        # 原垄断点
+        ax.plot(Q_monopoly, P_monopoly, 'bo', markersize=10)
+        ax.annotate(label('monopoly.point_a', q=Q_monopoly, p=P_monopoly),
+                    xy=(Q_monopoly, P_monopoly),
+                    xytext=(Q_monopoly-50, P_monopoly+20),
+                    arrowprops=dict(arrowstyle='->', color='blue'),
+                    fontsize=10, color='blue')
+
+        # 补贴后均衡
+        self.pt_consumer, = ax.plot([], [], 'ro', markersize=10)  # 消费者支付
+        self.pt_producer, = ax.plot([], [], 'ro', markersize=10, fillstyle='none')  # 生产者收到
+        self.ann_consumer = ax.annotate('', xy=(0, 0), xytext=(0, 0),
+                                        arrowprops=dict(arrowstyle='->', color='red'),
+                                        fontsize=10, color='red')
+        self.ann_producer = ax.annotate('', xy=(0, 0), xytext=(0, 0),
+                                        arrowprops=dict(arrowstyle='->', color='red'),
+                                        fontsize=10, color='red')
+
+        # 社会最优点
+        ax.plot(Q_competitive, P_competitive, 'go', markersize=10)
+        ax.annotate(label('monopoly.point_c', q=Q_competitive, p=P_competitive),
+                    xy=(Q_competitive, P_competitive),
+                    xytext=(Q_competitive-50, P_competitive+15),
+                    arrowprops=dict(arrowstyle='->', color='green'),
+                    fontsize=10, color='green')
+
+        # 补贴箭头
+        self.arrow = ax.annotate('', xy=(0, 0), xytext=(0, 0),
+                                 arrowprops=dict(arrowstyle='<->', color='purple', lw=2))
+        self.txt_subsidy = ax.text(0, 0, '', fontsize=10, color='purple', va='center')
+
+        # 填充无谓损失区域
+        # 补贴前的DWL（浅蓝色）
+        ax.add_patch(Polygon(_dwl_vertices(a, b, mc, Q_monopoly, Q_competitive),
+                             alpha=0.2, color='blue', linewidth=0,
+                             label=label('monopoly.dwl', dwl=DWL_monopoly)))
+        # 补贴后的DWL（浅红色）
+        self.dwl_subsidy = ax.add_patch(Polygon(_dwl_vertices(a, b, mc, 0, 0),
+                                                alpha=0.3, color='red', linewidth=0, label=' '))
+
+        # 添加垂直线
+        ax.vlines(x=Q_monopoly, ymin=0, ymax=P_monopoly, color='blue', linestyle=':', alpha=0.5)
+        self.vline_subsidy = ax.vlines(x=0, ymin=0, ymax=0, color='red', linestyle=':', alpha=0.5)
+        ax.vlines(x=Q_competitive, ymin=0, ymax=a - b * Q_competitive, color='green', linestyle=':', alpha=0.5)
+
+        # 设置图形属性
+        ax.set_xlim(0, 300)
+        ax.set_ylim(0, 180)
+        ax.set_xlabel(label('monopoly.xlabel'), fontsize=12)
+        ax.set_ylabel(label('monopoly.ylabel'), fontsize=12)
+        ax.set_title(label('monopoly.title'), fontsize=14, fontweight='bold')
+
+        # 添加网格和图例 (图例里随补贴变化的三条文字保留句柄)
+        ax.grid(True, alpha=0.3)
+        self.legend = ax.legend(loc='upper right', fontsize=10)
+        handles, _ = ax.get_legend_handles_labels()
+        texts = self.legend.get_texts()
+        self.legend_texts = {key: texts[handles.index(artist)]
+                             for key, artist in (('ps', self.line_ps), ('mr_s', self.line_mr_s),
+                                                 ('dwl', self.dwl_subsidy))}
+
+        # 添加说明文本框
+        props = dict(boxstyle='round', facecolor='wheat', alpha=0.8)
+        self.textbox = ax.text(0.02, 0.98, '', transform=ax.transAxes, fontsize=9,
+                               verticalalignment='top', bbox=props)
+
+        self.dynamic_artists = [
+            self.line_ps, self.line_mr_s, self.dwl_subsidy, self.vline_subsidy,
+            self.pt_consumer, self.pt_producer, self.ann_consumer, self.ann_producer,
+            self.arrow, self.txt_subsidy, self.textbox,
+        ]
+        # 图例的排版最贵; 动画模式下图例用不含补贴数值的文字, 画进静态背景
+        # (具体数值仍在说明文本框里逐帧更新)
+        self.animated = animated
+        if animated:
+            self.legend_texts['ps'].set_text(label('monopoly.ps_static'))
+            self.legend_texts['mr_s'].set_text(label('monopoly.mr_s_static'))
+            self.legend_texts['dwl'].set_text(label('monopoly.dwl_s_static'))
+        for artist in self.dynamic_artists:
+            artist.set_animated(animated)
+
+        step('update')
+        self.update(subsidy)
+        step('layout')
+        tight_layout(self.fig)
+
+    def update(self, subsidy):
+        '''按新的补贴额更新所有相关 artist, 返回被修改的 artist 列表'''
+        a, b, mc, Q = self.a, self.b, self.mc, self.Q
+        eq = solve_monopoly_subsidy(a, b, mc, subsidy)
+        Q_monopoly = eq['q_monopoly'].item()
+        P_monopoly = eq['p_monopoly'].item()
+        Q_competitive = eq['q_competitive'].item()
+        P_competitive = eq['p_competitive'].item()
+        Q_subsidy = eq['q_subsidy'].item()
+        P_s_producer = eq['p_producer'].item()  # 生产者收到的价格
+        P_s_consumer = eq['p_consumer'].item()  # 消费者支付的价格
+        DWL_subsidy = eq['dwl_subsidy'].item()
+
+        self.line_ps.set_ydata(a + subsidy - b * Q)
+        self.line_mr_s.set_ydata(a + subsidy - 2 * b * Q)
+
+        self.pt_consumer.set_data([Q_subsidy], [P_s_consumer])
+        self.pt_producer.set_data([Q_subsidy], [P_s_producer])
+        self.ann_consumer.set_text(label('monopoly.consumer', q=Q_subsidy, p=P_s_consumer))
+        self.ann_consumer.xy = (Q_subsidy, P_s_consumer)
+        self.ann_consumer.xyann = (Q_subsidy-40, P_s_consumer-15)
+        self.ann_producer.set_text(label('monopoly.producer', q=Q_subsidy, p=P_s_producer))
+        self.ann_producer.xy = (Q_subsidy, P_s_producer)
+        self.ann_producer.xyann = (Q_subsidy+20, P_s_producer+10)
+
+        self.arrow.xy = (Q_subsidy, P_s_producer)
+        self.arrow.xyann = (Q_subsidy, P_s_consumer)
+        self.txt_subsidy.set_position((Q_subsidy+5, (P_s_producer + P_s_consumer)/2))
+        self.txt_subsidy.set_text(label('monopoly.subsidy', s=subsidy))
+
+        self.dwl_subsidy.set_xy(_dwl_vertices(a, b, mc, Q_subsidy, Q_competitive))
+        self.vline_subsidy.set_segments([[(Q_subsidy, 0), (Q_subsidy, P_s_producer)]])
+
+        if not self.animated:
+            self.legend_texts['ps'].set_text(label('monopoly.ps', a=a+subsidy, b=b))
+            self.legend_texts['mr_s'].set_text(label('monopoly.mr_s', a=a+subsidy, b2=2*b))
+            self.legend_texts['dwl'].set_text(label('monopoly.dwl_s', dwl=DWL_subsidy))
+
+        self.textbox.set_text(label(
+            'monopoly.textbox', a=a, b=b, mc=mc, s=subsidy, qm=Q_monopoly, pm=P_monopoly,
+            qs=Q_subsidy, pc=P_s_consumer, ps=P_s_producer, qc=Q_competitive, pcomp=P_competitive, dwl=DWL_subsidy))
+        return self.dynamic_artists
+
+
+def monopoly_figure(a=146.0, b=0.5, mc=4.0, subsidy=29.0):
+    '''绘制补贴前后的垄断均衡与无谓损失, 返回 Figure'''
+    return MonopolyView(a, b, mc, subsidy).fig
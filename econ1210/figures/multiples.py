@@ -0,0 +1,227 @@
+'''
+多情景小图阵列 (small multiples): 一组情景排成网格画在同一张图上
+所有小图共用一个坐标轴对象, 每个小图是数据坐标里平移后的一格;
+每个图层 (如"所有小图的需求曲线") 只创建一个 LineCollection / PolyCollection / scatter,
+刻度格式化器把全局坐标换算回小图内坐标, 图例句柄也只创建一次
+因此 artist 数量与情景数无关, 10x10 网格的开销只是单个小图的几倍
+'''
+import math
+
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.ticker import FixedLocator, FuncFormatter, MaxNLocator
+
+from econ1210.figures import configure_fonts
+from econ1210.labels import tight_layout
+from econ1210.monopoly import solve_monopoly_subsidy
+from econ1210.price_control import equilibrium, sweep_price_controls
+
+
+def _clip_segments(p0, p1, width, height):
+    '''Liang-Barsky 算法把线段裁剪到 [0, width] x [0, height], 返回 (p0, p1, 是否保留)'''
+    d = p1 - p0
+    t0 = np.zeros(len(p0))
+    t1 = np.ones(len(p0))
+    keep = np.ones(len(p0), dtype=bool)
+    for p, q in ((-d[:, 0], p0[:, 0]), (d[:, 0], width - p0[:, 0]),
+                 (-d[:, 1], p0[:, 1]), (d[:, 1], height - p0[:, 1])):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            r = q / p
+        keep &= ~((p == 0) & (q < 0))
+        t0 = np.where(p < 0, np.maximum(t0, r), t0)
+        t1 = np.where(p > 0, np.minimum(t1, r), t1)
+    keep &= t0 <= t1
+    return p0 + t0[:, None] * d, p0 + t1[:, None] * d, keep
+
+
+class SmallMultiples:
+    '''
+    n 个 width x height 的小图排成网格
+    图层方法接收小图内坐标: per_panel=False 时所有小图共用同一组形状,
+    per_panel=True 时第一维是小图编号
+    '''
+
+    def __init__(self, n, width, height, ncols=None, gap=0.15, figsize=None,
+                 panel_inches=2.2, panel_aspect=0.75):
+        configure_fonts()
+        self.n, self.width, self.height = n, width, height
+        self._legend_rows = 0
+        self.ncols = ncols or math.ceil(math.sqrt(n))
+        self.nrows = math.ceil(n / self.ncols)
+        self.pitch = (width * (1 + gap), height * (1 + gap))
+
+        index = np.arange(n)
+        col, row = index % self.ncols, index // self.ncols
+        self.offsets = np.column_stack([col * self.pitch[0], (self.nrows - 1 - row) * self.pitch[1]])
+
+        self.fig, self.ax = plt.subplots(figsize=figsize or (
+            panel_inches * self.ncols + 1, panel_inches * panel_aspect * self.nrows + 1.6))
+        ax = self.ax
+        margin_x, margin_y = gap * width / 2, gap * height / 2
+        ax.set_xlim(-margin_x, self.ncols * self.pitch[0] - margin_x)
+        ax.set_ylim(-margin_y, self.nrows * self.pitch[1] - margin_y)
+        ax.set_frame_on(False)
+
+        # 边框: 所有小图的矩形一次画出
+        box = np.array([[0, 0], [width, 0], [width, height], [0, height]])
+        ax.add_collection(PolyCollection(box[None] + self.offsets[:, None], facecolors='none',
+                                         edgecolors='0.3', linewidths=0.6))
+
+        # 刻度只放在最下一行和最左一列, 格式化器把全局坐标换回小图内坐标
+        xt = MaxNLocator(4).tick_values(0, width)
+        xt = xt[(xt >= 0) & (xt <= width)]
+        yt = MaxNLocator(4).tick_values(0, height)
+        yt = yt[(yt >= 0) & (yt <= height)]
+        ax.xaxis.set_major_locator(FixedLocator(
+            (xt[None] + np.arange(self.ncols)[:, None] * self.pitch[0]).ravel()))
+        ax.yaxis.set_major_locator(FixedLocator(
+            (yt[None] + np.arange(self.nrows)[:, None] * self.pitch[1]).ravel()))
+        ax.xaxis.set_major_formatter(FuncFormatter(self._local_formatter(self.pitch[0])))
+        ax.yaxis.set_major_formatter(FuncFormatter(self._local_formatter(self.pitch[1])))
+        ax.tick_params(labelsize=7, length=2)
+
+    @staticmethod
+    def _local_formatter(pitch):
+        def fmt(value, pos):
+            local = value - pitch * math.floor(value / pitch + 1e-9)
+            return f'{round(local, 6):g}'
+        return fmt
+
+    def _place(self, points, per_panel):
+        '''小图内坐标 -> 全局坐标, 返回形状 (n, ..., 2)'''
+        points = np.asarray(points, dtype=float)
+        if not per_panel:
+            points = np.broadcast_to(points, (self.n,) + points.shape)
+        return points + self.offsets.reshape((self.n,) + (1,) * (points.ndim - 2) + (2,))
+
+    def lines(self, polylines, per_panel=False, label=None, **style):
+        '''折线 (..., 顶点数, 2), 拆成线段并裁剪到各自小图内, 合成一个 LineCollection'''
+        polylines = np.asarray(polylines, dtype=float)
+        if not per_panel:
+            polylines = np.broadcast_to(polylines, (self.n,) + polylines.shape)
+        p0 = polylines[..., :-1, :].reshape(self.n, -1, 2)
+        p1 = polylines[..., 1:, :].reshape(self.n, -1, 2)
+        k = p0.shape[1]
+        p0, p1, keep = _clip_segments(p0.reshape(-1, 2), p1.reshape(-1, 2), self.width, self.height)
+        offsets = np.repeat(self.offsets, k, axis=0)
+        segments = np.stack([p0 + offsets, p1 + offsets], axis=1)[keep]
+        return self.ax.add_collection(LineCollection(segments, label=label, **style))
+
+    def polygons(self, polygons, per_panel=False, label=None, **style):
+        '''多边形 (..., 顶点数, 2), 顶点截断到小图范围内, 合成一个 PolyCollection'''
+        polygons = np.asarray(polygons, dtype=float)
+        clipped = np.stack([np.clip(polygons[..., 0], 0, self.width),
+                            np.clip(polygons[..., 1], 0, self.height)], axis=-1)
+        placed = self._place(clipped, per_panel)
+        return self.ax.add_collection(PolyCollection(placed.reshape(-1, *placed.shape[-2:]),
+                                                     label=label, **style))
+
+    def points(self, xy, per_panel=False, label=None, **style):
+        '''点 (..., 2), 超出小图范围的点不画, 合成一个 scatter'''
+        xy = np.asarray(xy, dtype=float)
+        inside = ((xy[..., 0] >= 0) & (xy[..., 0] <= self.width)
+                  & (xy[..., 1] >= 0) & (xy[..., 1] <= self.height))
+        placed = self._place(xy, per_panel)
+        if not per_panel:
+            inside = np.broadcast_to(inside, placed.shape[:-1])
+        return self.ax.scatter(*placed[inside].T, label=label, **style)
+
+    def titles(self, texts, **style):
+        '''每个小图上方一行短标题'''
+        style = {'fontsize': 8, 'ha': 'center', 'va': 'bottom', **style}
+        for (x, y), text in zip(self.offsets, texts):
+            self.ax.text(x + self.width / 2, y + self.height * 1.01, text, **style)
+
+    def legend(self, ncol=4, **kwargs):
+        '''整张图一个图例, 放在底部; 各图层的集合本身就是图例句柄'''
+        handles, labels = self.ax.get_legend_handles_labels()
+        self._legend_rows = math.ceil(len(handles) / ncol)
+        kwargs = {'loc': 'lower center', 'fontsize': 9, **kwargs}
+        return self.fig.legend(handles, labels, ncol=ncol, **kwargs)
+
+    def finish(self, title=None, xlabel=None, ylabel=None):
+        if title:
+            self.fig.suptitle(title, fontsize=13)
+        if xlabel:
+            self.ax.set_xlabel(xlabel)
+        if ylabel:
+            self.ax.set_ylabel(ylabel)
+        height = self.fig.get_figheight()
+        bottom = (0.22 * self._legend_rows + 0.1) / height
+        tight_layout(self.fig, rect=(0, bottom, 1, 1))
+        return self.fig
+
+
+def monopoly_multiples(subsidies, a=146.0, b=0.5, mc=4.0, ncols=None, xmax=300.0, ymax=180.0):
+    '''每个补贴额一个小图: 原/补贴后需求和 MR、MC、均衡点和补贴前后的无谓损失'''
+    s = np.asarray(subsidies, dtype=float).ravel()
+    eq = solve_monopoly_subsidy(a, b, mc, s)
+    sm = SmallMultiples(len(s), xmax, ymax, ncols)
+    x = np.array([0.0, xmax])
+
+    def line(intercept, slope):
+        intercept = np.asarray(intercept, dtype=float)
+        return np.stack([np.broadcast_to(x, intercept.shape + (2,)),
+                         intercept[..., None] + slope * x], axis=-1)
+
+    # 所有小图相同的静态图层
+    sm.lines(line(a, -b), color='b', linewidth=1.2, label='原需求曲线')
+    sm.lines(line(a, -2 * b), color='b', linestyle='--', linewidth=0.8, alpha=0.7, label='原边际收益')
+    sm.lines(line(mc, 0.0), color='g', linewidth=1.2, label='边际成本')
+    q_m, q_c = eq['q_monopoly'][0], eq['q_competitive'][0]
+    sm.polygons([[(q_m, mc), (q_c, mc), (q_c, a - b * q_c), (q_m, a - b * q_m)]],
+                color='blue', alpha=0.2, linewidth=0, label='原无谓损失')
+
+    # 随补贴变化的图层
+    sm.lines(line(a + s, -b), per_panel=True, color='r', linewidth=1.2, label='补贴后生产者面对的需求')
+    sm.lines(line(a + s, -2 * b), per_panel=True, color='r', linestyle='--', linewidth=0.8,
+             alpha=0.7, label='补贴后边际收益')
+    q_s = eq['q_subsidy']
+    dwl = np.stack([np.column_stack([q_s, np.full_like(q_s, mc)]),
+                    np.column_stack([np.full_like(q_s, q_c), np.full_like(q_s, mc)]),
+                    np.column_stack([np.full_like(q_s, q_c), np.full_like(q_s, a - b * q_c)]),
+                    np.column_stack([q_s, a - b * q_s])], axis=1)
+    sm.polygons(dwl[:, None], per_panel=True, color='red', alpha=0.3, linewidth=0, label='补贴后无谓损失')
+
+    sm.points([(q_m, eq['p_monopoly'][0]), (q_c, eq['p_competitive'][0])],
+              color='k', s=8, zorder=3, label='原垄断 / 社会最优')
+    sm.points(np.stack([np.column_stack([q_s, eq['p_consumer']]),
+                        np.column_stack([q_s, eq['p_producer']])], axis=1),
+              per_panel=True, color='r', s=8, zorder=3, label='补贴后 (消费者支付 / 生产者收到)')
+
+    sm.titles([f's={v:.3g}, DWL={d:.0f}' for v, d in zip(s, eq['dwl_subsidy'])])
+    sm.legend()
+    return sm.finish('不同补贴额下的垄断均衡与无谓损失', '数量 Q', '价格 P')
+
+
+def price_ceiling_multiples(ceilings, a=100.0, b=2.0, c=10.0, d=1.0, ncols=None,
+                            xmax=50.0, ymax=110.0):
+    '''每个价格上限一个小图: 需求/供给 (静态)、上限、理想分配下的 CS / PS / DWL'''
+    p = np.asarray(ceilings, dtype=float).ravel()
+    r = sweep_price_controls(p, 0.0, 0.0, a, b, c, d)
+    q_eq, p_eq = equilibrium(a, b, c, d)
+    sm = SmallMultiples(len(p), xmax, ymax, ncols)
+    x = np.array([0.0, xmax])
+
+    sm.lines(np.column_stack([x, a - b * x]), color='#1f77b4', linewidth=1.2, label='需求曲线')
+    sm.lines(np.column_stack([x, c + d * x]), color='#ff7f0e', linewidth=1.2, label='供给曲线')
+    sm.lines(np.stack([np.column_stack([np.zeros_like(p), p]),
+                       np.column_stack([np.full_like(p, xmax), p])], axis=1),
+             per_panel=True, color='#d62728', linestyle='--', linewidth=0.8, label='价格上限')
+
+    q, price = r['q'], r['price']
+    zero = np.zeros_like(q)
+    cs = np.stack([np.column_stack([zero, zero + a]), np.column_stack([zero, price]),
+                   np.column_stack([q, price]), np.column_stack([q, a - b * q])], axis=1)
+    ps = np.stack([np.column_stack([zero, zero + c]), np.column_stack([zero, price]),
+                   np.column_stack([q, price]), np.column_stack([q, c + d * q])], axis=1)
+    dwl = np.stack([np.column_stack([q, c + d * q]), np.column_stack([q, a - b * q]),
+                    np.column_stack([zero + q_eq, zero + p_eq])], axis=1)
+    sm.polygons(cs[:, None], per_panel=True, color='lightblue', alpha=0.6, linewidth=0, label='消费者剩余')
+    sm.polygons(ps[:, None], per_panel=True, color='lightcoral', alpha=0.6, linewidth=0, label='生产者剩余')
+    sm.polygons(dwl[:, None], per_panel=True, color='gray', alpha=0.5, linewidth=0, label='无谓损失')
+
+    sm.titles([f'上限={v:.3g}, DWL={w:.0f}' for v, w in zip(p, r['dwl_ideal'])])
+    sm.legend()
+    return sm.finish('不同价格上限下的福利分配 (理想分配)', '数量 Q', '价格 P')
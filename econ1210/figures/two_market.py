@@ -0,0 +1,156 @@
+'''
+Microsoft Windows 定价策略分析: 统一定价 vs 双定价 (Chapter 12)
+亚洲需求: P = a_asia - b_asia*Q, 欧洲需求: P = a_europe - b_europe*Q, 共同边际成本 MC = mc
+'''
+import math
+
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.patches import Polygon
+
+from econ1210.discrimination import two_market_model
+from econ1210.figures import configure_fonts
+from econ1210.labels import label, tight_layout
+from econ1210.profiling import profiled, step, track
+from econ1210.sampling import sample_adaptive, sample_curve
+from econ1210.welfare import linear_demand
+
+# 设置颜色
+colors = ['#1f77b4', '#ff7f0e', '#2ca02c']
+cs_color = '#ffcccc'
+highlight_color = '#ff6b6b'
+
+
+def _nice_limit(x):
+    '''坐标轴上限取略大于 x 的 5 的倍数'''
+    return 5 * math.ceil(x * 1.05 / 5)
+
+
+def _market_lines(ax, Q, P, price, quantity):
+    ax.plot(Q, P, 'b-', linewidth=2, label=label('two_market.demand'))
+    ax.axhline(y=price, color='r', linestyle='--', linewidth=1.5, label=label('two_market.price', price=price))
+    ax.axvline(x=quantity, color='g', linestyle='--', linewidth=1, label=label('two_market.quantity', q=quantity))
+
+
+def _finish_market(ax, title, xmax, ymax):
+    ax.set_xlabel(label('two_market.xlabel'))
+    ax.set_ylabel(label('two_market.ylabel'))
+    ax.set_title(title)
+    ax.set_xlim(0, xmax)
+    ax.set_ylim(0, ymax)
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+
+
+@profiled('ch12_two_market')
+def two_market_figure(**params):
+    '''绘制 2x3 的统一定价/双定价对比图, 返回 Figure'''
+    configure_fonts()
+    step('model')
+    m = two_market_model(**params)
+    a_asia, b_asia = m['a_asia'], m['b_asia']
+    a_europe, b_europe = m['a_europe'], m['b_europe']
+    P_single = m['P_single']
+    Q_asia_single, Q_europe_single = m['Q_asia_single'], m['Q_europe_single']
+    P_asia_dual, P_europe_dual = m['P_asia_dual'], m['P_europe_dual']
+    Q_asia_dual, Q_europe_dual = m['Q_asia_dual'], m['Q_europe_dual']
+    cs_asia_single, cs_asia_dual = m['cs_asia_single'], m['cs_asia_dual']
+    cs_europe_single, cs_europe_dual = m['cs_europe_single'], m['cs_europe_dual']
+
+    step('artists')
+    fig, axes = plt.subplots(2, 3, figsize=(18, 12))
+    track(fig)
+
+    # 需求曲线是直线, 只取端点; 阴影区域同样只需 [0, 成交量] 两端
+    Q_asia, P_asia = sample_curve(linear_demand(a_asia, b_asia), 0, a_asia / b_asia)
+    Q_europe, P_europe = sample_curve(linear_demand(a_europe, b_europe), 0, a_europe / b_europe)
+    asia_lim = (_nice_limit(a_asia / b_asia), _nice_limit(a_asia))
+    europe_lim = (_nice_limit(a_europe / b_europe), _nice_limit(a_europe))
+
+    # 1. 统一定价 - 亚洲市场
+    ax1 = axes[0, 0]
+    _market_lines(ax1, Q_asia, P_asia, P_single, Q_asia_single)
+    q = np.array([0.0, Q_asia_single])
+    ax1.fill_between(q, P_single, a_asia - b_asia * q, color=cs_color, alpha=0.5, label=label('two_market.cs'))
+    _finish_market(ax1, label('two_market.single_asia'), *asia_lim)
+
+    # 2. 统一定价 - 欧洲市场
+    ax2 = axes[0, 1]
+    _market_lines(ax2, Q_europe, P_europe, P_single, Q_europe_single)
+    q = np.array([0.0, Q_europe_single])
+    ax2.fill_between(q, P_single, a_europe - b_europe * q, color=cs_color, alpha=0.5, label=label('two_market.cs'))
+    _finish_market(ax2, label('two_market.single_europe'), *europe_lim)
+
+    # 3. 总市场统一定价
+    ax3 = axes[0, 2]
+    # 总需求在较小截距处有折点, 按价格取样后水平加总 (折点处取顶点即可精确绘制)
+    P_total, (Q_total,) = sample_adaptive(
+        lambda p: np.maximum(a_asia - p, 0) / b_asia + np.maximum(a_europe - p, 0) / b_europe,
+        0, max(a_asia, a_europe), breakpoints=(a_asia, a_europe))
+    ax3.plot(Q_total, P_total, 'purple', linewidth=2, label=label('two_market.total_demand'))
+    ax3.axhline(y=P_single, color='r', linestyle='--', linewidth=1.5, label=label('two_market.single_price', price=P_single))
+    ax3.axvline(x=Q_asia_single+Q_europe_single, color='g', linestyle='--', linewidth=1,
+                label=label('two_market.total_quantity', q=Q_asia_single+Q_europe_single))
+    ax3.set_xlabel(label('two_market.total_xlabel'))
+    ax3.set_ylabel(label('two_market.ylabel'))
+    ax3.set_title(label('two_market.single_total'))
+    ax3.set_xlim(0, _nice_limit(Q_total[0]))
+    ax3.set_ylim(0, _nice_limit(P_total[-1]))
+    ax3.legend()
+    ax3.grid(True, alpha=0.3)
+
+    # 4. 双定价 - 亚洲市场
+    ax4 = axes[1, 0]
+    _market_lines(ax4, Q_asia, P_asia, P_asia_dual, Q_asia_dual)
+    # 用不同颜色突出显示消费者剩余
+    vertices = [(0, a_asia), (0, P_asia_dual), (Q_asia_dual, P_asia_dual),
+                (Q_asia_dual, a_asia - b_asia * Q_asia_dual)]
+    ax4.add_patch(Polygon(vertices, facecolor=highlight_color, alpha=0.6, label=label('two_market.cs')))
+    _finish_market(ax4, label('two_market.dual_asia'), *asia_lim)
+
+    # 5. 双定价 - 欧洲市场
+    ax5 = axes[1, 1]
+    _market_lines(ax5, Q_europe, P_europe, P_europe_dual, Q_europe_dual)
+    vertices_eu = [(0, a_europe), (0, P_europe_dual), (Q_europe_dual, P_europe_dual),
+                   (Q_europe_dual, a_europe - b_europe * Q_europe_dual)]
+    ax5.add_patch(Polygon(vertices_eu, facecolor=highlight_color, alpha=0.6, label=label('two_market.cs')))
+    _finish_market(ax5, label('two_market.dual_europe'), *europe_lim)
+
+    # 6. 消费者剩余对比 (亚洲和欧洲)
+    ax6 = axes[1, 2]
+    categories = [label(f'two_market.cat_{key}') for key in ('asia_single', 'asia_dual', 'europe_single', 'europe_dual')]
+    cs_values = [cs_asia_single, cs_asia_dual, cs_europe_single, cs_europe_dual]
+    colors_bar = [colors[0], colors[1], colors[0], colors[1]]
+    bars = ax6.bar(categories, cs_values, color=colors_bar, alpha=0.7)
+
+    step('annotate')
+    # 添加数值标签
+    for bar, value in zip(bars, cs_values):
+        height = bar.get_height()
+        ax6.text(bar.get_x() + bar.get_width()/2., height,
+                 f'{value:.1f}', ha='center', va='bottom')
+
+    # 突出显示最后一题讨论的消费者剩余变化区域
+    y_note = 0.5 * max(cs_values)
+    ax6.annotate(label('two_market.lobby_asia', gain=cs_asia_single - cs_asia_dual),
+                 xy=(0.5, (cs_asia_single + cs_asia_dual)/2),
+                 xytext=(0, y_note),
+                 arrowprops=dict(arrowstyle='->', color='red'),
+                 ha='center')
+    ax6.annotate(label('two_market.lobby_europe', gain=cs_europe_dual - cs_europe_single),
+                 xy=(2.5, (cs_europe_single + cs_europe_dual)/2),
+                 xytext=(3, y_note),
+                 arrowprops=dict(arrowstyle='->', color='green'),
+                 ha='center')
+
+    ax6.set_xlabel(label('two_market.bar_xlabel'))
+    ax6.set_ylabel(label('two_market.bar_ylabel'))
+    ax6.set_title(label('two_market.bar_title'))
+    ax6.grid(True, alpha=0.3, axis='y')
+    ax6.set_ylim(0, max(cs_values)*1.2)
+
+    # 添加总标题
+    fig.suptitle(label('two_market.suptitle'), fontsize=16, fontweight='bold')
+    step('layout')
+    tight_layout(fig)
+    return fig
@@ -0,0 +1,215 @@
+'''
+中文字体的解析与缓存
+原来每张图都把 font.sans-serif 设成 ['SimHei', 'Arial Unicode MS', 'DejaVu Sans'],
+在没有这些字体的 Linux 机器上 matplotlib 每次运行都要沿回退链查找, 并对每个汉字报一次缺字警告
+这里只解析一次实际可用的中文字体, 结果持久化在 ~/.cache/econ1210/fonts.json
+(按 matplotlib 版本和已安装字体列表失效), 之后的进程直接读取; 同一进程内只配置一次
+解析顺序:
+    1. 环境变量 ECON1210_FONT 指定的字体文件 (随项目分发的字体, 会注册到 font manager)
+    2. 常见中文字体名 (CJK_FAMILIES 的顺序)
+    3. 逐个检查已安装字体是否包含常用汉字
+都找不到时只警告一次, 之后在排版和编码时屏蔽 matplotlib 逐字的缺字警告 (quiet_missing_glyphs)
+用法:
+    python -m econ1210.fonts            # 显示解析结果
+    python -m econ1210.fonts --preload  # 构建 matplotlib 字体缓存并重新解析 (部署时执行一次)
+'''
+import argparse
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import time
+import warnings
+from pathlib import Path
+
+CJK_FAMILIES = (
+    'SimHei', 'Microsoft YaHei', 'PingFang SC', 'Heiti SC', 'Hiragino Sans GB', 'Arial Unicode MS',
+    'Noto Sans CJK SC', 'Noto Sans SC', 'Source Han Sans SC', 'Source Han Sans CN',
+    'WenQuanYi Zen Hei', 'WenQuanYi Micro Hei', 'Droid Sans Fallback', 'AR PL UMing CN',
+)
+# 检查字形覆盖用的汉字 (图中常用字)
+_PROBE = '价格数量消费者剩余无谓损失'
+# 对任何码位都画方框的占位字体, 覆盖检查会误判
+_PLACEHOLDER = ('Last Resort',)
+# 字体缓存的格式版本
+_FORMAT = 1
+
+# PDF/PS 字体嵌入方式: type3 为 matplotlib 默认; type42 嵌入 TrueType 子集, 文字可选中复制
+EMBED = {'type3': 3, 'type42': 42}
+
+_configured = None
+_MISSING_GLYPH = r'Glyph \d+ .*missing from'
+
+
+def _drop_missing_glyph(record):
+    return 'does not have a glyph' not in record.getMessage()
+
+
+@contextlib.contextmanager
+def quiet_missing_glyphs():
+    '''
+    没有中文字体时 (configure_fonts 已经警告过一次), with 块内屏蔽 matplotlib 逐字的缺字警告;
+    用 warnings.catch_warnings() 限定在块内, 不改动进程的警告过滤器
+    '''
+    if _configured is None or _configured['family'] is not None:
+        yield
+        return
+    with warnings.catch_warnings():
+        warnings.filterwarnings('ignore', message=_MISSING_GLYPH, category=UserWarning)
+        yield
+
+
+def default_cache_path():
+    return Path(os.environ.get('ECON1210_FONT_CACHE',
+                               Path.home() / '.cache' / 'econ1210' / 'fonts.json'))
+
+
+def _fingerprint(font_manager):
+    '''matplotlib 版本 + 已安装字体文件列表 的哈希, 装卸字体后缓存自动失效'''
+    import matplotlib
+    h = hashlib.sha256(f'{_FORMAT}:{matplotlib.__version__}'.encode())
+    for path in sorted({f.fname for f in font_manager.fontManager.ttflist}):
+        h.update(path.encode())
+    return h.hexdigest()[:16]
+
+
+def _covers(path, text):
+    '''字体文件是否包含 text 中的全部字形'''
+    from matplotlib.ft2font import FT2Font
+    try:
+        font = FT2Font(path)
+    except (OSError, RuntimeError):
+        return False
+    return all(font.get_char_index(ord(ch)) for ch in text)
+
+
+def _search(font_manager):
+    '''按字体名, 再按字形覆盖查找中文字体, 返回 (字体名, 文件路径) 或 (None, None)'''
+    fonts = [f for f in font_manager.fontManager.ttflist
+             if not f.name.startswith(_PLACEHOLDER)]
+    by_name = {}
+    for f in fonts:
+        by_name.setdefault(f.name, f.fname)
+    for family in CJK_FAMILIES:
+        if family in by_name:
+            return family, by_name[family]
+    checked = set()
+    for f in sorted(fonts, key=lambda f: (f.weight != 400, f.style != 'normal', f.name)):
+        if f.fname not in checked:
+            checked.add(f.fname)
+            if _covers(f.fname, _PROBE):
+                return f.name, f.fname
+    return None, None
+
+
+def _register(path):
+    '''注册随项目分发的字体文件, 返回它的字体名'''
+    from matplotlib import font_manager
+    font_manager.fontManager.addfont(path)
+    return font_manager.FontProperties(fname=path).get_name()
+
+
+def resolve_cjk_font(cache_path=None, refresh=False):
+    '''
+    返回 {'family': 字体名或 None, 'path': 文件路径, 'source': 'env'/'cache'/'search'}
+    解析结果写入 cache_path; refresh=True 时忽略已有缓存
+    '''
+    from matplotlib import font_manager
+
+    bundled = os.environ.get('ECON1210_FONT')
+    if bundled:
+        if not Path(bundled).is_file():
+            raise FileNotFoundError(f'ECON1210_FONT 指向的字体文件不存在: {bundled}')
+        return {'family': _register(bundled), 'path': bundled, 'source': 'env'}
+
+    cache_path = Path(cache_path or default_cache_path())
+    fingerprint = _fingerprint(font_manager)
+    if not refresh:
+        try:
+            cached = json.loads(cache_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            cached = None
+        if cached and cached.get('fingerprint') == fingerprint:
+            return {'family': cached['family'], 'path': cached['path'], 'source': 'cache'}
+
+    family, path = _search(font_manager)
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(json.dumps({'fingerprint': fingerprint, 'family': family, 'path': path},
+                                         ensure_ascii=False), encoding='utf-8')
+    except OSError:
+        pass  # 缓存目录不可写时每次重新解析, 不影响结果
+    return {'family': family, 'path': path, 'source': 'search'}
+
+
+def font_key():
+    '''当前使用的中文字体标识, 供图形缓存键使用; 只读持久化结果, 不导入 matplotlib'''
+    if os.environ.get('ECON1210_FONT'):
+        return os.environ['ECON1210_FONT']
+    if _configured is not None:
+        return _configured['family']
+    try:
+        return json.loads(default_cache_path().read_text(encoding='utf-8'))['family']
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def configure_fonts(embed=None, svg_text=False):
+    '''
+    设置中文字体和负号显示, 同一进程内只解析一次
+    embed: None 保持 matplotlib 默认, 'type3' / 'type42' 设置 PDF/PS 的字体嵌入方式
+    svg_text: True 时 SVG 里保留文字 (依赖查看方装有同名字体, 文件最小), 默认把字形转成路径
+    返回解析结果
+    '''
+    global _configured
+    import matplotlib
+
+    if _configured is None:
+        from econ1210.profiling import stage
+        with stage('fonts'):
+            _configured = resolve_cjk_font()
+        if _configured['family'] is None:
+            warnings.warn('没有找到可用的中文字体, 图中汉字会显示为方框; 请安装 Noto Sans CJK 等字体, '
+                          '或用环境变量 ECON1210_FONT 指定字体文件', stacklevel=2)
+            # 已经提示过一次, 不再逐字报缺字: mathtext 走 logging (同一个过滤函数只会加一次),
+            # 普通文字走 warnings, 由 quiet_missing_glyphs() 在排版和编码时局部屏蔽
+            logging.getLogger('matplotlib.mathtext').addFilter(_drop_missing_glyph)
+
+    family = _configured['family']
+    matplotlib.rcParams['font.sans-serif'] = [family, 'DejaVu Sans'] if family else ['DejaVu Sans']
+    matplotlib.rcParams['axes.unicode_minus'] = False
+    if embed is not None:
+        if embed not in EMBED:
+            raise ValueError(f'embed 只能是 {sorted(EMBED)}')
+        matplotlib.rcParams['pdf.fonttype'] = matplotlib.rcParams['ps.fonttype'] = EMBED[embed]
+    if svg_text:
+        matplotlib.rcParams['svg.fonttype'] = 'none'
+    return _configured
+
+
+def preload(refresh=True):
+    '''构建 matplotlib 的字体列表缓存并重新解析中文字体, 返回 (解析结果, 耗时秒)'''
+    start = time.perf_counter()
+    from matplotlib import font_manager  # 首次导入时扫描系统字体并写入 fontlist-*.json
+    font_manager.fontManager.ttflist
+    result = resolve_cjk_font(refresh=refresh)
+    return result, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='解析并缓存中文字体')
+    parser.add_argument('--preload', action='store_true', help='构建字体缓存并重新解析')
+    args = parser.parse_args(argv)
+
+    if args.preload:
+        result, elapsed = preload()
+        print(f'字体缓存已构建, 用时 {elapsed*1000:.0f}ms')
+    else:
+        result = resolve_cjk_font()
+    print(f"中文字体: {result['family'] or '未找到'} ({result['path'] or '-'}, 来源: {result['source']})")
+    print(f'缓存文件: {default_cache_path()}')
+
+
+if __name__ == '__main__':
+    main()
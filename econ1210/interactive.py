@@ -0,0 +1,196 @@
+'''
+Chapter 11 补贴图的交互滑块和动画导出
+图形只构建一次 (MonopolyView), 改变补贴时只更新动态 artist,
+并用 blitting 只重绘这些 artist: 背景 (坐标轴、静态曲线、网格) 缓存为位图,
+动态文字中不变的行也缓存为位图 (LineBitmaps)
+用法:
+    python -m econ1210.interactive                    # 打开带滑块的窗口
+    python -m econ1210.interactive --export subsidy.gif --fps 30
+'''
+import argparse
+import contextlib
+import functools
+import math
+
+import numpy as np
+
+
+class LineBitmaps:
+    '''
+    按行缓存 Agg 文字位图: Agg 每画一行都要重新排版并逐个字形光栅化, 一行几十个字就要几毫秒,
+    而动态文字的大多数行每帧都不变 (说明文本框的参数行、注释的标题行), 命中时直接贴图
+    键里含锚点的亚像素偏移, 贴出的像素与直接绘制完全相同; 只处理不旋转的普通文字 (非 mathtext)
+    '''
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._bitmaps = {}
+        self.hits = self.misses = 0
+
+    def draw_text(self, renderer, draw_text, gc, x, y, s, prop, angle, ismath=False, mtext=None):
+        if ismath or angle or not s:
+            return draw_text(gc, x, y, s, prop, angle, ismath, mtext)
+        # y 向下; 整数部分决定贴图位置, 小数部分决定字形的光栅化结果
+        fx, fy = x - math.floor(x), y - math.floor(y)
+        key = (s, hash(prop), tuple(gc.get_rgb()), gc.get_alpha(), gc.get_antialiased(),
+               renderer.dpi, fx, fy)
+        entry = self._bitmaps.get(key)
+        if entry is None:
+            entry = self._render(renderer, gc, fx, fy, s, prop, mtext)
+            if len(self._bitmaps) >= self.maxsize:
+                self._bitmaps.clear()
+            self._bitmaps[key] = entry
+            self.misses += 1
+        else:
+            self.hits += 1
+        image, ascent, pad = entry
+        top = math.floor(y) - ascent
+        renderer.draw_image(gc, math.floor(x) - pad, renderer.height - top - image.shape[0], image)
+
+    @staticmethod
+    def _render(renderer, gc, fx, fy, s, prop, mtext):
+        '''在透明的小画布上画这一行, 返回 (自下而上的 RGBA 位图, 基线以上的像素数, 左侧留白)'''
+        import matplotlib.text as mtext_module
+        from matplotlib.backends.backend_agg import RendererAgg
+
+        w, h, d = mtext_module._get_text_metrics_with_cache(renderer, s, prop, False, renderer.dpi)
+        pad = 2
+        ascent = math.ceil(h - d) + pad
+        sub = RendererAgg(math.ceil(w) + 2 * pad + 1, math.ceil(h) + 2 * pad + 1, renderer.dpi)
+        sub_gc = sub.new_gc()
+        sub_gc.copy_properties(gc)
+        sub_gc.set_clip_rectangle(None)
+        sub_gc.set_clip_path(None)
+        sub.draw_text(sub_gc, pad + fx, ascent + fy, s, prop, 0, False, mtext)
+        sub_gc.restore()
+        # draw_image 的第一行是图像底边
+        return np.asarray(sub.buffer_rgba())[::-1].copy(), ascent, pad
+
+    @contextlib.contextmanager
+    def installed(self, renderer):
+        '''with 块内该渲染器的 draw_text 走缓存'''
+        draw_text = renderer.draw_text
+        renderer.draw_text = functools.partial(self.draw_text, renderer, draw_text)
+        try:
+            yield
+        finally:
+            del renderer.draw_text
+
+
+class Blitter:
+    '''
+    缓存画布背景, 每帧恢复背景后只画动态 artist 再 blit
+    画布尺寸变化 (draw_event) 时重新抓取背景; 动态文字按行缓存位图 (LineBitmaps)
+    '''
+
+    def __init__(self, canvas, artists):
+        self.canvas = canvas
+        self.artists = artists
+        self.background = None
+        self.lines = LineBitmaps()
+        self._cid = canvas.mpl_connect('draw_event', self._on_draw)
+
+    def _on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self._draw_artists()
+
+    def _draw_artists(self):
+        figure = self.canvas.figure
+        renderer = self.canvas.get_renderer()
+        with self.lines.installed(renderer):
+            for artist in self.artists:
+                figure.draw_artist(artist)
+
+    def refresh(self):
+        if self.background is None:
+            self.canvas.draw()
+            return
+        self.canvas.restore_region(self.background)
+        self._draw_artists()
+        self.canvas.blit(self.canvas.figure.bbox)
+        self.canvas.flush_events()
+
+
+def slider_artists(slider):
+    '''滑块里随取值变化的 artist (滑块条、初始值标记、把手、数值文字), 按原来的绘制顺序'''
+    names = ('poly', 'vline' if slider.orientation == 'horizontal' else 'hline', '_handle', 'valtext')
+    return [getattr(slider, name) for name in names if hasattr(slider, name)]
+
+
+def monopoly_slider(a=146.0, b=0.5, mc=4.0, subsidy=29.0, subsidy_range=(0.0, 80.0)):
+    '''打开带补贴滑块的交互窗口, 返回 (view, slider) 以免被垃圾回收'''
+    import matplotlib.pyplot as plt
+    from matplotlib.widgets import Slider
+
+    from econ1210.figures.monopoly import MonopolyView
+    from econ1210.fonts import quiet_missing_glyphs
+
+    view = MonopolyView(a, b, mc, subsidy, animated=True)
+    view.fig.subplots_adjust(bottom=0.14)
+    slider_ax = view.fig.add_axes([0.15, 0.03, 0.7, 0.03])
+    slider = Slider(slider_ax, '补贴', *subsidy_range, valinit=subsidy)
+    # 滑块默认每次 set_val 都 draw_idle() 整张图, blitting 就白做了; 它的 artist 改由 Blitter 重画
+    slider.drawon = False
+    moving = slider_artists(slider)
+    for artist in moving:
+        artist.set_animated(True)
+
+    blitter = Blitter(view.fig.canvas, view.dynamic_artists + moving)
+
+    def on_change(value):
+        view.update(value)
+        blitter.refresh()
+
+    slider.on_changed(on_change)
+    with quiet_missing_glyphs():
+        plt.show()
+    return view, slider
+
+
+def export_monopoly_animation(path, subsidies=None, fps=30, dpi=100,
+                              a=146.0, b=0.5, mc=4.0):
+    '''
+    把补贴从 0 扫到 80 的过程导出为 MP4 (ffmpeg) 或 GIF (Pillow)
+    每帧只调用 view.update(), 由 FuncAnimation(blit=True) 负责增量重绘
+    '''
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib.animation import FFMpegWriter, FuncAnimation, PillowWriter
+
+    from econ1210.figures.monopoly import MonopolyView
+    from econ1210.fonts import quiet_missing_glyphs
+
+    if subsidies is None:
+        subsidies = np.linspace(0.0, 80.0, 4 * fps)
+    view = MonopolyView(a, b, mc, subsidies[0], animated=True)
+
+    if str(path).endswith('.gif'):
+        writer = PillowWriter(fps=fps)
+    elif FFMpegWriter.isAvailable():
+        writer = FFMpegWriter(fps=fps)
+    else:
+        raise RuntimeError('未找到 ffmpeg, 请安装 ffmpeg 或改为导出 .gif')
+
+    anim = FuncAnimation(view.fig, view.update, frames=subsidies,
+                         init_func=lambda: view.dynamic_artists, blit=True)
+    with quiet_missing_glyphs():
+        anim.save(path, writer=writer, dpi=dpi)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='补贴图的交互滑块 / 动画导出')
+    parser.add_argument('--export', metavar='PATH', help='导出 .mp4 或 .gif 而不是打开窗口')
+    parser.add_argument('--fps', type=int, default=30)
+    parser.add_argument('--dpi', type=int, default=100)
+    parser.add_argument('--subsidy', type=float, default=29.0)
+    args = parser.parse_args(argv)
+
+    if args.export:
+        export_monopoly_animation(args.export, fps=args.fps, dpi=args.dpi)
+    else:
+        monopoly_slider(subsidy=args.subsidy)
+
+
+if __name__ == '__main__':
+    main()
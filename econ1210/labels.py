@@ -0,0 +1,430 @@
+'''
+图中文字的模板、尺寸缓存与排版
+批量渲染成千上万个参数变体时, 文字的解析和测量占了不小的比例:
+  1. 文字模板 TEMPLATES: 第 7、11、12 章图中的标签按 键 -> {语言: 格式串} 集中存放, label() 按当前语言填入数值
+     (环境变量 ECON1210_LANG=zh|en, 默认中文)
+  2. 文字尺寸缓存: matplotlib 的文字尺寸缓存挂在渲染器实例上, 每张新图都要重新测量 (含 mathtext 解析);
+     text_cache() 块内换成按 渲染器类型 + 字体相关 rcParams + 字符串 + 字体 + 字号 + dpi 跨图共享的缓存
+  3. tight_layout(fig): 先按数据坐标、对齐方式和缓存的文字尺寸推算每个 ax.text / annotate 的文字框,
+     完全落在坐标轴内的不参与 tight_layout 的边界测量 (它们不影响结果, 却要逐个排版);
+     调整后再核对一次, 万一有文字被挤出坐标轴就把它放回来重新调整
+'''
+import contextlib
+import os
+import weakref
+
+ENV_LANG = 'ECON1210_LANG'
+ENV_TEXT_CACHE = 'ECON1210_TEXT_CACHE'
+LANGUAGES = ('zh', 'en')
+
+TEMPLATES = {
+    # Chapter 7: 价格上限下的四种分配机制
+    'four_case.suptitle': {'zh': '价格上限下的四种分配机制', 'en': 'Four allocation mechanisms under a price ceiling'},
+    'four_case.demand': {'zh': '需求曲线', 'en': 'Demand'},
+    'four_case.supply': {'zh': '供给曲线', 'en': 'Supply'},
+    'four_case.ceiling': {'zh': '价格上限 (P={p:g})', 'en': 'Price ceiling (P={p:g})'},
+    'four_case.equilibrium': {'zh': '均衡点', 'en': 'Equilibrium'},
+    'four_case.equilibrium_at': {'zh': '均衡点 (Q={q:g}, P={p:g})', 'en': 'Equilibrium (Q={q:g}, P={p:g})'},
+    'four_case.xlabel': {'zh': '数量 (Q)', 'en': 'Quantity (Q)'},
+    'four_case.ylabel': {'zh': '价格 (P)', 'en': 'Price (P)'},
+    'four_case.title_ideal': {'zh': '1. 理想分配（按支付意愿分配）', 'en': '1. Ideal allocation (by willingness to pay)'},
+    'four_case.title_bribe': {'zh': '2. 行贿分配', 'en': '2. Allocation by bribery'},
+    'four_case.title_waste': {'zh': '3. 浪费性竞争（如排队）', 'en': '3. Wasteful competition (e.g. queueing)'},
+    'four_case.title_random': {'zh': '4. 随机分配（未给评价最高者）', 'en': '4. Random allocation (not to highest values)'},
+    'four_case.cs': {'zh': '消费者剩余: {v:.1f}', 'en': 'Consumer surplus: {v:.1f}'},
+    'four_case.cs_net': {'zh': '消费者净剩余: {v:.1f}', 'en': 'Net consumer surplus: {v:.1f}'},
+    'four_case.ps': {'zh': '生产者剩余: {v:.1f}', 'en': 'Producer surplus: {v:.1f}'},
+    'four_case.dwl': {'zh': '无谓损失: {v:.1f}', 'en': 'Deadweight loss: {v:.1f}'},
+    'four_case.ps_unchanged': {'zh': '生产者剩余不变', 'en': 'Producer surplus unchanged'},
+    'four_case.bribe': {'zh': '贿赂转移', 'en': 'Bribe transfer'},
+    'four_case.bribe_value': {'zh': '贿赂转移: {v:.1f}', 'en': 'Bribe transfer: {v:.1f}'},
+    'four_case.waste': {'zh': '竞争浪费', 'en': 'Wasted competition'},
+    'four_case.waste_value': {'zh': '浪费成本: {v:.1f}', 'en': 'Waste cost: {v:.1f}'},
+    'four_case.surplus_falls': {'zh': '社会总剩余减少', 'en': 'Total surplus falls'},
+    'four_case.allocation_loss': {'zh': '误配损失: {v:.1f}', 'en': 'Misallocation loss: {v:.1f}'},
+    'four_case.efficiency_loss': {'zh': '分配效率损失', 'en': 'Allocative efficiency loss'},
+    'four_case.efficiency_loss_value': {'zh': '分配效率损失: {v:.1f}', 'en': 'Allocative efficiency loss: {v:.1f}'},
+    # Chapter 11: 垄断补贴
+    'monopoly.demand': {
+        'zh': '原需求曲线 (消费者) $P_c = {a:g} - {b:g}Q$',
+        'en': 'Original demand (consumers) $P_c = {a:g} - {b:g}Q$',
+    },
+    'monopoly.mc': {'zh': '边际成本 MC = {mc:g}', 'en': 'Marginal cost MC = {mc:g}'},
+    'monopoly.mr': {
+        'zh': '原边际收益 MR = {a:g} - {b2:g}Q',
+        'en': 'Original marginal revenue MR = {a:g} - {b2:g}Q',
+    },
+    'monopoly.ps': {
+        'zh': '补贴后生产者面对需求曲线 $P_s = {a:g} - {b:g}Q$',
+        'en': 'Demand faced by producers after subsidy $P_s = {a:g} - {b:g}Q$',
+    },
+    'monopoly.ps_static': {
+        'zh': '补贴后生产者面对需求曲线 $P_s = P_c + s$',
+        'en': 'Demand faced by producers after subsidy $P_s = P_c + s$',
+    },
+    'monopoly.mr_s': {
+        'zh': '补贴后边际收益 MR\' = {a:g} - {b2:g}Q',
+        'en': 'Marginal revenue after subsidy MR\' = {a:g} - {b2:g}Q',
+    },
+    'monopoly.mr_s_static': {'zh': '补贴后边际收益 MR\'', 'en': 'Marginal revenue after subsidy MR\''},
+    'monopoly.dwl': {'zh': '原无谓损失 = {dwl:g}', 'en': 'Original deadweight loss = {dwl:g}'},
+    'monopoly.dwl_s': {'zh': '补贴后无谓损失 = {dwl:.1f}', 'en': 'Deadweight loss after subsidy = {dwl:.1f}'},
+    'monopoly.dwl_s_static': {'zh': '补贴后无谓损失', 'en': 'Deadweight loss after subsidy'},
+    'monopoly.point_a': {'zh': 'A: 原垄断均衡\nQ={q:g}, P={p:g}', 'en': 'A: monopoly equilibrium\nQ={q:g}, P={p:g}'},
+    'monopoly.point_c': {'zh': 'C: 社会最优\nQ={q:g}, P={p:g}', 'en': 'C: social optimum\nQ={q:g}, P={p:g}'},
+    'monopoly.consumer': {'zh': 'Bc: 消费者支付\nQ={q:g}, P={p:.1f}', 'en': 'Bc: consumers pay\nQ={q:g}, P={p:.1f}'},
+    'monopoly.producer': {'zh': 'Bs: 生产者收到\nQ={q:g}, P={p:.1f}', 'en': 'Bs: producers receive\nQ={q:g}, P={p:.1f}'},
+    'monopoly.subsidy': {'zh': '补贴\n{s:g}美元', 'en': 'Subsidy\n${s:g}'},
+    'monopoly.xlabel': {'zh': '数量 Q (百万单位/年)', 'en': 'Quantity Q (million units/year)'},
+    'monopoly.ylabel': {'zh': '价格 P (美元/单位)', 'en': 'Price P ($/unit)'},
+    'monopoly.title': {
+        'zh': '垄断市场补贴政策对无谓损失的影响',
+        'en': 'Effect of a subsidy on monopoly deadweight loss',
+    },
+    'monopoly.textbox': {
+        'zh': '关键参数:\n'
+              '• 需求: P = {a:g} - {b:g}Q\n'
+              '• 边际成本: MC = {mc:g}\n'
+              '• 补贴: {s:g}美元/单位\n'
+              '\n'
+              '关键结果:\n'
+              '• 原垄断: Q={qm:g}, P={pm:g}\n'
+              '• 补贴后: Q={qs:g}, Pc={pc:.1f}, Ps={ps:.1f}\n'
+              '• 社会最优: Q={qc:g}, P={pcomp:g}\n'
+              '• 补贴后DWL: {dwl:.1f}',
+        'en': 'Parameters:\n'
+              '• Demand: P = {a:g} - {b:g}Q\n'
+              '• Marginal cost: MC = {mc:g}\n'
+              '• Subsidy: ${s:g}/unit\n'
+              '\n'
+              'Results:\n'
+              '• Monopoly: Q={qm:g}, P={pm:g}\n'
+              '• With subsidy: Q={qs:g}, Pc={pc:.1f}, Ps={ps:.1f}\n'
+              '• Social optimum: Q={qc:g}, P={pcomp:g}\n'
+              '• DWL with subsidy: {dwl:.1f}',
+    },
+    # Chapter 12: 两市场定价
+    'two_market.demand': {'zh': '需求曲线', 'en': 'Demand'},
+    'two_market.price': {'zh': '价格=${price:g}', 'en': 'Price=${price:g}'},
+    'two_market.quantity': {'zh': '数量={q:.2f}', 'en': 'Quantity={q:.2f}'},
+    'two_market.cs': {'zh': '消费者剩余', 'en': 'Consumer surplus'},
+    'two_market.xlabel': {'zh': '数量 (百万单位)', 'en': 'Quantity (million units)'},
+    'two_market.ylabel': {'zh': '价格 ($)', 'en': 'Price ($)'},
+    'two_market.single_asia': {'zh': '统一定价 - 亚洲市场', 'en': 'Uniform pricing - Asia'},
+    'two_market.single_europe': {'zh': '统一定价 - 欧洲市场', 'en': 'Uniform pricing - Europe'},
+    'two_market.single_total': {'zh': '统一定价 - 总市场', 'en': 'Uniform pricing - total market'},
+    'two_market.dual_asia': {'zh': '双定价 - 亚洲市场 (CS较小)', 'en': 'Dual pricing - Asia (smaller CS)'},
+    'two_market.dual_europe': {'zh': '双定价 - 欧洲市场 (CS较大)', 'en': 'Dual pricing - Europe (larger CS)'},
+    'two_market.total_demand': {'zh': '总需求曲线', 'en': 'Total demand'},
+    'two_market.single_price': {'zh': '统一定价=${price:g}', 'en': 'Uniform price=${price:g}'},
+    'two_market.total_quantity': {'zh': '总数量={q:.2f}', 'en': 'Total quantity={q:.2f}'},
+    'two_market.total_xlabel': {'zh': '总数量 (百万单位)', 'en': 'Total quantity (million units)'},
+    'two_market.cat_asia_single': {'zh': '亚洲-统一定价', 'en': 'Asia-uniform'},
+    'two_market.cat_asia_dual': {'zh': '亚洲-双定价', 'en': 'Asia-dual'},
+    'two_market.cat_europe_single': {'zh': '欧洲-统一定价', 'en': 'Europe-uniform'},
+    'two_market.cat_europe_dual': {'zh': '欧洲-双定价', 'en': 'Europe-dual'},
+    'two_market.lobby_asia': {
+        'zh': '亚洲消费者:\n愿意花${gain:.1f}M\n游说统一定价',
+        'en': 'Asian consumers:\nwould pay ${gain:.1f}M\nto lobby for uniform',
+    },
+    'two_market.lobby_europe': {
+        'zh': '欧洲消费者:\n愿意花${gain:.0f}M\n游说双定价',
+        'en': 'European consumers:\nwould pay ${gain:.0f}M\nto lobby for dual',
+    },
+    'two_market.bar_xlabel': {'zh': '定价制度', 'en': 'Pricing regime'},
+    'two_market.bar_ylabel': {'zh': '消费者剩余 (百万$)', 'en': 'Consumer surplus ($M)'},
+    'two_market.bar_title': {'zh': '消费者剩余对比 (d)(e)题重点分析)', 'en': 'Consumer surplus comparison (parts d, e)'},
+    'two_market.suptitle': {
+        'zh': 'Microsoft Windows定价策略分析: 统一定价 vs 双定价',
+        'en': 'Microsoft Windows pricing: uniform vs dual pricing',
+    },
+}
+
+_language = None
+
+
+def language():
+    '''当前语言: set_language() 设置的值, 否则取环境变量 ECON1210_LANG, 默认 zh'''
+    lang = _language or os.environ.get(ENV_LANG, 'zh').strip().lower() or 'zh'
+    if lang not in LANGUAGES:
+        raise ValueError(f'{ENV_LANG} 只能是 {LANGUAGES}, 收到 {lang!r}')
+    return lang
+
+
+def set_language(lang):
+    '''设置本进程的图中文字语言; None 表示恢复为环境变量 / 默认值'''
+    global _language
+    if lang is not None and lang not in LANGUAGES:
+        raise ValueError(f'语言只能是 {LANGUAGES}')
+    _language = lang
+
+
+def label(key, lang=None, **values):
+    '''按模板生成标签文字'''
+    return TEMPLATES[key][lang or language()].format(**values)
+
+
+# ---- 跨图的文字尺寸缓存 ----
+
+# 影响文字尺寸的 rcParams (字体回退链、hinting、mathtext 字体、各矢量后端的字体方式)
+_RC_PREFIXES = ('font.', 'text.', 'mathtext.', 'pdf.', 'ps.', 'svg.')
+
+_metrics = {}
+_renderer_keys = weakref.WeakKeyDictionary()
+_stats = {'hits': 0, 'misses': 0}
+_maxsize = 65536
+_enabled = os.environ.get(ENV_TEXT_CACHE, '1').strip().lower() not in ('0', 'off', 'false')
+# text_cache() 的嵌套层数与被替换下来的 matplotlib 函数
+_depth = 0
+_original = None
+
+
+def _renderer_key(renderer):
+    # 同一个渲染器在生命周期内 rcParams 不会变, 每个渲染器只算一次
+    try:
+        return _renderer_keys[renderer]
+    except (KeyError, TypeError):
+        import matplotlib
+        rc = matplotlib.rcParams
+        key = (type(renderer), tuple((k, repr(rc[k])) for k in sorted(rc) if k.startswith(_RC_PREFIXES)))
+        try:
+            _renderer_keys[renderer] = key
+        except TypeError:
+            pass
+        return key
+
+
+def _font_key(prop):
+    return (tuple(prop.get_family()), prop.get_style(), prop.get_variant(), prop.get_weight(),
+            prop.get_stretch(), prop.get_size_in_points(), prop.get_file(), prop.get_math_fontfamily())
+
+
+def _cached_metrics(renderer, text, fontprop, ismath, dpi):
+    '''替换 matplotlib.text._get_text_metrics_with_cache, 返回 (宽, 高, 下沉), 单位像素'''
+    key = (_renderer_key(renderer), text, _font_key(fontprop), ismath, dpi)
+    try:
+        result = _metrics[key]
+    except KeyError:
+        result = _original(renderer, text, fontprop, ismath, dpi)
+        if len(_metrics) >= _maxsize:
+            _metrics.clear()
+        _metrics[key] = result
+        _stats['misses'] += 1
+        return result
+    _stats['hits'] += 1
+    return result
+
+
+def set_text_cache(enabled, maxsize=None):
+    '''打开 / 关闭跨图的文字尺寸缓存 (默认按环境变量 ECON1210_TEXT_CACHE, 0 表示关闭); 关闭时清空'''
+    global _enabled, _maxsize
+    _enabled = bool(enabled)
+    if maxsize is not None:
+        _maxsize = maxsize
+    if not _enabled:
+        clear_text_cache()
+
+
+@contextlib.contextmanager
+def text_cache():
+    '''
+    with 块内把 matplotlib.text._get_text_metrics_with_cache 换成跨图共享的缓存, 退出时换回 (可嵌套)
+    只包住本仓库自己的排版和编码 (tight_layout、export.to_array / to_bytes), 不改动进程里其他地方的绘图;
+    缓存关闭或 matplotlib 没有这个内部函数时什么也不做
+    '''
+    global _original, _depth
+    import matplotlib.text as mtext
+    if not _enabled or (_depth == 0 and not hasattr(mtext, '_get_text_metrics_with_cache')):
+        yield
+        return
+    if _depth == 0:
+        _original = mtext._get_text_metrics_with_cache
+        mtext._get_text_metrics_with_cache = _cached_metrics
+    _depth += 1
+    try:
+        yield
+    finally:
+        _depth -= 1
+        if _depth == 0:
+            mtext._get_text_metrics_with_cache = _original
+            _original = None
+
+
+def clear_text_cache():
+    _metrics.clear()
+    _stats.update(hits=0, misses=0)
+
+
+def text_cache_info():
+    '''命中数、未命中数、条目数, 以及缓存是否打开'''
+    return {**_stats, 'size': len(_metrics), 'enabled': _enabled}
+
+
+# ---- 不经渲染推算文字框, 据此减少 tight_layout 的测量 ----
+
+# 推算误差与箭头头部的余量 (磅); 设为 math.inf 时不排除任何文字, 等同 fig.tight_layout
+PAD_POINTS = 4.0
+
+
+def _measure(renderer, text, prop, ismath):
+    '''在 text_cache() 块内调用; 没有 matplotlib 的内部函数时直接问渲染器'''
+    import matplotlib.text as mtext
+    if hasattr(mtext, '_get_text_metrics_with_cache'):
+        return mtext._get_text_metrics_with_cache(renderer, text, prop, ismath, 72)
+    return renderer.get_text_width_height_descent(text, prop, ismath)
+
+
+def _to_axes(ax, x, y):
+    '''数据坐标 -> 坐标轴比例 (只处理线性坐标轴)'''
+    x0, x1 = ax.get_xlim()
+    y0, y1 = ax.get_ylim()
+    return (x - x0) / (x1 - x0), (y - y0) / (y1 - y0)
+
+
+def _anchor(text, ax):
+    '''文字锚点与 (注释的) 箭头终点的坐标轴比例坐标; 坐标系不是数据/坐标轴比例时返回 None'''
+    from matplotlib.text import Annotation
+
+    if isinstance(text, Annotation):
+        if text.xycoords != 'data' or text.anncoords not in (None, 'data'):
+            return None
+        x, y = text.xyann
+        return _to_axes(ax, x, y), _to_axes(ax, *text.xy)
+    x, y = text.get_unitless_position()
+    transform = text.get_transform()
+    if transform is ax.transData:
+        return _to_axes(ax, x, y), None
+    if transform is ax.transAxes:
+        return (x, y), None
+    return None
+
+
+_vertical = {}
+
+
+def _vertical_metrics(renderer, prop):
+    '''字体的 (上升, 下沉, 行距) 磅值, 与 matplotlib 排多行文字时取的字体度量相同'''
+    key = (_renderer_key(renderer), _font_key(prop))
+    try:
+        return _vertical[key]
+    except KeyError:
+        pass
+    from matplotlib.font_manager import fontManager, get_font
+
+    font = get_font(fontManager._find_fonts_by_props(prop))
+    result = None
+    for table_name, gap_key, ascent_key, descent_key in (
+            ('OS/2', 'sTypoLineGap', 'sTypoAscender', 'sTypoDescender'),
+            ('hhea', 'lineGap', 'ascent', 'descent')):
+        table = font.get_sfnt_table(table_name)
+        if table is not None:
+            scale = prop.get_size_in_points() / font.get_sfnt_table('head')['unitsPerEm']
+            result = table[ascent_key] * scale, -table[descent_key] * scale, table[gap_key] * scale
+            break
+    if result is None:
+        _, h, d = _measure(renderer, 'lp', prop, False)
+        result = h - d, d, 0.0
+    _vertical[key] = result
+    return result
+
+
+def _box_points(text, renderer):
+    '''文字框相对锚点的范围 (左, 下, 右, 上), 单位磅; 按 matplotlib 的多行排版规则推算'''
+    prop = text.get_fontproperties()
+    min_ascent, min_descent, line_gap = _vertical_metrics(renderer, prop)
+    lines = text.get_text().split('\n')
+    if len(lines) == 1:
+        line_gap = 0.0
+    spacing = text.get_linespacing()
+    width = height = 0.0
+    for line in lines:
+        clean, ismath = text._preprocess_math(line)
+        w, h, d = _measure(renderer, clean, prop, ismath) if clean else (0.0, 0.0, 0.0)
+        a = h - d
+        if spacing == 'normal':
+            a = max(a, min_ascent) + line_gap / 2
+            d = max(d, min_descent) + line_gap / 2
+        else:
+            leading = spacing * (min_ascent + min_descent) - (a + d)
+            a += leading / 2
+            d += leading / 2
+        width = max(width, w)
+        height += a + d
+    # d 此时是最后一行的下沉; baseline 对齐的是最后一行的基线
+
+    ha = text.get_horizontalalignment()
+    left = {'left': 0.0, 'center': -width / 2, 'right': -width}[ha]
+    va = text.get_verticalalignment()
+    if va == 'top':
+        bottoms = [-height]
+    elif va == 'center':
+        bottoms = [-height / 2]
+    elif va == 'bottom':
+        bottoms = [0.0]
+    elif va == 'baseline':
+        bottoms = [-d]
+    else:  # center_baseline: 取 center 与 baseline 两种位置的并集, 偏大估计
+        bottoms = [-height / 2, -d]
+    bottom, top = min(bottoms), max(bottoms) + height
+    pad = 0.0
+    patch = text.get_bbox_patch()
+    if patch is not None:
+        pad = getattr(patch.get_boxstyle(), 'pad', 0.3) * text.get_fontsize() + patch.get_linewidth()
+    return left - pad, bottom - pad, left + width + pad, top + pad
+
+
+def _inside(text, ax, renderer, pad):
+    '''文字框 (以及注释箭头的两端) 是否完全落在坐标轴内'''
+    if (not text.get_visible() or text.get_rotation() % 360 or text.get_usetex() or text.get_wrap()
+            or ax.get_xscale() != 'linear' or ax.get_yscale() != 'linear'):
+        return False
+    anchor = _anchor(text, ax)
+    if anchor is None:
+        return False
+    (fx, fy), target = anchor
+    fig = ax.figure
+    pos = ax.get_position()
+    width_pt = pos.width * fig.get_figwidth() * 72
+    height_pt = pos.height * fig.get_figheight() * 72
+    left, bottom, right, top = _box_points(text, renderer)
+    mx, my = pad / width_pt, pad / height_pt
+    inside = (fx + left / width_pt >= mx and fx + right / width_pt <= 1 - mx
+              and fy + bottom / height_pt >= my and fy + top / height_pt <= 1 - my)
+    if inside and target is not None:
+        tx, ty = target
+        inside = mx <= tx <= 1 - mx and my <= ty <= 1 - my
+    return inside
+
+
+def tight_layout(fig, pad_points=None, **kwargs):
+    '''
+    与 fig.tight_layout(**kwargs) 结果相同, 但推算出完全在坐标轴内的文字不参与边界测量
+    返回被排除的文字个数
+    '''
+    from matplotlib.backends.backend_agg import RendererAgg
+    from econ1210.fonts import quiet_missing_glyphs
+
+    if pad_points is None:
+        pad_points = PAD_POINTS
+    renderer = RendererAgg(1, 1, 72)
+    with text_cache(), quiet_missing_glyphs():
+        return _tight_layout(fig, renderer, pad_points, kwargs)
+
+
+def _tight_layout(fig, renderer, pad_points, kwargs):
+    candidates = [text for ax in fig.axes for text in ax.texts if text.get_in_layout()]
+    excluded = [text for text in candidates if _inside(text, text.axes, renderer, pad_points)]
+    for text in excluded:
+        text.set_in_layout(False)
+    try:
+        fig.tight_layout(**kwargs)
+        # 调整后坐标轴变小时, 原先在内的文字可能被挤到外面: 放回来再调整一次
+        escaped = [text for text in excluded if not _inside(text, text.axes, renderer, pad_points)]
+        if escaped:
+            for text in escaped:
+                text.set_in_layout(True)
+            fig.tight_layout(**kwargs)
+    finally:
+        for text in excluded:
+            text.set_in_layout(True)
+    return len(excluded) - len(escaped)
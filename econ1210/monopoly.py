@@ -0,0 +1,49 @@
+'''
+垄断市场补贴模型的向量化求解器 (Chapter 11)
+需求: P = a - b*Q, 边际成本: MC = c (常数), 每单位补贴: s (支付给生产者)
+所有参数都可以是 NumPy 数组, 按广播规则一次性求解全部情景, 没有 Python 循环
+'''
+import numpy as np
+
+from econ1210.welfare import deadweight_loss, linear_demand, transfer_area
+
+
+def solve_monopoly_subsidy(a, b, c, s=0.0):
+    '''
+    求解垄断/补贴后垄断/竞争均衡, 以及补贴前后的无谓损失和补贴成本
+    a: 需求截距, b: 需求斜率(取正值), c: 边际成本, s: 每单位补贴
+    返回字典, 每个值都是广播后形状相同的数组
+    '''
+    a, b, c, s = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (a, b, c, s)))
+
+    # 社会最优（竞争均衡）: P = MC => a - b*Q = c
+    q_competitive = np.maximum((a - c) / b, 0.0)
+    p_competitive = a - b * q_competitive
+
+    # 原垄断均衡: MR = a - 2b*Q = c
+    q_monopoly = 0.5 * q_competitive
+    p_monopoly = a - b * q_monopoly
+
+    # 补贴后垄断均衡: 生产者面对 P_s = (a + s) - b*Q, MR' = a + s - 2b*Q = c
+    q_subsidy = np.maximum((a + s - c) / (2.0 * b), 0.0)
+    p_consumer = a - b * q_subsidy      # 消费者支付的价格
+    p_producer = p_consumer + s         # 生产者收到的价格
+
+    # 无谓损失: 需求曲线与MC之间、成交量到社会最优产量的面积
+    # (补贴过大导致过度生产时同样为正)
+    demand = linear_demand(a, b)
+    dwl_monopoly = deadweight_loss(demand, c, q_monopoly, q_competitive)
+    dwl_subsidy = deadweight_loss(demand, c, q_subsidy, q_competitive)
+
+    return {
+        'q_monopoly': q_monopoly,
+        'p_monopoly': p_monopoly,
+        'q_subsidy': q_subsidy,
+        'p_consumer': p_consumer,
+        'p_producer': p_producer,
+        'q_competitive': q_competitive,
+        'p_competitive': p_competitive,
+        'dwl_monopoly': dwl_monopoly,
+        'dwl_subsidy': dwl_subsidy,
+        'subsidy_cost': transfer_area(s, q_subsidy),
+    }
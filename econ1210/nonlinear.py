@@ -0,0 +1,536 @@
+'''
+非线性需求与递增边际成本下的批量均衡求解
+需求族 (都写成反需求 P(Q), 参数可以是数组):
+  ConstantElasticity(scale, elasticity):  Q = scale * P^(-elasticity), 需要 elasticity > 1
+  LogLinear(alpha, beta):                 ln Q = alpha - beta*P
+  LinearDemand(a, b):                     P = a - b*Q (用来和各章的闭式解对照)
+成本: PowerCost(c, d, power): MC = c + d*Q^power (d=0 为常数边际成本)
+各均衡条件都化成每个情景一个单调的标量方程, 未知数是共同的边际成本水平 lam:
+    lam = MC(sum_i q_i(lam - s))
+q_i 取边际收益的反函数 (垄断 MR = MC, 分市场定价 MR_i = MC(总产量)) 或需求的反函数
+(竞争 D = S, 有效配置), s 为每单位补贴; 统一定价另解利润的一阶条件
+方程用 solve_root 批量求解: 向量化的带保护 Newton 法, 步长跳出有根区间或收缩太慢时改用二分,
+每个元素收敛后就从活动集中移除, 10^6 个情景只需要十几次数组运算
+'''
+import argparse
+import time
+
+import numpy as np
+
+from econ1210.welfare import Linear, area_between, consumer_surplus
+
+
+# ---------- 需求与成本 ----------
+
+class ConstantElasticity:
+    '''Q = scale * P^(-elasticity), 即 P = (Q/scale)^(-1/elasticity)'''
+
+    def __init__(self, scale, elasticity):
+        self.scale = np.asarray(scale, dtype=float)
+        self.elasticity = np.asarray(elasticity, dtype=float)
+        self.params = (self.scale, self.elasticity)
+
+    def __call__(self, q):
+        with np.errstate(divide='ignore'):
+            return (q / self.scale) ** (-1.0 / self.elasticity)
+
+    def integral(self, q0, q1):
+        k = 1.0 - 1.0 / self.elasticity
+        return self.scale ** (1.0 / self.elasticity) * (q1 ** k - q0 ** k) / k
+
+    def quantity(self, p):
+        '''需求量 Q(P) 及其一阶、二阶导数'''
+        e = self.elasticity
+        with np.errstate(divide='ignore'):
+            q = self.scale * p ** (-e)
+            return q, -e * q / p, e * (e + 1.0) * q / p ** 2
+
+    def mr_quantity(self, m):
+        '''MR = P(1 - 1/e) = m 时的产量及其对 m 的导数; m <= 0 时产量无界'''
+        e = self.elasticity
+        with np.errstate(divide='ignore', invalid='ignore'):
+            q = np.where(m > 0, self.scale * (m * e / (e - 1.0)) ** (-e), np.inf)
+            return q, -e * q / m
+
+
+class LogLinear:
+    '''ln Q = alpha - beta*P, 即 P = (alpha - ln Q) / beta'''
+
+    def __init__(self, alpha, beta):
+        self.alpha = np.asarray(alpha, dtype=float)
+        self.beta = np.asarray(beta, dtype=float)
+        self.params = (self.alpha, self.beta)
+
+    def __call__(self, q):
+        with np.errstate(divide='ignore'):
+            return (self.alpha - np.log(q)) / self.beta
+
+    def _antiderivative(self, q):
+        q = np.asarray(q, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(q > 0, q * (self.alpha + 1.0 - np.log(q)), 0.0) / self.beta
+
+    def integral(self, q0, q1):
+        return self._antiderivative(q1) - self._antiderivative(q0)
+
+    def quantity(self, p):
+        q = np.exp(self.alpha - self.beta * p)
+        return q, -self.beta * q, self.beta ** 2 * q
+
+    def mr_quantity(self, m):
+        '''MR = (alpha - ln Q - 1) / beta = m'''
+        q = np.exp(self.alpha - 1.0 - self.beta * m)
+        return q, -self.beta * q
+
+
+class LinearDemand(Linear):
+    '''P = a - b*Q, 截距以上需求为零'''
+
+    def __init__(self, a, b):
+        super().__init__(a, -np.asarray(b, dtype=float))
+        self.a = self.intercept
+        self.b = -self.slope
+        self.params = (self.a, self.b)
+
+    def quantity(self, p):
+        q = np.maximum((self.a - p) / self.b, 0.0)
+        return q, np.where(p <= self.a, -1.0 / self.b, 0.0), np.zeros_like(q)
+
+    def mr_quantity(self, m):
+        '''MR = a - 2b*Q = m'''
+        q = np.maximum((self.a - m) / (2.0 * self.b), 0.0)
+        return q, np.where(m <= self.a, -0.5 / self.b, 0.0)
+
+
+class PowerCost:
+    '''边际成本 MC = c + d*Q^power, integral 为可变成本'''
+
+    def __init__(self, c, d=0.0, power=1.0):
+        self.c = np.asarray(c, dtype=float)
+        self.d = np.asarray(d, dtype=float)
+        self.power = np.asarray(power, dtype=float)
+        self.params = (self.c, self.d, self.power)
+
+    def __call__(self, q):
+        return self.c + self.d * q ** self.power
+
+    def derivative(self, q):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(self.d == 0, 0.0, self.d * self.power * q ** (self.power - 1.0))
+
+    def integral(self, q0, q1):
+        k = self.power + 1.0
+        return self.c * (q1 - q0) + self.d * (q1 ** k - q0 ** k) / k
+
+    def quantity(self, p):
+        '''供给量 (MC 的反函数); 常数边际成本时价格高于 c 供给无界'''
+        with np.errstate(divide='ignore', invalid='ignore'):
+            q = np.where(self.d > 0, np.maximum(p - self.c, 0.0) / self.d, np.where(p > self.c, np.inf, 0.0))
+            return np.where(self.d > 0, q ** (1.0 / self.power), q)
+
+
+# ---------- 求根 ----------
+
+def solve_root(func, lo, hi, args=(), x0=None, xtol=1e-12, ftol=1e-12, max_iter=100):
+    '''
+    批量求 func(x, *args) = 0 在 [lo, hi] 内的根, func 返回 (f, df)
+    lo, hi: 一维数组, 每个元素的有根区间 (两端 f 异号); args: 第一维与 lo 等长的数组,
+    每轮只把未收敛元素对应的切片传给 func
+    Newton 步落在区间外、导数无效或步长没有比上一步缩小一半时改用二分 (区间为正时取几何中点)
+    返回 (x, converged, iterations)
+    '''
+    lo = np.array(lo, dtype=float)
+    hi = np.array(hi, dtype=float)
+    f_lo = func(lo, *args)[0]
+    f_hi = func(hi, *args)[0]
+    rising = f_lo < 0
+    x = 0.5 * (lo + hi) if x0 is None else np.clip(np.asarray(x0, dtype=float), lo, hi)
+    x = np.where(f_lo == 0, lo, np.where(f_hi == 0, hi, x))
+    converged = (f_lo == 0) | (f_hi == 0)
+    no_bracket = (np.sign(f_lo) == np.sign(f_hi)) & ~converged
+    x[no_bracket] = np.nan
+    iterations = np.zeros(x.shape, dtype=int)
+    last_step = hi - lo
+
+    active = np.nonzero(~converged & ~no_bracket)[0]
+    for _ in range(max_iter):
+        if active.size == 0:
+            break
+        xa, la, ha = x[active], lo[active], hi[active]
+        f, df = func(xa, *(a[active] for a in args))
+        below = (f < 0) == rising[active]
+        la = np.where(below, xa, la)
+        ha = np.where(below, ha, xa)
+        lo[active], hi[active] = la, ha
+        with np.errstate(divide='ignore', invalid='ignore'):
+            newton = xa - f / df
+        scale = xtol * (1.0 + np.abs(xa))
+        done = ((np.abs(f) <= ftol * (1.0 + np.abs(xa))) | (ha - la <= scale)
+                | (np.abs(newton - xa) <= scale))
+
+        slow = 2.0 * np.abs(newton - xa) > np.abs(last_step[active])
+        bisect = ~np.isfinite(newton) | (newton <= la) | (newton >= ha) | slow
+        with np.errstate(invalid='ignore'):
+            middle = np.where(la > 0, np.sqrt(la * ha), 0.5 * (la + ha))
+        polish = np.isfinite(newton) & (newton >= la) & (newton <= ha)
+        x_new = np.where(done, np.where(polish, newton, xa), np.where(bisect, middle, newton))
+        last_step[active] = x_new - xa
+        x[active] = x_new
+        iterations[active] += 1
+        converged[active[done]] = True
+        active = active[~done]
+    return x, converged, iterations
+
+
+def expand_bracket(func, lo, args=(), span=1.0, grow=2.0, max_steps=200):
+    '''从 lo 向右按倍数扩大区间, 直到 func 在两端异号, 返回 hi'''
+    lo = np.asarray(lo, dtype=float)
+    sign_lo = np.sign(func(lo, *args)[0])
+    step = np.broadcast_to(np.asarray(span, dtype=float), lo.shape).copy()
+    hi = lo + step
+    pending = np.nonzero(np.sign(func(hi, *args)[0]) == sign_lo)[0]
+    for _ in range(max_steps):
+        if pending.size == 0:
+            break
+        step[pending] *= grow
+        hi[pending] = lo[pending] + step[pending]
+        f = func(hi[pending], *(a[pending] for a in args))[0]
+        pending = pending[np.sign(f) == sign_lo[pending]]
+    return hi
+
+
+# ---------- 批量整理 ----------
+
+_UNIFORM_GRID = 32  # 非线性需求统一定价时搜索局部极大的格数
+
+def _batch(demand, cost, extra, markets):
+    '''
+    把需求/成本参数和其他参数广播成一维情景批 (单市场时补一个市场轴)
+    返回 (批形状, 需求参数 (n, N), 成本参数 (n,), 其他参数 (n,))
+    '''
+    dparams = [np.asarray(p, dtype=float) for p in demand.params]
+    if not markets:
+        dparams = [p[..., None] for p in dparams]
+    cparams = [np.asarray(p, dtype=float) for p in cost.params]
+    extra = [np.asarray(p, dtype=float) for p in extra]
+    shape = np.broadcast_shapes(*(p.shape[:-1] for p in dparams), *(p.shape for p in cparams + extra))
+    n_markets = np.broadcast_shapes(*(p.shape[-1:] for p in dparams))
+    dparams = [np.broadcast_to(p, shape + n_markets).reshape(-1, n_markets[0]) for p in dparams]
+    cparams = [np.broadcast_to(p, shape).reshape(-1) for p in cparams]
+    extra = [np.broadcast_to(p, shape).reshape(-1) for p in extra]
+    return shape, dparams, cparams, extra
+
+
+def _common_level(kind, cost_kind, dparams, cparams, offset, mode):
+    '''
+    解 lam = MC(sum_i q_i(lam - offset)), mode 为 'mr' (边际收益反函数) 或 'demand' (需求反函数)
+    返回 (lam, 各市场产量 (n, N), converged)
+    '''
+    def quantities(lam, dp, off):
+        demand = kind(*dp)
+        if mode == 'mr':
+            return demand.mr_quantity((lam - off)[:, None])
+        q, dq, _ = demand.quantity((lam - off)[:, None])
+        return q, dq
+
+    def func(lam, off, *params):
+        dp, cp = params[:len(dparams)], params[len(dparams):]
+        q, dq = quantities(lam, dp, off)
+        cost = cost_kind(*cp)
+        total = q.sum(axis=-1)
+        with np.errstate(invalid='ignore'):
+            return lam - cost(total), 1.0 - cost.derivative(total) * dq.sum(axis=-1)
+
+    args = (offset, *dparams, *cparams)
+    lo = cost_kind(*cparams)(np.zeros_like(offset))
+    span = np.maximum(np.abs(lo), 1.0)
+    hi = expand_bracket(func, lo, args, span)
+    lam, converged, _ = solve_root(func, lo, hi, args)
+    return lam, quantities(lam, dparams, offset)[0], converged
+
+
+def _uniform_price(kind, cost_kind, dparams, cparams, p_low):
+    '''
+    统一定价利润 p*Q(p) - C(Q(p)) 的一阶条件 Q + (p - MC(Q))*Q' = 0, 在 [p_low, 上界] 上找全部局部极大
+    再取利润最高者: 线性需求在相邻折点 (各市场截距) 之间总需求是线性的, 利润是凹函数, 每段至多一个驻点;
+    其他需求族把 [p_low, 上界] 等分成 _UNIFORM_GRID 格, 在一阶条件由正变负的格子里求根 (同一格内的多个极大无法区分)
+    '''
+    def func(p, *params):
+        demand, cost = kind(*params[:len(dparams)]), cost_kind(*params[len(dparams):])
+        q, dq, d2q = demand.quantity(p[:, None])
+        total, slope, curve = q.sum(axis=-1), dq.sum(axis=-1), d2q.sum(axis=-1)
+        margin = p - cost(total)
+        return (total + margin * slope,
+                slope + (1.0 - cost.derivative(total) * slope) * slope + margin * curve)
+
+    def profit(p, *params):
+        demand, cost = kind(*params[:len(dparams)]), cost_kind(*params[len(dparams):])
+        total = demand.quantity(p[:, None])[0].sum(axis=-1)
+        return p * total - cost.integral(0.0, total)
+
+    args = (*dparams, *cparams)
+    if kind is LinearDemand:
+        points = np.sort(np.maximum(dparams[0], p_low[:, None]), axis=-1)
+        points = np.concatenate([p_low[:, None], points], axis=-1)
+        # 折点处的需求斜率取左极限, 段的左端挪到折点右侧一点, 刚退出的市场不再计入
+        # 按列求值, 内存只与情景数成正比
+        left, right = np.nextafter(points[:, :-1], np.inf), points[:, 1:]
+        f_left = np.column_stack([func(left[:, j], *args)[0] for j in range(left.shape[1])])
+        f_right = np.column_stack([func(right[:, j], *args)[0] for j in range(right.shape[1])])
+    else:
+        # 上界取各市场一阶条件项都不为正的价格 (p 以上 MC(Q(p)) <= p_low):
+        # 对数线性 p - MC >= 1/beta, 常弹性 (p - MC)/p >= 1/e; 其他情况向右找第一个变号点
+        hi = expand_bracket(func, p_low, args, np.maximum(np.abs(p_low), 1.0))
+        if kind is LogLinear:
+            hi = np.maximum(hi, p_low + 1.0 / dparams[1].min(axis=-1))
+        elif kind is ConstantElasticity:
+            e = dparams[1].min(axis=-1)
+            hi = np.maximum(hi, p_low * e / (e - 1.0))
+        grid = p_low[:, None] + (hi - p_low)[:, None] * np.linspace(0.0, 1.0, _UNIFORM_GRID + 1)
+        left, right = grid[:, :-1], grid[:, 1:]
+        # 相邻格共用端点, 每个网格点只求一次值
+        f_grid = np.column_stack([func(grid[:, j], *args)[0] for j in range(grid.shape[1])])
+        f_left, f_right = f_grid[:, :-1], f_grid[:, 1:]
+    rows, cols = np.nonzero((f_left > 0) & (f_right <= 0) & (right > left))
+
+    sub = tuple(a[rows] for a in args)
+    candidate, ok, _ = solve_root(func, left[rows, cols], right[rows, cols], sub)
+    value = profit(candidate, *sub)
+    # 每个情景取利润最高的候选; 找不到由正变负的区间时 (如 p_low 处已无需求) 标为未收敛
+    order = np.lexsort((-value, rows))
+    first = order[np.unique(rows[order], return_index=True)[1]]
+    p = p_low.copy()
+    converged = np.zeros(p.shape, dtype=bool)
+    p[rows[first]] = candidate[first]
+    converged[rows[first]] = ok[first]
+    return p, converged
+
+
+# ---------- 模型 ----------
+
+def solve_monopoly(demand, cost, subsidy=0.0):
+    '''
+    单一市场的垄断 / 补贴后垄断 / 竞争均衡 (对应 monopoly.solve_monopoly_subsidy)
+    demand: 需求族对象, cost: PowerCost, subsidy: 每单位补贴; 参数都可以是数组, 按广播规则批量求解
+    返回字典, 每个值都是批形状的数组; converged 为三次求解是否都收敛
+    '''
+    shape, dp, cp, (s,) = _batch(demand, cost, (subsidy,), markets=False)
+    kind, cost_kind = type(demand), type(cost)
+    zero = np.zeros_like(s)
+
+    lam_m, q_m, ok_m = _common_level(kind, cost_kind, dp, cp, zero, 'mr')
+    lam_s, q_s, ok_s = _common_level(kind, cost_kind, dp, cp, s, 'mr')
+    lam_c, q_c, ok_c = _common_level(kind, cost_kind, dp, cp, zero, 'demand')
+    d = kind(*(p[:, 0] for p in dp))
+    c = cost_kind(*cp)
+    q_m, q_s, q_c = q_m[:, 0], q_s[:, 0], q_c[:, 0]
+
+    p_consumer = d(q_s)
+    result = {
+        'q_monopoly': q_m,
+        'p_monopoly': d(q_m),
+        'q_subsidy': q_s,
+        'p_consumer': p_consumer,
+        'p_producer': p_consumer + s,
+        'q_competitive': q_c,
+        'p_competitive': lam_c,
+        'dwl_monopoly': area_between(d, c, q_m, q_c),
+        'dwl_subsidy': area_between(d, c, q_s, q_c),
+        'subsidy_cost': s * q_s,
+        'converged': ok_m & ok_s & ok_c,
+    }
+    return {k: v.reshape(shape) for k, v in result.items()}
+
+
+def sweep_price_ceiling(price, demand, cost, bribe=0.0, waste_per_unit=0.0):
+    '''
+    价格上限下的四种分配机制 (对应 price_control.sweep_price_controls 的 ceiling 情形)
+    供给量由 MC 的反函数直接算出, 只有竞争均衡需要求根; 不起作用的上限按竞争均衡处理
+    '''
+    shape, dp, cp, (price, bribe, waste) = _batch(demand, cost, (price, bribe, waste_per_unit), markets=False)
+    kind, cost_kind = type(demand), type(cost)
+    p_eq, q_eq, converged = _common_level(kind, cost_kind, dp, cp, np.zeros_like(price), 'demand')
+    d = kind(*(p[:, 0] for p in dp))
+    c = cost_kind(*cp)
+    q_eq = q_eq[:, 0]
+
+    binding = price < p_eq
+    price = np.where(binding, price, p_eq)
+    bribe = np.where(binding, bribe, 0.0)
+    waste = np.where(binding, waste, 0.0)
+    q_demanded = d.quantity(price)[0]
+    q_supplied = np.where(binding, c.quantity(price), q_eq)
+    q = np.minimum(q_demanded, q_supplied)
+
+    cs_ideal = consumer_surplus(d, price, q)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cs_random = np.where(q_demanded > 0, consumer_surplus(d, price, q_demanded) * q / q_demanded, 0.0)
+    result = {
+        'price': price,
+        'q': q,
+        'q_demanded': q_demanded,
+        'q_supplied': q_supplied,
+        'q_eq': q_eq,
+        'p_eq': p_eq,
+        'binding': binding,
+        'cs_ideal': cs_ideal,
+        'ps_ideal': price * q - c.integral(0.0, q),
+        'cs_bribe': cs_ideal - bribe * q,
+        'cs_waste': cs_ideal - waste * q,
+        'cs_random': cs_random,
+        'bribe_transfer': bribe * q,
+        'waste_cost': waste * q,
+        'dwl_ideal': area_between(d, c, q, q_eq),
+        'converged': converged,
+    }
+    return {k: v.reshape(shape) for k, v in result.items()}
+
+
+def solve_discrimination(demand, cost):
+    '''
+    N 个市场的统一定价与三级价格歧视 (对应 discrimination.solve_price_discrimination)
+    demand 的参数形状 (..., N), cost 的参数可广播到 (...,); 边际成本随总产量上升时各市场相互关联
+    返回: 各市场的价格/产量/消费者剩余形状 (..., N); p_uniform、生产者剩余 (总利润减可变成本)、
+    无谓损失 (相对有效配置的总剩余差) 形状 (...,)
+    '''
+    shape, dp, cp, _ = _batch(demand, cost, (), markets=True)
+    kind, cost_kind = type(demand), type(cost)
+    zero = np.zeros(dp[0].shape[0])
+    d = kind(*dp)
+    c = cost_kind(*cp)
+
+    _, q_discrim, ok_d = _common_level(kind, cost_kind, dp, cp, zero, 'mr')
+    lam_e, q_eff, ok_e = _common_level(kind, cost_kind, dp, cp, zero, 'demand')
+    p_uniform, ok_u = _uniform_price(kind, cost_kind, dp, cp, lam_e)
+    q_uniform = d.quantity(p_uniform[:, None])[0]
+    p_discrim = d(q_discrim)
+
+    def welfare(price, q):
+        total = q.sum(axis=-1)
+        gross = d.integral(0.0, q)
+        return gross - price * q, (price * q).sum(axis=-1) - c.integral(0.0, total), \
+            gross.sum(axis=-1) - c.integral(0.0, total)
+
+    cs_u, ps_u, w_u = welfare(p_uniform[:, None], q_uniform)
+    cs_d, ps_d, w_d = welfare(p_discrim, q_discrim)
+    w_eff = welfare(lam_e[:, None], q_eff)[2]
+    n = dp[0].shape[1]
+    result = {
+        'p_uniform': p_uniform,
+        'q_uniform': q_uniform,
+        'cs_uniform': cs_u,
+        'ps_uniform': ps_u,
+        'dwl_uniform': w_eff - w_u,
+        'p_discrim': p_discrim,
+        'q_discrim': q_discrim,
+        'cs_discrim': cs_d,
+        'ps_discrim': ps_d,
+        'dwl_discrim': w_eff - w_d,
+        'q_efficient': q_eff,
+        'converged': ok_d & ok_e & ok_u,
+    }
+    return {k: v.reshape(shape + ((n,) if v.ndim == 2 else ())) for k, v in result.items()}
+
+
+# ---------- 对照与计时 ----------
+
+def _check_linear():
+    '''线性需求 + 常数边际成本时与各章闭式解的最大偏差'''
+    from econ1210.discrimination import solve_price_discrimination
+    from econ1210.monopoly import solve_monopoly_subsidy
+    from econ1210.price_control import sweep_price_controls
+
+    subsidy = np.linspace(0, 60, 61)
+    ref = solve_monopoly_subsidy(146, 0.5, 4, subsidy)
+    new = solve_monopoly(LinearDemand(146, 0.5), PowerCost(4, 0), subsidy)
+    monopoly = max(np.max(np.abs(new[k] - ref[k])) for k in ref)
+
+    ceiling = np.linspace(12, 38, 27)
+    ref = sweep_price_controls(ceiling, 20, 15, 100, 2, 10, 1)
+    new = sweep_price_ceiling(ceiling, LinearDemand(100, 2), PowerCost(10, 1), 20, 15)
+    price_control = max(np.max(np.abs(new[k] - ref[k])) for k in ('q', 'cs_ideal', 'ps_ideal', 'cs_random',
+                                                                   'cs_bribe', 'cs_waste', 'dwl_ideal'))
+
+    mc = np.linspace(0, 30, 31)
+    ref = solve_price_discrimination([92.0, 64.0], [2.0, 2.0], mc)
+    new = solve_discrimination(LinearDemand([92.0, 64.0], [2.0, 2.0]), PowerCost(mc, 0))
+    discrimination = max(np.max(np.abs(new[k] - ref[k])) for k in ('p_uniform', 'q_uniform', 'cs_uniform',
+                                                                    'p_discrim', 'q_discrim', 'cs_discrim'))
+    return {'monopoly': monopoly, 'price_ceiling': price_control, 'discrimination': discrimination}
+
+
+def _scalar_newton(f, df, lo, hi, tol=1e-12):
+    '''逐个情景调用的标量版本, 作为 "每个情景调用一次求根函数" 的对照'''
+    x = 0.5 * (lo + hi)
+    for _ in range(100):
+        fx = f(x)
+        if fx < 0:
+            lo = x
+        else:
+            hi = x
+        step = x - fx / df(x)
+        x = step if lo < step < hi else 0.5 * (lo + hi)
+        if abs(fx) <= tol * (1 + abs(x)) or hi - lo <= tol * (1 + abs(x)):
+            break
+    return x
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='非线性需求 / 递增边际成本的批量均衡求解: 对照与计时')
+    parser.add_argument('--n', type=int, default=1_000_000, help='情景数')
+    parser.add_argument('--loop', type=int, default=2000, help='逐个求解对照的情景数')
+    args = parser.parse_args(argv)
+
+    for name, err in _check_linear().items():
+        print(f'线性对照 {name:15s} 与闭式解最大偏差 {err:.2e}')
+
+    rng = np.random.default_rng(0)
+    n = args.n
+    elasticity = rng.uniform(1.2, 4.0, n)
+    d = rng.uniform(0.0, 0.05, n)
+    subsidy = rng.uniform(0.0, 20.0, n)
+    demand, cost = ConstantElasticity(1e5, elasticity), PowerCost(4.0, d)
+
+    def func(lam, e, dd, s):
+        dem, c = ConstantElasticity(1e5, e[:, None]), PowerCost(4.0, dd)
+        q, dq = dem.mr_quantity((lam - s)[:, None])
+        with np.errstate(invalid='ignore'):
+            return lam - c(q[:, 0]), 1.0 - c.derivative(q[:, 0]) * dq[:, 0]
+
+    lo = np.full(n, 4.0)
+    hi = expand_bracket(func, lo, (elasticity, d, subsidy), 4.0)
+    start = time.perf_counter()
+    lam, converged, iterations = solve_root(func, lo, hi, (elasticity, d, subsidy))
+    elapsed = time.perf_counter() - start
+    print(f'\n常弹性需求 + 递增 MC 的补贴垄断 MR + s = MC, {n} 个情景: {elapsed*1000:.0f}ms, '
+          f'收敛 {converged.mean():.2%}, 迭代次数 中位数 {np.median(iterations):.0f} 最多 {iterations.max()}')
+
+    k = min(args.loop, n)
+    start = time.perf_counter()
+    for i in range(k):
+        e, dd, s = elasticity[i], d[i], subsidy[i]
+        mr_q = lambda m: 1e5 * (m * e / (e - 1)) ** (-e) if m > 0 else np.inf
+        _scalar_newton(lambda x: x - (4.0 + dd * mr_q(x - s)),
+                       lambda x: 1.0 + dd * e * mr_q(x - s) / (x - s), lo[i], hi[i])
+    per_call = (time.perf_counter() - start) / k
+    print(f'逐个情景求解: 每个 {per_call*1e6:.0f}us, 折合 {n} 个约 {per_call * n:.1f}s')
+
+    start = time.perf_counter()
+    r = solve_monopoly(demand, cost, subsidy)
+    print(f'solve_monopoly 全部三个均衡 + 福利: {(time.perf_counter() - start)*1000:.0f}ms, '
+          f'收敛 {r["converged"].mean():.2%}')
+
+    markets = LogLinear(np.stack([rng.uniform(4, 6, n), rng.uniform(3, 5, n)], axis=-1),
+                        np.stack([rng.uniform(0.02, 0.06, n), rng.uniform(0.04, 0.1, n)], axis=-1))
+    start = time.perf_counter()
+    r = solve_discrimination(markets, PowerCost(9.0, d))
+    print(f'对数线性需求两市场定价 (统一 + 分市场 + 有效配置): {(time.perf_counter() - start)*1000:.0f}ms, '
+          f'收敛 {r["converged"].mean():.2%}')
+
+    start = time.perf_counter()
+    r = sweep_price_ceiling(rng.uniform(5, 30, n), ConstantElasticity(1e4, elasticity), PowerCost(4.0, d + 0.01))
+    print(f'常弹性需求价格上限: {(time.perf_counter() - start)*1000:.0f}ms, 收敛 {r["converged"].mean():.2%}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+'''
+价格管制下的分配机制 (Chapter 7): 理想分配 / 行贿 / 浪费性竞争 / 随机分配
+需求: P = a - b*Q, 供给: P = c + d*Q
+价格上限时短缺一方是消费者, 价格下限时过剩一方是生产者;
+行贿、浪费、随机分配都作用在被配给的一方
+所有参数按广播规则计算, 可以一次扫描整个 (价格, 贿赂, 浪费) 网格
+'''
+import numpy as np
+
+from econ1210.welfare import (area_between, consumer_surplus, deadweight_loss,
+                              linear_demand, linear_supply, producer_surplus,
+                              transfer_area)
+
+
+def equilibrium(a, b, c, d):
+    '''竞争均衡: a - b*q = c + d*q'''
+    q_eq = (a - c) / (b + d)
+    return q_eq, a - b * q_eq
+
+
+def sweep_price_controls(price, bribe=0.0, waste_per_unit=0.0,
+                         a=100.0, b=2.0, c=10.0, d=1.0, kind='ceiling'):
+    '''
+    对价格上限 (kind='ceiling') 或价格下限 (kind='floor') 计算四种分配机制的福利
+    price / bribe / waste_per_unit / 曲线参数可以是任意可广播的数组,
+    例如 price[:, None] 和 bribe[None, :] 得到二维网格
+    不起作用的管制 (上限高于或下限低于均衡价) 按竞争均衡处理
+    返回字典, 每个值都是广播后形状相同的数组:
+      q: 成交量, binding: 管制是否起作用
+      cs_* / ps_*: 四种机制 (ideal/bribe/waste/random) 下的消费者/生产者剩余
+      bribe_transfer / waste_cost: 贿赂转移和竞争浪费的总额
+      dwl_*: 相对竞争均衡总剩余的损失 (贿赂是转移, 计入总剩余; 浪费不计入)
+    '''
+    if kind not in ('ceiling', 'floor'):
+        raise ValueError(f"kind 必须是 'ceiling' 或 'floor', 而不是 {kind!r}")
+    price, bribe, waste_per_unit, a, b, c, d = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (price, bribe, waste_per_unit, a, b, c, d)))
+    demand = linear_demand(a, b)
+    supply = linear_supply(c, d)
+
+    q_eq, p_eq = equilibrium(a, b, c, d)
+    binding = price < p_eq if kind == 'ceiling' else price > p_eq
+    price = np.where(binding, price, p_eq)
+    bribe = np.where(binding, bribe, 0.0)
+    waste_per_unit = np.where(binding, waste_per_unit, 0.0)
+
+    q_demanded = np.maximum((a - price) / b, 0.0)
+    q_supplied = np.maximum((price - c) / d, 0.0)
+    q = np.minimum(q_demanded, q_supplied)
+
+    # 短缺方按支付意愿 (或成本) 排序时的剩余; 随机分配时按比例缩小整条"愿意交易"的剩余
+    cs_ideal = consumer_surplus(demand, price, q)
+    ps_ideal = producer_surplus(supply, price, q)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cs_random = np.where(q_demanded > 0,
+                             consumer_surplus(demand, price, q_demanded) * q / q_demanded, 0.0)
+        ps_random = np.where(q_supplied > 0,
+                             producer_surplus(supply, price, q_supplied) * q / q_supplied, 0.0)
+
+    bribe_transfer = transfer_area(bribe, q)
+    waste_cost = transfer_area(waste_per_unit, q)
+
+    if kind == 'ceiling':
+        rationed = {'cs_bribe': cs_ideal - bribe_transfer, 'ps_bribe': ps_ideal,
+                    'cs_waste': cs_ideal - waste_cost, 'ps_waste': ps_ideal,
+                    'cs_random': cs_random, 'ps_random': ps_ideal}
+    else:
+        rationed = {'cs_bribe': cs_ideal, 'ps_bribe': ps_ideal - bribe_transfer,
+                    'cs_waste': cs_ideal, 'ps_waste': ps_ideal - waste_cost,
+                    'cs_random': cs_ideal, 'ps_random': ps_random}
+
+    dwl_ideal = deadweight_loss(demand, supply, q, q_eq)
+    max_surplus = area_between(demand, supply, 0.0, q_eq)
+
+    return {
+        'price': price,
+        'q': q,
+        'q_demanded': q_demanded,
+        'q_supplied': q_supplied,
+        'binding': binding,
+        'cs_ideal': cs_ideal,
+        'ps_ideal': ps_ideal,
+        **rationed,
+        'bribe_transfer': bribe_transfer,
+        'waste_cost': waste_cost,
+        'dwl_ideal': dwl_ideal,
+        'dwl_bribe': dwl_ideal,
+        'dwl_waste': dwl_ideal + waste_cost,
+        'dwl_random': max_surplus - rationed['cs_random'] - rationed['ps_random'],
+    }
+
+
+def four_case_model(a=100.0, b=2.0, c=10.0, d=1.0, p_ceiling=25.0,
+                    bribe_amount=20.0, waste_per_unit=15.0, allocation_loss=0.0):
+    '''
+    单个价格上限下四种分配机制的关键数值 (用于绘图和打印)
+    allocation_loss: 浪费性竞争下东西没给支付意愿最高者的剩余损失 (如 queueing.simulate_queue 的结果),
+    从 cs_waste 中扣除; 默认 0 即按支付意愿分配
+    '''
+    r = sweep_price_controls(p_ceiling, bribe_amount, waste_per_unit, a, b, c, d)
+    allocation_loss = np.where(r['binding'], allocation_loss, 0.0)
+    q_eq, p_eq = equilibrium(a, b, c, d)
+    q_ceiling = r['q']
+    return {
+        'a': a, 'b': b, 'c': c, 'd': d,
+        'p_ceiling': p_ceiling,
+        'bribe_amount': bribe_amount,
+        'waste_per_unit': waste_per_unit,
+        'q_eq': q_eq,
+        'p_eq': p_eq,
+        'q_ceiling': q_ceiling,
+        # 上限低于均衡价时才起作用; 不起作用时没有贿赂和浪费
+        'binding': r['binding'],
+        # 价格上限下的最高支付意愿
+        'p_max_willing': a - b * q_ceiling,
+        # 随机分配下买到者的平均支付意愿 (按实际成交价; 没有成交时取成交价本身)
+        'avg_willingness': r['price'] + np.divide(r['cs_random'], q_ceiling, out=np.zeros_like(q_ceiling),
+                                                  where=q_ceiling > 0),
+        'ps_ideal': r['ps_ideal'],
+        'dwl': r['dwl_ideal'],
+        'cs_ideal': r['cs_ideal'],
+        'cs_bribe': r['cs_bribe'],
+        'bribe_transfer': r['bribe_transfer'],
+        'cs_waste': r['cs_waste'] - allocation_loss,
+        'waste_cost': r['waste_cost'],
+        'allocation_loss': allocation_loss,
+        'cs_random': r['cs_random'],
+        'efficiency_loss': r['cs_ideal'] - r['cs_random'],
+    }
@@ -0,0 +1,375 @@
+'''
+渲染过程的分阶段计时
+一张图慢的时候, 时间可能花在模型计算、大量 ax.annotate / ax.text、tight_layout、
+中文字体回退或最后的编码上; 这里在各章图形函数里埋点, 按阶段记录:
+  wall / cpu:  墙钟时间 (perf_counter) 与本进程 CPU 时间 (process_time), 毫秒
+  artists / texts: 阶段结束时所跟踪 Figure 的 artist 总数与其中的文字数, 以及本阶段新增的个数
+  mem_delta / mem_peak: 开启 tracemalloc 时本阶段的内存净增与峰值 (字节)
+结果收集在 Profile 对象里, 可导出为 JSON 或 Chrome trace-event 格式 (chrome://tracing、Perfetto 可直接打开)
+
+默认关闭: stage() / step() 只多一次全局变量判断, 返回共享的空上下文
+开启方式:
+  环境变量 ECON1210_PROFILE=1                      只记阶段计时
+           ECON1210_PROFILE=cprofile,tracemalloc   同时开启 cProfile 和/或 tracemalloc
+           ECON1210_PROFILE_OUT=prof-{pid}.json    进程退出时写出 (文件名以 .trace.json 结尾时写 Chrome trace),
+                                                   未设置时把汇总表打印到 stderr; {pid} 便于进程池里各进程分开写
+  代码里   with profile(cprofile=True) as prof: ...
+用法:
+    python -m econ1210.profiling ch07_four_case --format png --repeat 3 --trace four_case.trace.json
+'''
+import argparse
+import atexit
+import contextlib
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+ENV = 'ECON1210_PROFILE'
+ENV_OUT = 'ECON1210_PROFILE_OUT'
+CAPTURES = ('cprofile', 'tracemalloc')
+
+_NULL = contextlib.nullcontext()
+_active = None
+
+
+class Profile:
+    '''
+    一次采集的上下文对象: events 按结束顺序保存每个阶段的记录
+    cprofile / tracemalloc 为 True 时在 start() 到 stop() 之间开启对应采集
+    '''
+
+    def __init__(self, cprofile=False, tracemalloc=False):
+        self.cprofile = cprofile
+        self.tracemalloc = tracemalloc
+        self.events = []
+        self.pid = os.getpid()
+        self._origin = time.perf_counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._profiler = None
+        self._stats = None
+        self._allocations = None
+        self._own_tracemalloc = False
+
+    # ---- 采集开关 ----
+
+    def start(self):
+        if self.tracemalloc:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._own_tracemalloc = True
+        if self.cprofile:
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        return self
+
+    def stop(self):
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._stats = self._function_stats(self._profiler)
+        if self.tracemalloc:
+            import tracemalloc
+            if tracemalloc.is_tracing():
+                snapshot = tracemalloc.take_snapshot()
+                self._allocations = [
+                    {'site': str(stat.traceback), 'size': stat.size, 'count': stat.count}
+                    for stat in snapshot.statistics('lineno')[:20]
+                ]
+                if self._own_tracemalloc:
+                    tracemalloc.stop()
+
+    @staticmethod
+    def _function_stats(profiler, limit=40):
+        import pstats
+        stats = pstats.Stats(profiler).stats
+        rows = [
+            {'function': f'{path}:{line}({func})', 'ncalls': nc, 'tottime_ms': tt * 1000, 'cumtime_ms': ct * 1000}
+            for (path, line, func), (cc, nc, tt, ct, callers) in stats.items()
+        ]
+        rows.sort(key=lambda row: row['cumtime_ms'], reverse=True)
+        return rows[:limit]
+
+    # ---- 阶段 ----
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _open(self, name, args, step=False):
+        stack = self._stack()
+        fig = getattr(self._local, 'fig', None)
+        frame = {
+            'name': name,
+            'args': args,
+            'step': step,
+            'depth': len(stack),
+            'fig': fig,
+            'artists0': _count(fig) if fig is not None else None,
+            'wall0': time.perf_counter(),
+            'cpu0': time.process_time(),
+            'mem0': _traced() if self.tracemalloc else None,
+        }
+        stack.append(frame)
+
+    def _close(self):
+        wall1, cpu1 = time.perf_counter(), time.process_time()
+        stack = self._stack()
+        frame = stack.pop()
+        event = {
+            'name': frame['name'],
+            'depth': frame['depth'],
+            'tid': threading.get_ident(),
+            'start_ms': (frame['wall0'] - self._origin) * 1000,
+            'wall_ms': (wall1 - frame['wall0']) * 1000,
+            'cpu_ms': (cpu1 - frame['cpu0']) * 1000,
+        }
+        # 阶段内才创建 Figure 时, 以创建后跟踪的 Figure 计数 (新增数从 0 算起)
+        fig = getattr(self._local, 'fig', None)
+        if fig is not None:
+            artists, texts = _count(fig)
+            before = frame['artists0'] if frame['fig'] is fig else (0, 0)
+            event.update(artists=artists, texts=texts,
+                         artists_added=artists - before[0], texts_added=texts - before[1])
+        if frame['mem0'] is not None:
+            current, peak = _traced()
+            event.update(mem_delta=current - frame['mem0'][0], mem_peak=peak)
+        if frame['args']:
+            event['args'] = frame['args']
+        with self._lock:
+            self.events.append(event)
+        if not stack:
+            self._local.fig = None
+
+    def enter(self, name, args=None):
+        self._open(name, args)
+
+    def exit(self):
+        stack = self._stack()
+        # 先结束本阶段里还开着的 step
+        while stack and stack[-1]['step']:
+            self._close()
+        self._close()
+
+    def step(self, name):
+        stack = self._stack()
+        if stack and stack[-1]['step']:
+            self._close()
+        self._open(name, None, step=True)
+
+    def track(self, fig):
+        self._local.fig = fig
+
+    # ---- 汇总与导出 ----
+
+    def summary(self):
+        '''按阶段名汇总: 次数、总墙钟/CPU 时间、最后一次的 artist 数'''
+        rows = {}
+        for event in self.events:
+            key = ('  ' * event['depth']) + event['name']
+            row = rows.setdefault(key, {'stage': key, 'count': 0, 'wall_ms': 0.0, 'cpu_ms': 0.0})
+            row['count'] += 1
+            row['wall_ms'] += event['wall_ms']
+            row['cpu_ms'] += event['cpu_ms']
+            for field in ('artists_added', 'texts_added', 'mem_delta'):
+                if field in event:
+                    row[field] = row.get(field, 0) + event[field]
+        # 父阶段在子阶段之后结束, 按首次开始时间排序才是调用顺序
+        first = {}
+        for event in self.events:
+            key = ('  ' * event['depth']) + event['name']
+            first[key] = min(first.get(key, event['start_ms']), event['start_ms'])
+        return sorted(rows.values(), key=lambda row: first[row['stage']])
+
+    def to_json(self):
+        return {
+            'pid': self.pid,
+            'events': self.events,
+            'summary': self.summary(),
+            'functions': self._stats,
+            'allocations': self._allocations,
+        }
+
+    def chrome_trace(self):
+        '''Chrome trace-event 格式: 每个阶段一个完整事件 (ph='X'), 时间单位微秒'''
+        events = []
+        for event in self.events:
+            args = {key: value for key, value in event.items()
+                    if key not in ('name', 'depth', 'tid', 'start_ms', 'wall_ms', 'args')}
+            args.update(event.get('args') or {})
+            events.append({
+                'name': event['name'], 'cat': 'econ1210', 'ph': 'X',
+                'ts': event['start_ms'] * 1000, 'dur': event['wall_ms'] * 1000,
+                'pid': self.pid, 'tid': event['tid'], 'args': args,
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write(self, path):
+        '''写出到 path; 文件名以 .trace.json 结尾时为 Chrome trace, 否则为完整 JSON'''
+        path = str(path).format(pid=self.pid)
+        data = self.chrome_trace() if path.endswith('.trace.json') else self.to_json()
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        return path
+
+    def format_table(self):
+        lines = [f'{"阶段":24s} {"次数":>5s} {"墙钟ms":>9s} {"CPUms":>9s} {"新增artist":>10s} {"新增文字":>8s}']
+        for row in self.summary():
+            lines.append(f'{row["stage"]:26s} {row["count"]:5d} {row["wall_ms"]:9.2f} {row["cpu_ms"]:9.2f} '
+                         f'{row.get("artists_added", ""):>10} {row.get("texts_added", ""):>10}')
+        for row in (self._stats or [])[:15]:
+            lines.append(f'  {row["cumtime_ms"]:9.2f}ms {row["ncalls"]:7d}  {row["function"]}')
+        return '\n'.join(lines)
+
+
+def _count(fig):
+    from matplotlib.text import Text
+    artists = fig.findobj()
+    return len(artists), sum(isinstance(artist, Text) and bool(artist.get_text()) for artist in artists)
+
+
+def _traced():
+    import tracemalloc
+    return tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+
+
+# ---- 埋点接口: 未开启时都是空操作 ----
+
+class _Stage:
+    __slots__ = ('prof', 'name', 'args')
+
+    def __init__(self, prof, name, args):
+        self.prof, self.name, self.args = prof, name, args
+
+    def __enter__(self):
+        self.prof.enter(self.name, self.args)
+        return self.prof
+
+    def __exit__(self, *exc):
+        self.prof.exit()
+        return False
+
+
+def stage(name, **args):
+    '''with stage('model'): ... 记录一个阶段; 可以嵌套; 未开启时返回共享的空上下文'''
+    if _active is None:
+        return _NULL
+    return _Stage(_active, name, args)
+
+
+def step(name):
+    '''
+    在当前阶段里顺序划分子阶段: 结束上一个 step 并开始新的, 外层阶段结束时自动收尾
+    用于不便缩进成 with 块的长函数体
+    '''
+    if _active is not None:
+        _active.step(name)
+
+
+def track(fig):
+    '''之后各阶段结束时统计这个 Figure 的 artist 数 (外层阶段结束时解除)'''
+    if _active is not None:
+        _active.track(fig)
+
+
+def profiled(name):
+    '''装饰器: 把整个函数调用记为一个阶段'''
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _active is None:
+                return func(*args, **kwargs)
+            with _Stage(_active, name, None):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def current():
+    '''正在采集的 Profile, 未开启时为 None'''
+    return _active
+
+
+@contextlib.contextmanager
+def profile(cprofile=False, tracemalloc=False):
+    '''在 with 块内开启采集, 产出 Profile; 结束后恢复之前的状态'''
+    global _active
+    previous = _active
+    prof = Profile(cprofile, tracemalloc).start()
+    _active = prof
+    try:
+        yield prof
+    finally:
+        _active = previous
+        prof.stop()
+
+
+def _parse_env(value):
+    flags = {item.strip().lower() for item in value.split(',') if item.strip()}
+    unknown = flags - set(CAPTURES) - {'1', 'on', 'true', 'time'}
+    if unknown:
+        print(f'{ENV}: 忽略未知选项 {sorted(unknown)}, 可选 {list(CAPTURES)}', file=sys.stderr)
+    return {capture: capture in flags for capture in CAPTURES}
+
+
+def _finish_env(prof):
+    prof.stop()
+    out = os.environ.get(ENV_OUT)
+    if out:
+        prof.write(out)
+    elif prof.events:
+        print(prof.format_table(), file=sys.stderr)
+
+
+def _activate_from_env():
+    global _active
+    value = os.environ.get(ENV, '').strip()
+    if not value or value.lower() in ('0', 'off', 'false'):
+        return
+    _active = Profile(**_parse_env(value)).start()
+    atexit.register(_finish_env, _active)
+
+
+_activate_from_env()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='分阶段统计一张注册图形的渲染耗时')
+    parser.add_argument('figure', help='注册名, 如 ch07_four_case')
+    parser.add_argument('--set', nargs=2, action='append', default=[], metavar=('NAME', 'VALUE'), help='图形参数')
+    parser.add_argument('--format', default='png', help="输出格式, 'array' 表示只栅格化")
+    parser.add_argument('--dpi', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=1, help='渲染次数 (第一次含字体解析和导入等冷启动开销)')
+    parser.add_argument('--cprofile', action='store_true')
+    parser.add_argument('--tracemalloc', action='store_true')
+    parser.add_argument('--json', help='写出完整 JSON')
+    parser.add_argument('--trace', help='写出 Chrome trace-event JSON')
+    args = parser.parse_args(argv)
+
+    import matplotlib
+    matplotlib.use('Agg')
+    from econ1210 import profiling  # python -m 运行时本文件是 __main__, 埋点用的是包里的模块
+    from econ1210.export import render_figure
+
+    params = {name: float(value) for name, value in args.set}
+    with profiling.profile(args.cprofile, args.tracemalloc) as prof:
+        for i in range(args.repeat):
+            with profiling.stage('render', figure=args.figure, run=i):
+                render_figure(args.figure, params, output=args.format, dpi=args.dpi)
+    print(prof.format_table())
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(prof.to_json(), f, ensure_ascii=False, indent=1)
+    if args.trace:
+        with open(args.trace, 'w', encoding='utf-8') as f:
+            json.dump(prof.chrome_trace(), f, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
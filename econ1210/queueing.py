@@ -0,0 +1,199 @@
+'''
+价格上限下排队分配的个体模拟 (Chapter 7 情况3 "浪费性竞争")
+原图假定每单位浪费 waste_per_unit = 15; 这里由排队均衡算出来:
+  从需求曲线 P = a - b*Q 抽取愿意以上限价购买的消费者 (支付意愿 v 在 [P_ceiling, a] 上),
+  每人的时间成本 w (每小时) 服从对数正态, 可与支付意愿相关;
+  每人最多愿意等 t = (v - P_ceiling) / w 小时, 愿意等得久的人来得早, q_ceiling 个单位给最先到的人;
+  均衡排队时间 T 由第一个买不到的人决定 (再早来就值得), 买到的人各付出 w*T 的时间成本
+时间成本都相同时租金全部耗散: 每单位浪费 = 上限数量处的支付意愿 - 上限价;
+时间成本不同时, 时间便宜的人排在前面, 浪费变少, 但东西不一定给了支付意愿最高的人
+每个模拟消费者代表 q_demanded / n_agents 单位的需求; 全部向量化, 一次 argpartition 找出排队门槛
+'''
+import argparse
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from econ1210.price_control import four_case_model, sweep_price_controls
+
+FIELDS = ('price', 'q', 'q_demanded', 'agents', 'served', 'queued', 'wait',
+          'waste_cost', 'waste_per_unit', 'rent', 'cs_net', 'cs_ideal', 'ps', 'allocation_loss',
+          'dissipation', 'dwl_ideal', 'dwl_queue', 'wtp_served', 'time_cost_served', 'time_cost_mean',
+          'top_share')
+
+
+def _draw(rng, n, a, b, q_demanded, time_cost, sigma, rho):
+    '''支付意愿与时间成本; rho 为 ln(时间成本) 与支付意愿的相关系数'''
+    u = rng.random(n)
+    wtp = a - b * q_demanded * u
+    z = rng.standard_normal(n)
+    if rho:
+        # 标准化的支付意愿 (均匀分布, 方差 1)
+        z *= math.sqrt(1.0 - rho * rho)
+        z += rho * math.sqrt(12.0) * (0.5 - u)
+    w = np.exp(z * sigma)
+    w *= time_cost
+    return wtp, w
+
+
+def simulate_queue(p_ceiling=25.0, a=100.0, b=2.0, c=10.0, d=1.0, n_agents=1_000_000,
+                   time_cost=20.0, time_cost_sigma=0.5, time_cost_rho=0.0, seed=None):
+    '''
+    一次排队模拟, 返回 FIELDS 中各项 (浮点数):
+      served / queued: 买到的人数 / 决定排队的人数 (等待 T 仍有剩余的人), wait: 均衡排队时间 T (小时)
+      waste_cost / waste_per_unit: 排队耗掉的时间成本总额 / 每单位 (即图中浪费矩形的高)
+      rent: 买到者的 (支付意愿 - 上限价) 之和, cs_net = rent - waste_cost, dissipation = waste_cost / rent
+      allocation_loss: 理想分配 (按支付意愿) 的消费者剩余减去 rent
+      dwl_queue = dwl_ideal + waste_cost + allocation_loss (相对竞争均衡的总损失)
+      wtp_served / time_cost_served / time_cost_mean: 买到者的平均支付意愿、平均时间成本, 全体的平均时间成本
+      top_share: 买到者中属于支付意愿最高的 q_ceiling 那部分人的比例
+    上限不高于 c (没有供给) 时不抽样, 买到、排队、浪费和租金都为 0, 买到者的均值也记为 0
+    '''
+    r = sweep_price_controls(p_ceiling, 0.0, 0.0, a, b, c, d)
+    price, q, q_demanded = float(r['price']), float(r['q']), float(r['q_demanded'])
+    cs_ideal, ps, dwl_ideal = float(r['cs_ideal']), float(r['ps_ideal']), float(r['dwl_ideal'])
+    if q <= 0:
+        # 上限不高于 c: 没有供给, 没人买到也没人排队, 不用抽样
+        result = dict.fromkeys(FIELDS, 0.0)
+        result.update(price=price, q_demanded=q_demanded, agents=float(n_agents), cs_ideal=cs_ideal,
+                      ps=ps, dwl_ideal=dwl_ideal, dwl_queue=dwl_ideal)
+        return result
+    rng = np.random.default_rng(seed)
+    n = n_agents
+    k = min(n, max(1, round(n * q / q_demanded))) if q_demanded > 0 else n
+    unit = q_demanded / n if q_demanded > 0 else 0.0
+    wtp, w = _draw(rng, n, a, b, q_demanded, time_cost, time_cost_sigma, time_cost_rho)
+
+    if k < n:
+        patience = wtp - price
+        patience /= w
+        # 愿意等得最久的 k 人排在前面; 第 k+1 长的等待时间就是均衡排队时间
+        order = np.argpartition(patience, n - k - 1)
+        wait = max(float(patience[order[n - k - 1]]), 0.0)
+        served = order[n - k:]
+        queued = int(np.count_nonzero(patience >= wait)) if wait > 0 else n
+        top = np.partition(wtp, n - k)[n - k]
+        wtp_served, w_served = wtp[served], w[served]
+        top_share = float(np.count_nonzero(wtp_served >= top)) / k
+    else:
+        # 上限不起作用或不短缺: 不用排队
+        wait, queued, top_share = 0.0, n, 1.0
+        wtp_served, w_served = wtp, w
+
+    rent = float((wtp_served - price).sum()) * unit
+    waste = wait * float(w_served.sum()) * unit
+    # 抽样的剩余有抽样误差; 理想分配用解析值, 排队分配的误配损失不会为负
+    allocation_loss = max(cs_ideal - rent, 0.0) if k < n else 0.0
+    return {
+        'price': price,
+        'q': q,
+        'q_demanded': q_demanded,
+        'agents': float(n),
+        'served': float(k),
+        'queued': float(queued),
+        'wait': wait,
+        'waste_cost': waste,
+        'waste_per_unit': waste / q if q > 0 else 0.0,
+        'rent': rent,
+        'cs_net': rent - waste,
+        'cs_ideal': cs_ideal,
+        'ps': ps,
+        'allocation_loss': allocation_loss,
+        'dissipation': waste / rent if rent > 0 else 0.0,
+        'dwl_ideal': dwl_ideal,
+        'dwl_queue': dwl_ideal + waste + allocation_loss,
+        'wtp_served': float(wtp_served.mean()),
+        'time_cost_served': float(w_served.mean()),
+        'time_cost_mean': float(w.mean()),
+        'top_share': top_share,
+    }
+
+
+def _simulate_task(args):
+    p_ceiling, seed, kwargs = args
+    return simulate_queue(p_ceiling, seed=seed, **kwargs)
+
+
+def sweep_queue(prices, a=100.0, b=2.0, c=10.0, d=1.0, n_agents=1_000_000, time_cost=20.0,
+                time_cost_sigma=0.5, time_cost_rho=0.0, seed=None, workers=None):
+    '''
+    对一组价格上限各跑一次模拟, 每个上限用 SeedSequence.spawn 得到独立的随机数流;
+    workers > 1 时分给进程池 (每个进程同时持有 n_agents 个消费者的数组)
+    返回 {字段: 与 prices 同形状的数组}
+    '''
+    prices = np.asarray(prices, dtype=float)
+    flat = prices.reshape(-1)
+    seeds = np.random.SeedSequence(seed).spawn(flat.size)
+    kwargs = dict(a=a, b=b, c=c, d=d, n_agents=n_agents, time_cost=time_cost,
+                  time_cost_sigma=time_cost_sigma, time_cost_rho=time_cost_rho)
+    tasks = [(float(p), s, kwargs) for p, s in zip(flat, seeds)]
+    workers = min(workers or os.cpu_count() or 1, len(tasks)) or 1
+    if workers == 1:
+        results = [_simulate_task(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_simulate_task, tasks))
+    return {key: np.array([r[key] for r in results]).reshape(prices.shape) for key in FIELDS}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='价格上限下排队分配的个体模拟')
+    parser.add_argument('--agents', type=float, default=1e6)
+    parser.add_argument('--p-ceiling', type=float, default=25.0)
+    parser.add_argument('--sweep', nargs=3, type=float, metavar=('LO', 'HI', 'N'),
+                        help='在 [LO, HI] 上取 N 个价格上限并行模拟')
+    parser.add_argument('--time-cost', type=float, default=20.0, help='时间成本中位数 (每小时)')
+    parser.add_argument('--sigma', type=float, default=0.5, help='ln(时间成本) 的标准差, 0 表示人人相同')
+    parser.add_argument('--rho', type=float, default=0.0, help='ln(时间成本) 与支付意愿的相关系数')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--plot', help='把模拟得到的每单位浪费和误配损失代入第 7 章四种情况图并保存')
+    args = parser.parse_args(argv)
+    options = dict(n_agents=int(args.agents), time_cost=args.time_cost,
+                   time_cost_sigma=args.sigma, time_cost_rho=args.rho)
+
+    if args.sweep:
+        lo, hi, count = args.sweep
+        prices = np.linspace(lo, hi, int(count))
+        start = time.perf_counter()
+        r = sweep_queue(prices, seed=args.seed, workers=args.workers, **options)
+        elapsed = time.perf_counter() - start
+        print(f'{prices.size} 个上限 x {int(args.agents):,} 人, {elapsed:.2f}s')
+        print(' 上限   数量   排队(h)  每单位浪费  耗散率  误配损失  消费者净剩余  总损失')
+        for i, p in enumerate(prices):
+            print(f'{p:5.1f} {r["q"][i]:6.1f} {r["wait"][i]:8.3f} {r["waste_per_unit"][i]:10.2f} '
+                  f'{r["dissipation"][i]:7.1%} {r["allocation_loss"][i]:9.1f} {r["cs_net"][i]:12.1f} '
+                  f'{r["dwl_queue"][i]:8.1f}')
+        return
+
+    start = time.perf_counter()
+    r = simulate_queue(args.p_ceiling, seed=args.seed, **options)
+    elapsed = time.perf_counter() - start
+    homogeneous = four_case_model(p_ceiling=args.p_ceiling)
+    print(f'{int(r["agents"]):,} 人, {elapsed:.2f}s')
+    print(f'上限价 {r["price"]:g}: 供给 {r["q"]:.1f} 单位, 需求 {r["q_demanded"]:.1f} 单位, '
+          f'{int(r["queued"]):,} 人排队, {int(r["served"]):,} 人买到, 排队 {r["wait"]:.3f} 小时')
+    print(f'每单位浪费 {r["waste_per_unit"]:.2f} (时间成本相同时为 '
+          f'{float(homogeneous["p_max_willing"]) - r["price"]:.2f}), 浪费总额 {r["waste_cost"]:.1f}, '
+          f'租金耗散 {r["dissipation"]:.1%}')
+    print(f'买到者: 平均支付意愿 {r["wtp_served"]:.2f}, 平均时间成本 {r["time_cost_served"]:.2f} '
+          f'(全体 {r["time_cost_mean"]:.2f}), 其中 {r["top_share"]:.1%} 属于支付意愿最高的那部分人')
+    print(f'消费者净剩余 {r["cs_net"]:.1f} + 排队浪费 {r["waste_cost"]:.1f} + 误配损失 {r["allocation_loss"]:.1f} '
+          f'= 理想分配 {r["cs_ideal"]:.1f}; 生产者剩余 {r["ps"]:.1f}; 总损失 {r["dwl_queue"]:.1f}')
+    if args.plot:
+        import matplotlib
+        matplotlib.use('Agg')
+        from econ1210.figures.four_case import four_case_figure
+        from econ1210.fonts import quiet_missing_glyphs
+        fig = four_case_figure(p_ceiling=args.p_ceiling, waste_per_unit=r['waste_per_unit'],
+                               allocation_loss=r['allocation_loss'])
+        with quiet_missing_glyphs():
+            fig.savefig(args.plot, dpi=100)
+        print(f'图 -> {args.plot}')
+
+
+if __name__ == '__main__':
+    main()
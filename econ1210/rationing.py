@@ -0,0 +1,119 @@
+'''
+价格上限下随机配给的 Monte Carlo 模拟 (Chapter 7 情况4)
+从需求曲线 P = a - b*Q 抽取愿意以上限价购买的消费者 (支付意愿在 [P_ceiling, a] 上),
+用抽签把 q_ceiling 个单位随机分给他们, 统计实际消费者剩余和相对理想分配的效率损失
+每个模拟消费者代表 q_demanded / n_consumers 单位的需求
+'''
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+
+from econ1210.price_control import sweep_price_controls
+
+# 每批最多生成的随机数个数, 控制内存
+_BATCH_ELEMENTS = 1 << 22
+
+
+def _stats(values):
+    '''一组样本的 (个数, 均值, 离差平方和), 用于并行合并'''
+    n = values.size
+    mean = float(values.mean()) if n else 0.0
+    return n, mean, float(((values - mean) ** 2).sum())
+
+
+def _merge(s1, s2):
+    '''合并两组 (个数, 均值, 离差平方和) (Chan 等人的并行方差公式)'''
+    n1, m1, q1 = s1
+    n2, m2, q2 = s2
+    n = n1 + n2
+    if n == 0:
+        return 0, 0.0, 0.0
+    delta = m2 - m1
+    return n, m1 + delta * n2 / n, q1 + q2 + delta ** 2 * n1 * n2 / n
+
+
+def _rationed(q, q_demanded):
+    '''上限价下有供给且短缺时才需要配给'''
+    return 0 < q < q_demanded
+
+
+def _simulate_chunk(trials, seed, p_ceiling, a, b, c, d, n_consumers):
+    '''在一个随机数流上跑 trials 次模拟, 返回每次实际消费者剩余的汇总统计'''
+    r = sweep_price_controls(p_ceiling, 0.0, 0.0, a, b, c, d)
+    q_demanded, q, price = float(r['q_demanded']), float(r['q']), float(r['price'])
+    if not _rationed(q, q_demanded):
+        # 没有供给 (上限不高于 c) 或上限不起作用: 不用抽签, 每次的剩余都是解析值
+        return trials, float(r['cs_random']), 0.0
+    rng = np.random.default_rng(seed)
+    k = min(n_consumers, max(1, round(n_consumers * q / q_demanded)))
+    unit = q_demanded / n_consumers
+
+    total = (0, 0.0, 0.0)
+    per_batch = max(1, _BATCH_ELEMENTS // n_consumers)
+    done = 0
+    while done < trials:
+        m = min(per_batch, trials - done)
+        # 反需求函数抽样: Q ~ U(0, q_demanded) 对应支付意愿 a - b*Q
+        wtp = a - b * q_demanded * rng.random((m, n_consumers))
+        # 抽签: 每人一个随机号, 号码最小的 k 人买到
+        lottery = rng.random((m, n_consumers))
+        winners = np.argpartition(lottery, k - 1, axis=1)[:, :k]
+        surplus = (np.take_along_axis(wtp, winners, axis=1) - price).sum(axis=1) * unit
+        total = _merge(total, _stats(surplus))
+        done += m
+    return total
+
+
+def _summarize(stats, p_ceiling, a, b, c, d, n_consumers, confidence):
+    n, mean, m2 = stats
+    std = math.sqrt(m2 / (n - 1)) if n > 1 else 0.0
+    se = std / math.sqrt(n) if n else 0.0
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    r = sweep_price_controls(p_ceiling, 0.0, 0.0, a, b, c, d)
+    cs_ideal = float(r['cs_ideal'])
+    return {
+        'trials': n,
+        'draws': 2 * n * n_consumers if _rationed(float(r['q']), float(r['q_demanded'])) else 0,
+        'cs_mean': mean,
+        'cs_std': std,
+        'cs_se': se,
+        'cs_ci': (mean - z * se, mean + z * se),
+        'cs_ideal': cs_ideal,
+        'cs_analytic': float(r['cs_random']),
+        'loss_mean': cs_ideal - mean,
+        'loss_ci': (cs_ideal - mean - z * se, cs_ideal - mean + z * se),
+    }
+
+
+def simulate_random_rationing(p_ceiling=25.0, a=100.0, b=2.0, c=10.0, d=1.0,
+                              n_consumers=10_000, trials=1_000, seed=None,
+                              confidence=0.95):
+    '''
+    单进程模拟, 返回实际消费者剩余的均值/标准误/置信区间, 以及效率损失
+    cs_analytic 是均匀随机配给下的精确期望值, 可用来检验模拟结果
+    '''
+    stats = _simulate_chunk(trials, seed, p_ceiling, a, b, c, d, n_consumers)
+    return _summarize(stats, p_ceiling, a, b, c, d, n_consumers, confidence)
+
+
+def simulate_random_rationing_parallel(p_ceiling=25.0, a=100.0, b=2.0, c=10.0, d=1.0,
+                                       n_consumers=10_000, trials=1_000, seed=None,
+                                       confidence=0.95, workers=None):
+    '''
+    把 trials 分给进程池, 每个进程用 SeedSequence.spawn 得到独立的随机数流,
+    最后合并各进程的 (个数, 均值, 离差平方和)
+    '''
+    workers = workers or os.cpu_count() or 1
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    counts = [trials // workers + (i < trials % workers) for i in range(workers)]
+
+    stats = (0, 0.0, 0.0)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_simulate_chunk, n, s, p_ceiling, a, b, c, d, n_consumers)
+                   for n, s in zip(counts, seeds) if n]
+        for future in futures:
+            stats = _merge(stats, future.result())
+    return _summarize(stats, p_ceiling, a, b, c, d, n_consumers, confidence)
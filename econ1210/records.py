@@ -0,0 +1,319 @@
+'''
+模型结果的结构化记录与流式导出
+每个模型的结果是一条扁平记录 (参数 + 均衡 + 剩余面积), 批量运行时按块向量化求解,
+逐块写入 NDJSON / CSV / Parquet (需要 pyarrow), 内存占用与情景总数无关;
+各章脚本打印的中文报告只是同一条记录的一种渲染方式 (render_text)
+用法:
+    python -m econ1210.records two_market --n 1000000 --vary a_asia 60 120 --vary mc 0 30 \
+        --out build/two_market.ndjson
+'''
+import argparse
+import csv
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+from econ1210.discrimination import two_market_model
+from econ1210.monopoly import solve_monopoly_subsidy
+from econ1210.price_control import four_case_model
+
+
+def _monopoly(a, b, mc, subsidy):
+    return {'a': a, 'b': b, 'mc': mc, 'subsidy': subsidy,
+            **solve_monopoly_subsidy(a, b, mc, subsidy)}
+
+
+MODELS = {
+    'monopoly': {
+        'defaults': {'a': 146.0, 'b': 0.5, 'mc': 4.0, 'subsidy': 29.0},
+        'evaluate': _monopoly,
+    },
+    'four_case': {
+        'defaults': {'a': 100.0, 'b': 2.0, 'c': 10.0, 'd': 1.0, 'p_ceiling': 25.0,
+                     'bribe_amount': 20.0, 'waste_per_unit': 15.0},
+        'evaluate': four_case_model,
+    },
+    'two_market': {
+        'defaults': {'a_asia': 92.0, 'b_asia': 2.0, 'a_europe': 64.0, 'b_europe': 2.0, 'mc': 9.0},
+        'evaluate': two_market_model,
+    },
+}
+
+
+def evaluate_batch(model, **params):
+    '''
+    向量化求解一批情景, 参数可以是等长一维数组或标量
+    返回列式结果 {字段: 一维数组}, 字段顺序固定 (先参数后结果)
+    '''
+    spec = MODELS[model]
+    values = {**spec['defaults'], **params}
+    with np.errstate(invalid='ignore', divide='ignore'):
+        result = spec['evaluate'](**values)
+    arrays = [np.asarray(v) for v in result.values()]
+    shape = np.broadcast_shapes(*(a.shape for a in arrays))
+    return {k: np.broadcast_to(a, shape).reshape(-1) for k, a in zip(result, arrays)}
+
+
+def make_record(model, **params):
+    '''单个情景的记录, 值都是 Python 数字'''
+    return {k: v.item() for k, v in evaluate_batch(model, **params).items()}
+
+
+# ---------- 流式写出 ----------
+
+class _Writer:
+    '''逐条 write(record) 或逐块 write_batch(columns); 用作上下文管理器'''
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.rows = 0
+
+    def write(self, record):
+        self.write_batch({k: [v] for k, v in record.items()})
+
+    def write_batch(self, columns):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _to_lists(columns):
+    return {k: np.asarray(v).tolist() for k, v in columns.items()}
+
+
+class NDJSONWriter(_Writer):
+    '''每行一个 JSON 对象'''
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._file = open(self.path, 'w', encoding='utf-8')
+
+    def write_batch(self, columns):
+        columns = _to_lists(columns)
+        keys = list(columns)
+        dumps = json.dumps
+        self._file.writelines(dumps(dict(zip(keys, row)), ensure_ascii=False) + '\n'
+                              for row in zip(*columns.values()))
+        self.rows += len(columns[keys[0]]) if keys else 0
+
+    def close(self):
+        self._file.close()
+
+
+class CSVWriter(_Writer):
+    '''表头取第一批的字段'''
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._file = open(self.path, 'w', encoding='utf-8', newline='')
+        self._csv = csv.writer(self._file)
+        self._fields = None
+
+    def write_batch(self, columns):
+        columns = _to_lists(columns)
+        if self._fields is None:
+            self._fields = list(columns)
+            self._csv.writerow(self._fields)
+        rows = list(zip(*(columns[k] for k in self._fields)))
+        self._csv.writerows(rows)
+        self.rows += len(rows)
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetWriter(_Writer):
+    '''每批写一个 row group; 逐条写入时先攒够 batch_rows 条'''
+
+    def __init__(self, path, batch_rows=65536):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError('导出 Parquet 需要 pyarrow: pip install pyarrow') from None
+        super().__init__(path)
+        self._pa, self._pq = pyarrow, pyarrow.parquet
+        self._writer = None
+        self._pending = []
+        self._batch_rows = batch_rows
+
+    def write(self, record):
+        self._pending.append(record)
+        if len(self._pending) >= self._batch_rows:
+            self._flush_pending()
+
+    def _flush_pending(self):
+        if self._pending:
+            pending, self._pending = self._pending, []
+            self.write_batch({k: [r[k] for r in pending] for k in pending[0]})
+
+    def write_batch(self, columns):
+        table = self._pa.table({k: np.asarray(v) for k, v in columns.items()})
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self.path, table.schema)
+        self._writer.write_table(table)
+        self.rows += table.num_rows
+
+    def close(self):
+        self._flush_pending()
+        if self._writer is not None:
+            self._writer.close()
+
+
+_WRITERS = {'.ndjson': NDJSONWriter, '.jsonl': NDJSONWriter, '.csv': CSVWriter,
+            '.parquet': ParquetWriter}
+
+
+def open_writer(path):
+    '''按扩展名选择写出格式: .ndjson / .jsonl / .csv / .parquet'''
+    suffix = Path(path).suffix.lower()
+    if suffix not in _WRITERS:
+        raise ValueError(f'不支持的格式 {suffix!r}, 可用: {sorted(_WRITERS)}')
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    return _WRITERS[suffix](path)
+
+
+def export_scenarios(model, batches, path):
+    '''把 batches (逐块产生的参数列字典) 求解后流式写入 path, 返回写出的行数'''
+    with open_writer(path) as writer:
+        for params in batches:
+            writer.write_batch(evaluate_batch(model, **params))
+    return writer.rows
+
+
+def random_batches(ranges, n, chunk=1 << 16, seed=None):
+    '''在 ranges = {参数: (下限, 上限)} 内均匀抽样 n 个情景, 按块惰性生成'''
+    rng = np.random.default_rng(seed)
+    for start in range(0, n, chunk):
+        m = min(chunk, n - start)
+        yield {k: rng.uniform(lo, hi, m) for k, (lo, hi) in ranges.items()}
+
+
+# ---------- 中文报告 ----------
+
+def _four_case_text(m):
+    ps = m['ps_ideal']
+    return '\n'.join([
+        '=== 价格上限下四种情况的对比 ===',
+        f"价格上限: P={m['p_ceiling']:g}",
+        f"成交量: Q={m['q_ceiling']:g}",
+        f"均衡: Q={m['q_eq']:g}, P={m['p_eq']:g}",
+        '',
+        '生产者剩余在不同情况下的值:',
+        f'情况1(理想): {ps:.1f}',
+        f'情况2(行贿): {ps:.1f}',
+        f'情况3(浪费): {ps:.1f}',
+        f'情况4(随机): {ps:.1f}',
+        '',
+        '结论: 生产者剩余在所有情况下都相同',
+    ])
+
+
+def _two_market_cs_lines(name, a, p_single, q_single, cs_single, p_dual, q_dual, cs_dual):
+    return [
+        f'{name}市场:',
+        f'  统一定价: 价格=${p_single:g}, 数量={q_single:.2f}M',
+        f'    消费者剩余 = 0.5 × ({a:g} - {p_single:g}) × {q_single:.2f}',
+        f'               = 0.5 × {a-p_single:.1f} × {q_single:.2f}',
+        f'               = ${cs_single:.2f}百万',
+        '',
+        f'  双定价: 价格=${p_dual:g}, 数量={q_dual:.2f}M',
+        f'    消费者剩余 = 0.5 × ({a:g} - {p_dual:g}) × {q_dual:.2f}',
+        f'               = 0.5 × {a-p_dual:.1f} × {q_dual:.2f}',
+        f'               = ${cs_dual:.2f}百万',
+        '',
+    ]
+
+
+def _two_market_text(m):
+    asia_change = m['cs_asia_single'] - m['cs_asia_dual']
+    europe_change = m['cs_europe_dual'] - m['cs_europe_single']
+    return '\n'.join([
+        f"统一定价: P=${m['P_single']:g}",
+        f"亚洲: Q={m['Q_asia_single']:.2f}, CS=${m['cs_asia_single']:.2f}百万",
+        f"欧洲: Q={m['Q_europe_single']:.2f}, CS=${m['cs_europe_single']:.2f}百万",
+        '',
+        '双定价:',
+        f"亚洲: P=${m['P_asia_dual']:g}, Q={m['Q_asia_dual']:.2f}, CS=${m['cs_asia_dual']:.2f}百万",
+        f"欧洲: P=${m['P_europe_dual']:g}, Q={m['Q_europe_dual']:.2f}, CS=${m['cs_europe_dual']:.2f}百万",
+        '',
+        f'亚洲消费者剩余变化: ${asia_change:.2f}百万',
+        f'欧洲消费者剩余变化: ${europe_change:.2f}百万',
+        '',
+        '=' * 60,
+        '消费者剩余详细计算:',
+        '=' * 60,
+        *_two_market_cs_lines('亚洲', m['a_asia'], m['P_single'], m['Q_asia_single'], m['cs_asia_single'],
+                              m['P_asia_dual'], m['Q_asia_dual'], m['cs_asia_dual']),
+        f"  亚洲消费者剩余变化: ${m['cs_asia_single']:.2f} - ${m['cs_asia_dual']:.2f} = ${asia_change:.2f}百万",
+        f'  所以亚洲消费者愿意花${asia_change:.2f}百万游说统一定价',
+        '',
+        *_two_market_cs_lines('欧洲', m['a_europe'], m['P_single'], m['Q_europe_single'], m['cs_europe_single'],
+                              m['P_europe_dual'], m['Q_europe_dual'], m['cs_europe_dual']),
+        f"  欧洲消费者剩余变化: ${m['cs_europe_dual']:.2f} - ${m['cs_europe_single']:.2f} = ${europe_change:.2f}百万",
+        f'  所以欧洲消费者愿意花${europe_change:.2f}百万游说双定价',
+    ])
+
+
+def _monopoly_text(m):
+    return '\n'.join([
+        f"需求: P = {m['a']:g} - {m['b']:g}Q, 边际成本: MC = {m['mc']:g}, 补贴: {m['subsidy']:g}",
+        f"原垄断: Q={m['q_monopoly']:g}, P={m['p_monopoly']:g}, DWL={m['dwl_monopoly']:.1f}",
+        f"补贴后: Q={m['q_subsidy']:g}, Pc={m['p_consumer']:.1f}, Ps={m['p_producer']:.1f}, "
+        f"DWL={m['dwl_subsidy']:.1f}",
+        f"社会最优: Q={m['q_competitive']:g}, P={m['p_competitive']:g}",
+        f"补贴总成本: {m['subsidy_cost']:.1f}",
+    ])
+
+
+_TEXT = {'four_case': _four_case_text, 'two_market': _two_market_text, 'monopoly': _monopoly_text}
+
+
+def render_text(model, record):
+    '''把一条记录渲染成各章脚本使用的中文报告'''
+    return _TEXT[model](record)
+
+
+def _parse_range(values):
+    name, lo, hi = values
+    return name, (float(lo), float(hi))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='批量求解模型并流式导出结构化记录')
+    parser.add_argument('model', choices=sorted(MODELS))
+    parser.add_argument('--out', default=None, help='输出路径 (.ndjson/.jsonl/.csv/.parquet); 省略时打印中文报告')
+    parser.add_argument('--n', type=int, default=1, help='情景数')
+    parser.add_argument('--vary', nargs=3, action='append', default=[], metavar=('NAME', 'LO', 'HI'),
+                        help='在区间内均匀抽样的参数, 可重复')
+    parser.add_argument('--chunk', type=int, default=1 << 16)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+    if args.n < 1:
+        parser.error('--n 必须是正整数')
+    if args.n > 1 and not args.vary:
+        parser.error('--n 大于 1 时需要至少一个 --vary, 否则所有情景都相同')
+    if args.out is None and (args.n > 1 or args.vary):
+        parser.error('--n / --vary 只在批量导出时有效, 请同时给出 --out')
+
+    if args.out is None:
+        print(render_text(args.model, make_record(args.model)))
+        return
+    ranges = dict(_parse_range(v) for v in args.vary)
+    start = time.perf_counter()
+    rows = export_scenarios(args.model, random_batches(ranges, args.n, args.chunk, args.seed), args.out)
+    elapsed = time.perf_counter() - start
+    print(f'{rows} 条记录 -> {args.out}, 用时 {elapsed:.2f}s ({rows / elapsed:,.0f} 条/秒)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+'''
+无界面批量渲染: 用进程池把每个图形的 N 个参数变体渲染到目标目录
+用法:
+    python -m econ1210.render --out build/figures --variants 8 --formats png svg
+    python -m econ1210.render ch11_monopoly --variants 100 --workers 8 --param mc=6
+    python -m econ1210.render --cache ~/.cache/econ1210 --cache-mb 256
+'''
+import argparse
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from econ1210.cache import FigureCache
+from econ1210.figures import FIGURES, get_figure
+
+
+# 每个工作进程各自持有一个缓存对象 (共享同一个目录)
+_cache = None
+
+
+def _init_worker(cache_dir=None, cache_bytes=None):
+    # 必须在导入 pyplot 之前强制使用 Agg 后端, 否则 plt.show() / GUI 后端会阻塞
+    import matplotlib
+    matplotlib.use('Agg', force=True)
+
+    global _cache
+    if cache_dir is not None:
+        _cache = FigureCache(cache_dir, cache_bytes)
+
+
+def render_one(name, params, path_stem, formats, dpi):
+    '''
+    渲染一个图形变体并按各格式保存, 返回 (耗时秒, 缓存命中数, 未命中数)
+    配置了缓存时直接从缓存取字节写文件
+    '''
+    start = time.perf_counter()
+    if _cache is not None:
+        hits, misses = _cache.hits, _cache.misses
+        for fmt in formats:
+            Path(f'{path_stem}.{fmt}').write_bytes(_cache.render(name, params, fmt, dpi))
+        return (time.perf_counter() - start,
+                _cache.hits - hits, _cache.misses - misses)
+
+    import matplotlib.pyplot as plt
+
+    from econ1210.fonts import quiet_missing_glyphs
+
+    fig = get_figure(name)(**params)
+    try:
+        with quiet_missing_glyphs():
+            for fmt in formats:
+                fig.savefig(f'{path_stem}.{fmt}', format=fmt, dpi=dpi)
+    finally:
+        plt.close(fig)
+    return time.perf_counter() - start, 0, 0
+
+
+def make_variants(name, n, overrides=None):
+    '''沿注册表中的扫描参数生成 n 组参数'''
+    key, low, high = FIGURES[name]['sweep']
+    values = np.linspace(low, high, n) if n > 1 else [None]
+    variants = []
+    for value in values:
+        params = dict(overrides or {})
+        if value is not None:
+            params[key] = float(value)
+        variants.append(params)
+    return variants
+
+
+def render_batch(names, n_variants, out_dir, formats=('png',), dpi=100,
+                 workers=None, overrides=None, cache_dir=None, cache_bytes=512 * 1024 ** 2):
+    '''
+    把 names 中每个图形的 n_variants 个变体分发到进程池渲染
+    返回 {图形名: [每个变体的耗时]}, 总墙钟时间, 以及缓存 (命中, 未命中) 计数
+    '''
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = []
+    for name in names:
+        for i, params in enumerate(make_variants(name, n_variants, overrides)):
+            jobs.append((name, params, os.path.join(out_dir, f'{name}_{i:04d}')))
+
+    timings = defaultdict(list)
+    hits = misses = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(cache_dir, cache_bytes)) as pool:
+        futures = [(name, pool.submit(render_one, name, params, stem, formats, dpi))
+                   for name, params, stem in jobs]
+        for name, future in futures:
+            elapsed, h, m = future.result()
+            timings[name].append(elapsed)
+            hits += h
+            misses += m
+    return dict(timings), time.perf_counter() - start, (hits, misses)
+
+
+def _parse_param(text):
+    key, _, value = text.partition('=')
+    return key, float(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='批量渲染章节图形 (Agg 后端, 进程池)')
+    parser.add_argument('figures', nargs='*', help=f'图形名, 默认全部: {", ".join(FIGURES)}')
+    parser.add_argument('--out', default='build/figures', help='输出目录')
+    parser.add_argument('--variants', type=int, default=1, help='每个图形的参数变体数')
+    parser.add_argument('--formats', nargs='+', default=['png'], choices=['png', 'svg', 'pdf'])
+    parser.add_argument('--dpi', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=None, help='进程数, 默认 CPU 核数')
+    parser.add_argument('--param', action='append', type=_parse_param, default=[],
+                        metavar='KEY=VALUE', help='固定的模型参数, 可重复')
+    parser.add_argument('--cache', default=None, metavar='DIR', help='图形缓存目录, 默认不缓存')
+    parser.add_argument('--cache-mb', type=float, default=512, help='缓存总大小上限 (MB)')
+    args = parser.parse_args(argv)
+
+    names = args.figures or list(FIGURES)
+    timings, wall, (hits, misses) = render_batch(
+        names, args.variants, args.out, args.formats, args.dpi, args.workers,
+        dict(args.param), args.cache, int(args.cache_mb * 1024 ** 2))
+
+    total = 0
+    for name, times in timings.items():
+        total += len(times)
+        print(f'{name:20s} {len(times):5d} 个  总计 {sum(times):8.2f}s  '
+              f'平均 {np.mean(times)*1000:8.1f}ms  最长 {max(times)*1000:8.1f}ms')
+    print(f'墙钟时间 {wall:.2f}s, 吞吐量 {total / wall:.1f} 图/秒')
+    if args.cache:
+        print(f'缓存命中 {hits}, 未命中 {misses}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+'''
+曲线的自适应采样: 用尽量少的顶点在给定误差内画出曲线
+直线只取两个端点; 折线在折点处取点; 非线性曲线先粗采样, 再在弦误差超限的区间中点细分,
+最后去掉对形状没有贡献的顶点 (按参数线性插值的 Douglas-Peucker 简化)
+误差按每个分量自身的取值范围取相对值, tol=1e-3 约为 1000 像素坐标轴上的 1 像素
+'''
+import numpy as np
+
+from econ1210.welfare import Linear
+
+
+def _evaluate(func, t):
+    '''func(t) 可以返回一个数组或数组元组, 统一成形状 (分量数, len(t))'''
+    values = func(t)
+    if not isinstance(values, (tuple, list)):
+        values = (values,)
+    return np.stack([np.broadcast_to(np.asarray(v, dtype=float), t.shape) for v in values])
+
+
+def _simplify(t, values, scale):
+    '''保留首尾, 反复加入偏离首尾线性插值最远且超出误差的顶点, 返回保留顶点的布尔掩码'''
+    keep = np.zeros(t.size, dtype=bool)
+    keep[[0, -1]] = True
+    stack = [(0, t.size - 1)]
+    while stack:
+        i, j = stack.pop()
+        if j - i < 2:
+            continue
+        w = (t[i+1:j] - t[i]) / (t[j] - t[i])
+        chord = values[:, i, None] * (1 - w) + values[:, j, None] * w
+        err = np.max(np.abs(values[:, i+1:j] - chord) / scale, axis=0)
+        k = int(np.argmax(err))
+        if err[k] > 1.0:
+            keep[i + 1 + k] = True
+            stack += [(i, i + 1 + k), (i + 1 + k, j)]
+    return keep
+
+
+def sample_adaptive(func, lo, hi, tol=1e-3, breakpoints=(), n_initial=17, max_depth=16):
+    '''
+    在 [lo, hi] 上自适应采样 func(t), 返回 (t, values), values 形状 (分量数, 顶点数)
+    breakpoints: 已知折点 (如分段需求的截距), 保证初始网格包含它们
+    参数曲线 (如按价格取样的总需求 Q(P)) 让 func 返回 (x, y) 两个分量即可
+    '''
+    t = np.linspace(lo, hi, n_initial)
+    extra = [float(b) for b in breakpoints if lo < b < hi]
+    if extra:
+        t = np.union1d(t, extra)
+    values = _evaluate(func, t)
+
+    finite = np.where(np.isfinite(values), values, np.nan)
+    span = np.nanmax(finite, axis=1) - np.nanmin(finite, axis=1)
+    span = np.where(np.isfinite(span) & (span > 0), span, 1.0)
+    scale = (tol * span)[:, None]
+
+    for _ in range(max_depth):
+        mid = 0.5 * (t[:-1] + t[1:])
+        mid_values = _evaluate(func, mid)
+        err = np.max(np.abs(mid_values - 0.5 * (values[:, :-1] + values[:, 1:])) / scale, axis=0)
+        bad = err > 1.0
+        if not bad.any():
+            break
+        at = np.nonzero(bad)[0] + 1
+        t = np.insert(t, at, mid[bad])
+        values = np.insert(values, at, mid_values[:, bad], axis=1)
+
+    keep = _simplify(t, values, scale)
+    return t[keep], values[:, keep]
+
+
+def sample_curve(curve, lo, hi, tol=1e-3, breakpoints=()):
+    '''
+    y = curve(x) 在 [lo, hi] 上的最少顶点 (x, y)
+    welfare.Linear 直接返回两个端点, 其余可调用对象走自适应采样
+    '''
+    if isinstance(curve, Linear):
+        x = np.array([lo, hi], dtype=float)
+        return x, curve(x)
+    x, values = sample_adaptive(curve, lo, hi, tol, breakpoints)
+    return x, values[0]
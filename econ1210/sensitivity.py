@@ -0,0 +1,263 @@
+'''
+二维/三维参数网格上的敏感性分析
+把网格按扁平下标切块分给进程池, 各进程直接写入同一个内存映射的 .npy 文件
+(形状 (指标数, *网格形状)), 网格可以大于内存; 同名 .json 记录模型、坐标轴和指标名
+画图时只读取需要的切片, 并按步长抽样到不超过 max_pixels
+用法:
+    python -m econ1210.sensitivity run monopoly --axis subsidy 0 80 2001 --axis mc 0 40 2001 \
+        --out build/monopoly_grid.npy
+    python -m econ1210.sensitivity run discrimination --axis a_asia 60 120 1000 \
+        --axis a_europe 40 100 1000 --out build/discrim_grid.npy
+    python -m econ1210.sensitivity plot build/monopoly_grid.npy --metric dwl --out dwl.png
+'''
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+
+from econ1210.discrimination import solve_price_discrimination
+from econ1210.monopoly import solve_monopoly_subsidy
+from econ1210.welfare import consumer_surplus, linear_demand, producer_surplus
+
+
+def _monopoly_metrics(a, b, mc, subsidy):
+    '''补贴相对原垄断的变化: 生产者剩余含补贴收入, 补贴成本由政府承担'''
+    eq = solve_monopoly_subsidy(a, b, mc, subsidy)
+    demand = linear_demand(a, b)
+    cs_m = consumer_surplus(demand, eq['p_monopoly'], eq['q_monopoly'])
+    cs_s = consumer_surplus(demand, eq['p_consumer'], eq['q_subsidy'])
+    ps_m = producer_surplus(mc, eq['p_monopoly'], eq['q_monopoly'])
+    ps_s = producer_surplus(mc, eq['p_producer'], eq['q_subsidy'])
+    return {
+        'dwl': eq['dwl_subsidy'],
+        'dwl_change': eq['dwl_subsidy'] - eq['dwl_monopoly'],
+        'producer_gain': ps_s - ps_m,
+        'consumer_gain': cs_s - cs_m,
+        'subsidy_cost': eq['subsidy_cost'],
+        'q': eq['q_subsidy'],
+    }
+
+
+def _discrimination_metrics(a_asia, b_asia, a_europe, b_europe, mc):
+    '''双定价相对统一定价的变化'''
+    a = np.stack(np.broadcast_arrays(a_asia, a_europe), axis=-1)
+    b = np.stack(np.broadcast_arrays(b_asia, b_europe), axis=-1)
+    r = solve_price_discrimination(a, b, mc)
+    cs_change = r['cs_discrim'] - r['cs_uniform']
+    return {
+        'dwl_uniform': r['dwl_uniform'].sum(axis=-1),
+        'dwl_discrim': r['dwl_discrim'].sum(axis=-1),
+        'producer_gain': (r['ps_discrim'] - r['ps_uniform']).sum(axis=-1),
+        'consumer_loss': -cs_change.sum(axis=-1),
+        'cs_change_asia': cs_change[..., 0],
+        'cs_change_europe': cs_change[..., 1],
+        'p_uniform': r['p_uniform'],
+    }
+
+
+MODELS = {
+    'monopoly': {
+        'defaults': {'a': 146.0, 'b': 0.5, 'mc': 4.0, 'subsidy': 29.0},
+        'metrics': ('dwl', 'dwl_change', 'producer_gain', 'consumer_gain', 'subsidy_cost', 'q'),
+        'evaluate': _monopoly_metrics,
+    },
+    'discrimination': {
+        'defaults': {'a_asia': 92.0, 'b_asia': 2.0, 'a_europe': 64.0, 'b_europe': 2.0, 'mc': 9.0},
+        'metrics': ('dwl_uniform', 'dwl_discrim', 'producer_gain', 'consumer_loss',
+                    'cs_change_asia', 'cs_change_europe', 'p_uniform'),
+        'evaluate': _discrimination_metrics,
+    },
+}
+
+
+def _meta_path(path):
+    return Path(path).with_suffix('.json')
+
+
+def _axis_values(axis):
+    name, lo, hi, n = axis
+    return np.linspace(lo, hi, int(n))
+
+
+def _compute_chunk(path, model, axes, fixed, start, stop):
+    '''计算扁平下标 [start, stop) 的网格点, 直接写入内存映射文件'''
+    spec = MODELS[model]
+    shape = tuple(int(n) for _, _, _, n in axes)
+    index = np.unravel_index(np.arange(start, stop), shape)
+    params = {**spec['defaults'], **fixed}
+    for (name, *_), axis, idx in zip(axes, map(_axis_values, axes), index):
+        params[name] = axis[idx]
+    metrics = spec['evaluate'](**params)
+
+    out = np.load(path, mmap_mode='r+')
+    flat = out.reshape(len(spec['metrics']), -1)
+    for i, name in enumerate(spec['metrics']):
+        flat[i, start:stop] = metrics[name]
+    out.flush()
+    del out
+    return stop - start
+
+
+def run_grid(model, axes, out, fixed=None, workers=None, chunk=1 << 18):
+    '''
+    在 axes = [(参数名, 下限, 上限, 点数), ...] 张成的网格上计算 model 的全部指标
+    结果写入 out (.npy, 形状 (指标数, *网格形状)) 和同名 .json, 返回 (路径, 耗时秒)
+    '''
+    if model not in MODELS:
+        raise ValueError(f'未知模型 {model!r}, 可用: {sorted(MODELS)}')
+    spec = MODELS[model]
+    fixed = dict(fixed or {})
+    if not 2 <= len(axes) <= 3:
+        raise ValueError(f'需要 2 或 3 个坐标轴, 收到 {len(axes)} 个')
+    names = [name for name, *_ in axes]
+    if len(set(names)) != len(names):
+        raise ValueError(f'坐标轴重复: {names}')
+    for name, *_ in axes:
+        if name not in spec['defaults']:
+            raise ValueError(f'{model} 没有参数 {name!r}, 可用: {sorted(spec["defaults"])}')
+    unknown = set(fixed) - set(spec['defaults'])
+    if unknown:
+        raise ValueError(f'{model} 没有参数 {sorted(unknown)}, 可用: {sorted(spec["defaults"])}')
+    axes = [(name, float(lo), float(hi), int(n)) for name, lo, hi, n in axes]
+    shape = tuple(n for *_, n in axes)
+    total = int(np.prod(shape))
+
+    out = Path(out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    np.lib.format.open_memmap(out, mode='w+', dtype=np.float64,
+                              shape=(len(spec['metrics']),) + shape).flush()
+    _meta_path(out).write_text(json.dumps({
+        'model': model,
+        'axes': axes,
+        'metrics': list(spec['metrics']),
+        'fixed': {**spec['defaults'], **fixed},
+    }, ensure_ascii=False, indent=2), encoding='utf-8')
+
+    start_time = time.perf_counter()
+    bounds = [(s, min(s + chunk, total)) for s in range(0, total, chunk)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for s, e in bounds:
+            _compute_chunk(out, model, axes, fixed, s, e)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_compute_chunk, out, model, axes, fixed, s, e) for s, e in bounds]
+            for future in as_completed(futures):
+                future.result()
+    return out, time.perf_counter() - start_time
+
+
+def open_grid(path):
+    '''以只读内存映射方式打开结果, 返回 (数组, 元数据)'''
+    meta = json.loads(_meta_path(path).read_text(encoding='utf-8'))
+    return np.load(path, mmap_mode='r'), meta
+
+
+def plot_grid(path, metric, at=None, max_pixels=800, levels=10):
+    '''
+    画某个指标的热力图和等高线, 三维网格用 at={参数名: 取值} 固定其余坐标轴
+    只读取所需切片, 每个方向按步长抽样到不超过 max_pixels 个点
+    '''
+    import matplotlib.pyplot as plt
+    from econ1210.figures import configure_fonts
+    from econ1210.labels import tight_layout
+
+    configure_fonts()
+    data, meta = open_grid(path)
+    axes = meta['axes']
+    if metric not in meta['metrics']:
+        raise ValueError(f'未知指标 {metric!r}, 可用: {meta["metrics"]}')
+    at = dict(at or {})
+    unknown = set(at) - {name for name, *_ in axes}
+    if unknown:
+        raise ValueError(f'--at 的 {sorted(unknown)} 不是网格的坐标轴, 可用: {[name for name, *_ in axes]}')
+
+    index = [meta['metrics'].index(metric)]
+    free = []
+    for name, lo, hi, n in axes:
+        values = np.linspace(lo, hi, n)
+        if name in at:
+            index.append(int(np.abs(values - at[name]).argmin()))
+        elif len(free) < 2:
+            step = max(1, -(-n // max_pixels))
+            index.append(slice(None, None, step))
+            free.append((name, values[::step]))
+        else:
+            index.append(n // 2)
+            at[name] = values[n // 2]
+    if len(free) != 2:
+        raise ValueError('需要恰好两个不固定的坐标轴')
+
+    z = np.asarray(data[tuple(index)])
+    (y_name, y), (x_name, x) = free
+    fig, ax = plt.subplots(figsize=(8, 6.5))
+    mesh = ax.pcolormesh(x, y, z, shading='auto', cmap='viridis')
+    contours = ax.contour(x, y, z, levels=levels, colors='white', linewidths=0.7)
+    ax.clabel(contours, fontsize=8, fmt='%.0f')
+    fig.colorbar(mesh, ax=ax, label=metric)
+    ax.set_xlabel(x_name)
+    ax.set_ylabel(y_name)
+    fixed = ', '.join(f'{k}={v:g}' for k, v in at.items())
+    ax.set_title(f'{meta["model"]}: {metric}' + (f' ({fixed})' if fixed else ''))
+    tight_layout(fig)
+    return fig
+
+
+def _parse_param(text):
+    key, _, value = text.partition('=')
+    return key, float(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='参数网格敏感性分析 (进程池 + 内存映射 .npy)')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run = sub.add_parser('run', help='计算网格')
+    run.add_argument('model', choices=sorted(MODELS))
+    run.add_argument('--axis', nargs=4, action='append', required=True,
+                     metavar=('NAME', 'LO', 'HI', 'N'), help='网格坐标轴, 可重复 (2 或 3 次)')
+    run.add_argument('--param', action='append', type=_parse_param, default=[],
+                     metavar='KEY=VALUE', help='固定的模型参数, 可重复')
+    run.add_argument('--out', required=True, help='输出 .npy 路径')
+    run.add_argument('--workers', type=int, default=None, help='进程数, 默认 CPU 核数')
+    run.add_argument('--chunk', type=int, default=1 << 18, help='每块的网格点数')
+
+    plot = sub.add_parser('plot', help='从 .npy 结果画热力图')
+    plot.add_argument('path')
+    plot.add_argument('--metric', required=True)
+    plot.add_argument('--at', action='append', type=_parse_param, default=[],
+                      metavar='NAME=VALUE', help='三维网格时固定的坐标轴取值')
+    plot.add_argument('--out', default=None, help='保存图片, 默认弹出窗口')
+    plot.add_argument('--dpi', type=int, default=150)
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        valid = sorted(MODELS[args.model]['defaults'])
+        unknown = sorted({key for key, _ in args.param} - set(valid))
+        if unknown:
+            run.error(f'--param {unknown}: {args.model} 没有这些参数, 可用: {valid}')
+        axes = [(name, float(lo), float(hi), int(n)) for name, lo, hi, n in args.axis]
+        path, elapsed = run_grid(args.model, axes, args.out, dict(args.param),
+                                 args.workers, args.chunk)
+        points = int(np.prod([n for *_, n in axes]))
+        print(f'{points} 个网格点, 用时 {elapsed:.2f}s ({points / elapsed / 1e6:.1f}M 点/秒) -> {path}')
+    else:
+        if args.out:
+            import matplotlib
+            matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        from econ1210.fonts import quiet_missing_glyphs
+        fig = plot_grid(args.path, args.metric, dict(args.at))
+        with quiet_missing_glyphs():
+            if args.out:
+                fig.savefig(args.out, dpi=args.dpi, bbox_inches='tight')
+            else:
+                plt.show()
+
+
+if __name__ == '__main__':
+    main()
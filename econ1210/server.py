@@ -0,0 +1,348 @@
+'''
+本地图形渲染服务: asyncio HTTP 前端 + 常驻的 matplotlib 进程池
+每次请求都启动 Python 运行章节脚本, 要先花几百毫秒导入 matplotlib、设置字体;
+这里工作进程启动时就导入好并把每张图预渲染一次, 之后的请求只剩绘图本身
+请求先查按参数寻址的图形缓存 (econ1210.cache), 未命中才交给进程池;
+相同参数的并发请求共用一次渲染
+    GET  /figures                         图形名和可扫描的参数
+    GET  /stats                           队列、缓存和请求计数
+    GET  /render/<图形名>?mc=6&format=svg&dpi=100
+    POST /render/<图形名>                 正文 {"params": {...}, "format": "png", "dpi": 100}
+背压: 排队中的不同渲染超过 max_pending 时直接返回 503 (带 Retry-After), 不无限排队
+超时: 渲染超过 timeout 秒返回 504; 渲染本身不会中断, 完成后照样写入缓存
+用法:
+    python -m econ1210.server --port 8050 --workers 4
+    curl -o m.png 'http://127.0.0.1:8050/render/ch11_monopoly?subsidy=40'
+'''
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from econ1210.cache import FigureCache, cache_key
+from econ1210.figures import FIGURES
+
+CONTENT_TYPES = {'png': 'image/png', 'svg': 'image/svg+xml', 'pdf': 'application/pdf'}
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            408: 'Request Timeout', 413: 'Payload Too Large', 431: 'Request Header Fields Too Large',
+            500: 'Internal Server Error', 503: 'Service Unavailable', 504: 'Gateway Timeout'}
+_MAX_BODY = 64 * 1024
+_WARMUP_TIMEOUT = 120.0
+# 需求/供给曲线的斜率参数, 必须为正 (为零时模型里要除以零)
+_SLOPES = ('b', 'd', 'b_asia', 'b_europe')
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+# ---------- 工作进程 ----------
+
+def _init_worker(ready, timeout):
+    '''
+    导入 matplotlib、设置字体, 并把每张图渲染一次, 让字体和各模块都预热好
+    预热失败时打破屏障, 其余进程不再空等; 屏障等待超过 timeout 秒抛出 BrokenBarrierError
+    '''
+    try:
+        import matplotlib
+        matplotlib.use('Agg', force=True)
+        from econ1210.cache import render_bytes
+        for name in FIGURES:
+            render_bytes(name, {}, 'png', 30)
+    except BaseException:
+        ready.abort()
+        raise
+    ready.wait(timeout)  # 等全部进程都预热完再开始接任务
+
+
+def _render(name, params, fmt, dpi):
+    from econ1210.cache import render_bytes
+    return render_bytes(name, params, fmt, dpi)
+
+
+def _ping():
+    return os.getpid()
+
+
+# ---------- 请求解析 ----------
+
+def _number(key, value):
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise HTTPError(400, f'参数 {key} 必须是数值')
+    try:
+        number = float(value)
+    except ValueError:
+        raise HTTPError(400, f'参数 {key} 必须是数值: {value!r}') from None
+    if not math.isfinite(number):
+        raise HTTPError(400, f'参数 {key} 必须是有限数值: {value!r}')
+    return number
+
+
+def _check_params(params):
+    '''渲染前拒绝模型无法处理的参数 (斜率为零或负)'''
+    for key in _SLOPES:
+        if key in params and params[key] <= 0:
+            raise HTTPError(400, f'参数 {key} 是曲线斜率, 必须为正: {params[key]:g}')
+
+
+def _render_request(query, body):
+    '''从查询串或 JSON 正文取出 (params, format, dpi)'''
+    options = dict(query)
+    params = {k: v for k, v in options.items() if k not in ('format', 'dpi')}
+    if body:
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            raise HTTPError(400, '请求正文不是合法的 JSON') from None
+        if not isinstance(payload, dict) or not isinstance(payload.get('params', {}), dict):
+            raise HTTPError(400, '请求正文应为 {"params": {...}, "format": ..., "dpi": ...}')
+        params.update(payload.get('params', {}))
+        options.update({k: payload[k] for k in ('format', 'dpi') if k in payload})
+    fmt = options.get('format', 'png')
+    if fmt not in CONTENT_TYPES:
+        raise HTTPError(400, f'不支持的格式 {fmt!r}, 可用: {sorted(CONTENT_TYPES)}')
+    dpi = _number('dpi', options.get('dpi', 100))
+    if not 10 <= dpi <= 600:
+        raise HTTPError(400, 'dpi 应在 10 到 600 之间')
+    return {k: _number(k, v) for k, v in params.items()}, fmt, int(dpi)
+
+
+# ---------- 服务 ----------
+
+class RenderServer:
+    '''
+    workers: 渲染进程数; max_pending: 同时排队/渲染的不同请求上限, 超出返回 503
+    timeout: 单次渲染的等待上限 (秒); read_timeout: 读请求头/正文和空闲长连接的上限
+    warmup_timeout: 启动时等全部进程预热完的上限 (秒), 超时或有进程预热失败则启动失败
+    cache: FigureCache 或 None
+    '''
+
+    def __init__(self, workers=None, cache=None, max_pending=None, timeout=10.0, read_timeout=5.0,
+                 warmup_timeout=_WARMUP_TIMEOUT):
+        self.workers = workers or os.cpu_count() or 1
+        self.cache = cache
+        self.max_pending = max_pending or 4 * self.workers
+        self.timeout = timeout
+        self.read_timeout = read_timeout
+        self.warmup_timeout = warmup_timeout
+        self.pool = None
+        self._inflight = {}
+        self.counts = {'requests': 0, 'rendered': 0, 'shared': 0, 'hits': 0,
+                       'rejected': 0, 'timeouts': 0, 'errors': 0}
+
+    def start_pool(self):
+        '''启动并预热全部工作进程, 返回 (进程数, 耗时秒); 预热失败或超时抛出 RuntimeError'''
+        start = time.perf_counter()
+        context = multiprocessing.get_context('spawn')
+        self.pool = ProcessPoolExecutor(self.workers, mp_context=context, initializer=_init_worker,
+                                        initargs=(context.Barrier(self.workers), self.warmup_timeout))
+        # 同时提交 workers 个任务, 进程池会为每个任务启动一个进程; 它们在屏障处等齐后才返回
+        try:
+            for future in [self.pool.submit(_ping) for _ in range(self.workers)]:
+                future.result()
+        except BrokenProcessPool as exc:
+            self.close()
+            raise RuntimeError('渲染进程预热失败或超时, 服务未启动') from exc
+        return self.workers, time.perf_counter() - start
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+
+    async def render(self, name, params, fmt, dpi):
+        '''返回 (图形字节, 来源: hit / miss / shared)'''
+        key = cache_key(name, params, fmt, dpi)
+        if self.cache is not None:
+            data = self.cache.get(key)
+            if data is not None:
+                self.counts['hits'] += 1
+                return data, 'hit'
+
+        task = self._inflight.get(key)
+        source = 'shared'
+        if task is None:
+            if len(self._inflight) >= self.max_pending:
+                self.counts['rejected'] += 1
+                raise HTTPError(503, '渲染队列已满, 请稍后重试', {'Retry-After': '1'})
+            task = asyncio.ensure_future(self._render_and_store(key, name, params, fmt, dpi))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+            source = 'miss'
+        else:
+            self.counts['shared'] += 1
+        try:
+            # shield: 单个请求超时不取消渲染, 结果仍会写入缓存供后续请求使用
+            return await asyncio.wait_for(asyncio.shield(task), self.timeout), source
+        except asyncio.TimeoutError:
+            self.counts['timeouts'] += 1
+            raise HTTPError(504, f'渲染超过 {self.timeout:g}s') from None
+
+    async def _render_and_store(self, key, name, params, fmt, dpi):
+        loop = asyncio.get_running_loop()
+        data = await loop.run_in_executor(self.pool, _render, name, params, fmt, dpi)
+        self.counts['rendered'] += 1
+        if self.cache is not None:
+            self.cache.put(key, data)
+        return data
+
+    def _done(self, key, task):
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # 没有请求在等时也取走异常, 避免 "never retrieved" 日志
+
+    def stats(self):
+        return {
+            'workers': self.workers,
+            'pending': len(self._inflight),
+            'max_pending': self.max_pending,
+            'timeout': self.timeout,
+            **self.counts,
+            'cache': self.cache.stats() if self.cache is not None else None,
+        }
+
+    async def dispatch(self, method, target, body):
+        '''返回 (状态码, Content-Type, 正文字节, 额外响应头)'''
+        url = urlsplit(target)
+        path = unquote(url.path).rstrip('/')
+        if path == '/figures':
+            listing = {name: {'sweep': entry['sweep']} for name, entry in FIGURES.items()}
+            return 200, 'application/json', json.dumps(listing).encode(), {}
+        if path == '/stats':
+            return 200, 'application/json', json.dumps(self.stats()).encode(), {}
+        if not path.startswith('/render/'):
+            raise HTTPError(404, f'未知路径 {path}')
+        if method not in ('GET', 'POST'):
+            raise HTTPError(405, '只支持 GET 和 POST', {'Allow': 'GET, POST'})
+        name = path[len('/render/'):]
+        if name not in FIGURES:
+            raise HTTPError(404, f'未知图形 {name!r}, 可用: {sorted(FIGURES)}')
+
+        params, fmt, dpi = _render_request(parse_qsl(url.query), body)
+        _check_params(params)
+        try:
+            data, source = await self.render(name, params, fmt, dpi)
+        except TypeError as exc:
+            raise HTTPError(400, f'参数不适用于 {name}: {exc}') from None
+        return 200, CONTENT_TYPES[fmt], data, {'X-Cache': source}
+
+    async def handle(self, reader, writer):
+        '''一个连接上按 HTTP/1.1 长连接依次处理请求'''
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), self.read_timeout)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._respond(writer, 431, 'application/json',
+                                        json.dumps({'error': '请求头过长'}).encode(), {}, False)
+                    break
+                keep_alive = await self._serve_one(reader, writer, head)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _serve_one(self, reader, writer, head):
+        self.counts['requests'] += 1
+        lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, target, version = lines[0].split(' ', 2)
+        except ValueError:
+            await self._respond(writer, 400, 'application/json', b'{"error": "bad request line"}', {}, False)
+            return False
+        headers = {}
+        for line in lines[1:]:
+            key, _, value = line.partition(':')
+            if key:
+                headers[key.strip().lower()] = value.strip()
+        keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+
+        try:
+            try:
+                length = int(headers.get('content-length', 0))
+            except ValueError:
+                keep_alive = False
+                raise HTTPError(400, 'bad content-length') from None
+            if length < 0:
+                keep_alive = False
+                raise HTTPError(400, 'bad content-length')
+            if length > _MAX_BODY:
+                keep_alive = False
+                raise HTTPError(413, '请求正文过大')
+            try:
+                body = await asyncio.wait_for(reader.readexactly(length), self.read_timeout) if length else b''
+            except asyncio.TimeoutError:
+                keep_alive = False
+                raise HTTPError(408, '读取请求正文超时') from None
+            status, ctype, payload, extra = await self.dispatch(method, target, body)
+        except HTTPError as exc:
+            status, ctype, extra = exc.status, 'application/json', exc.headers
+            payload = json.dumps({'error': str(exc)}, ensure_ascii=False).encode()
+        except Exception as exc:
+            self.counts['errors'] += 1
+            status, ctype, extra = 500, 'application/json', {}
+            payload = json.dumps({'error': f'{type(exc).__name__}: {exc}'}, ensure_ascii=False).encode()
+        await self._respond(writer, status, ctype, payload, extra, keep_alive)
+        return keep_alive
+
+    @staticmethod
+    async def _respond(writer, status, ctype, payload, extra, keep_alive):
+        headers = {'Content-Type': ctype, 'Content-Length': str(len(payload)),
+                   'Connection': 'keep-alive' if keep_alive else 'close', **extra}
+        head = f'HTTP/1.1 {status} {_REASONS.get(status, "")}\r\n' + ''.join(
+            f'{k}: {v}\r\n' for k, v in headers.items()) + '\r\n'
+        writer.write(head.encode('latin-1') + payload)
+        await writer.drain()
+
+
+async def serve(server, host='127.0.0.1', port=8050):
+    tcp = await asyncio.start_server(server.handle, host, port)
+    async with tcp:
+        await tcp.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='本地图形渲染服务 (asyncio + 常驻进程池)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8050)
+    parser.add_argument('--workers', type=int, default=None, help='渲染进程数, 默认 CPU 核数')
+    parser.add_argument('--max-pending', type=int, default=None, help='排队上限, 默认 4×进程数')
+    parser.add_argument('--timeout', type=float, default=10.0, help='单次渲染超时 (秒)')
+    parser.add_argument('--cache', default=str(Path.home() / '.cache' / 'econ1210' / 'figures'),
+                        metavar='DIR', help='图形缓存目录')
+    parser.add_argument('--cache-mb', type=float, default=512, help='缓存总大小上限 (MB)')
+    parser.add_argument('--no-cache', action='store_true', help='不使用缓存')
+    args = parser.parse_args(argv)
+
+    cache = None if args.no_cache else FigureCache(args.cache, int(args.cache_mb * 1024 ** 2))
+    server = RenderServer(args.workers, cache, args.max_pending, args.timeout)
+    try:
+        n, elapsed = server.start_pool()
+    except RuntimeError as exc:
+        raise SystemExit(f'{exc}: {exc.__cause__}') from exc
+    print(f'{n} 个渲染进程已预热, 用时 {elapsed:.1f}s; 监听 http://{args.host}:{args.port}', flush=True)
+    signal.signal(signal.SIGTERM, signal.default_int_handler)  # kill 时也关闭进程池
+    try:
+        asyncio.run(serve(server, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == '__main__':
+    main()
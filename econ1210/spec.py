@@ -0,0 +1,548 @@
+'''
+声明式图形描述 (JSON / YAML) 及其编译后的渲染计划
+描述文件只声明: 模型、派生量、坐标轴, 以及每个坐标轴上的图层
+(曲线、水平/竖直线、点、多边形、矩形、填充、标注、文字、柱状图);
+任何图层都可以带 "when": 表达式, 为假时不画;
+load_spec() 只解析、校验、编译一次 (表达式编译为代码对象, 文字编译为 f-string),
+得到的 RenderPlan 可以对成千上万组参数反复 render()
+用法:
+    python -m econ1210.spec --check          # 与函数版图形逐像素对比
+    python -m econ1210.spec --bench 20       # 编译一次、重复渲染的耗时
+'''
+import argparse
+import copy
+import functools
+import importlib
+import json
+import math
+import time
+from pathlib import Path
+
+import numpy as np
+
+SPEC_DIR = Path(__file__).resolve().parent / 'specs'
+
+# 表达式里可用的名字 (除参数和模型结果外)
+_GLOBALS = {'__builtins__': {}, 'np': np, 'math': math, 'min': min, 'max': max, 'abs': abs}
+
+
+class SpecError(ValueError):
+    '''描述文件格式错误, 消息里带出错位置'''
+
+
+# ---------- 表达式与文字 ----------
+
+def _compile_expr(value, where):
+    '''数字原样返回; 字符串编译为表达式; 列表逐项编译'''
+    if isinstance(value, (int, float)):
+        return lambda ns: value
+    if isinstance(value, str):
+        try:
+            code = compile(value, where, 'eval')
+        except SyntaxError as e:
+            raise SpecError(f'{where}: 表达式语法错误: {value!r} ({e.msg})') from None
+        return lambda ns: eval(code, _GLOBALS, ns)
+    if isinstance(value, list):
+        items = [_compile_expr(v, f'{where}[{i}]') for i, v in enumerate(value)]
+        return lambda ns: [item(ns) for item in items]
+    raise SpecError(f'{where}: 需要数字、表达式字符串或列表, 得到 {type(value).__name__}')
+
+
+def _compile_text(value, where):
+    '''
+    文字按 f-string 编译, 花括号里可以写表达式和格式, 如 "Q={q_monopoly:g}";
+    也可以引用 econ1210.labels 的模板: {"key": "monopoly.point_a", "q": "q_monopoly", ...},
+    其余字段是填入模板的表达式, 渲染时按当前语言 (ECON1210_LANG) 生成
+    '''
+    if isinstance(value, dict):
+        from econ1210.labels import TEMPLATES, label
+
+        key = value.get('key')
+        if key not in TEMPLATES:
+            raise SpecError(f'{where}.key: 未定义的文字模板 {key!r}')
+        fields = [(k, _compile_expr(v, f'{where}.{k}')) for k, v in value.items() if k != 'key']
+        return lambda ns: label(key, **{k: expr(ns) for k, expr in fields})
+    if not isinstance(value, str):
+        raise SpecError(f'{where}: 文字必须是字符串或模板引用')
+    try:
+        code = compile('f' + repr(value), where, 'eval')
+    except SyntaxError as e:
+        raise SpecError(f'{where}: 文字模板错误: {value!r} ({e.msg})') from None
+    return lambda ns: eval(code, _GLOBALS, ns)
+
+
+def _text_entry(value):
+    '''标题类字段: 字符串或模板引用是文字本身, 否则是 {"text": 文字, 其余为样式}'''
+    if isinstance(value, str) or (isinstance(value, dict) and 'key' in value):
+        return {'text': value}
+    return value
+
+
+def _check_keys(layer, where, required=(), optional=()):
+    missing = [k for k in required if k not in layer]
+    if missing:
+        raise SpecError(f'{where}: 缺少字段 {missing}')
+    unknown = set(layer) - set(required) - set(optional)
+    if unknown:
+        raise SpecError(f'{where}: 未知字段 {sorted(unknown)}')
+
+
+def _style(layer, where):
+    '''style 是直接传给 matplotlib 的关键字参数; label 也可以是文字模板'''
+    style = dict(layer.get('style', {}))
+    if not isinstance(style, dict):
+        raise SpecError(f'{where}.style: 必须是对象')
+    label = _compile_text(layer['label'], f'{where}.label') if 'label' in layer else None
+
+    def kwargs(ns):
+        if label is None:
+            return style
+        return {**style, 'label': label(ns)}
+    return kwargs
+
+
+def _sampler(layer, where, exprs):
+    '''
+    在 t 区间上对若干表达式取样, 返回 sample(ns) -> (t, 形状 (分量数, 顶点数) 的数组)
+    给出 samples 时用等距网格; 否则自适应采样 (直线只取端点), 可用 tol / breakpoints 调整
+    '''
+    from econ1210.sampling import sample_adaptive
+
+    t_range = _compile_expr(layer['t'], f'{where}.t')
+    n = layer.get('samples')
+    if n is not None and (not isinstance(n, int) or n < 2):
+        raise SpecError(f'{where}.samples: 必须是 >= 2 的整数')
+    tol = layer.get('tol', 1e-3)
+    breakpoints = (_compile_expr(layer['breakpoints'], f'{where}.breakpoints')
+                   if 'breakpoints' in layer else None)
+
+    def sample(ns):
+        def func(t):
+            local = {**ns, 't': t}
+            return tuple(np.broadcast_to(e(local), t.shape) for e in exprs)
+        lo, hi = t_range(ns)
+        if n is not None:
+            t = np.linspace(lo, hi, n)
+            return t, np.stack(func(t))
+        return sample_adaptive(func, lo, hi, tol, breakpoints(ns) if breakpoints else ())
+    return sample
+
+
+# ---------- 图层编译 ----------
+# 每个编译函数返回 op(ax, ns)
+
+_COMMON = ('style', 'label')
+
+
+def _layer_curve(layer, where):
+    _check_keys(layer, where, ('t', 'y'), ('x', 'samples', 'tol', 'breakpoints', 'fmt') + _COMMON)
+    x = _compile_expr(layer.get('x', 't'), f'{where}.x')
+    y = _compile_expr(layer['y'], f'{where}.y')
+    sample = _sampler(layer, where, (x, y))
+    fmt = layer.get('fmt')
+    kwargs = _style(layer, where)
+
+    def op(ax, ns):
+        _, (xs, ys) = sample(ns)
+        args = (xs, ys, fmt) if fmt else (xs, ys)
+        ax.plot(*args, **kwargs(ns))
+    return op
+
+
+def _layer_point(layer, where):
+    _check_keys(layer, where, ('x', 'y'), ('fmt',) + _COMMON)
+    x = _compile_expr(layer['x'], f'{where}.x')
+    y = _compile_expr(layer['y'], f'{where}.y')
+    fmt = layer.get('fmt', 'o')
+    kwargs = _style(layer, where)
+    return lambda ax, ns: ax.plot(x(ns), y(ns), fmt, **kwargs(ns))
+
+
+def _layer_hline(layer, where):
+    _check_keys(layer, where, ('y',), _COMMON)
+    y = _compile_expr(layer['y'], f'{where}.y')
+    kwargs = _style(layer, where)
+    return lambda ax, ns: ax.axhline(y(ns), **kwargs(ns))
+
+
+def _layer_vline(layer, where):
+    _check_keys(layer, where, ('x',), _COMMON)
+    x = _compile_expr(layer['x'], f'{where}.x')
+    kwargs = _style(layer, where)
+    return lambda ax, ns: ax.axvline(x(ns), **kwargs(ns))
+
+
+def _layer_vsegment(layer, where):
+    _check_keys(layer, where, ('x', 'ymin', 'ymax'), _COMMON)
+    x = _compile_expr(layer['x'], f'{where}.x')
+    ymin = _compile_expr(layer['ymin'], f'{where}.ymin')
+    ymax = _compile_expr(layer['ymax'], f'{where}.ymax')
+    kwargs = _style(layer, where)
+    return lambda ax, ns: ax.vlines(x(ns), ymin(ns), ymax(ns), **kwargs(ns))
+
+
+def _layer_polygon(layer, where):
+    from matplotlib.patches import Polygon
+
+    _check_keys(layer, where, ('points',), _COMMON)
+    points = _compile_expr(layer['points'], f'{where}.points')
+    kwargs = _style(layer, where)
+    return lambda ax, ns: ax.add_patch(Polygon(np.asarray(points(ns), dtype=float),
+                                               closed=True, **kwargs(ns)))
+
+
+def _layer_rect(layer, where):
+    from matplotlib.patches import Rectangle
+
+    _check_keys(layer, where, ('xy', 'width', 'height'), _COMMON)
+    xy = _compile_expr(layer['xy'], f'{where}.xy')
+    width = _compile_expr(layer['width'], f'{where}.width')
+    height = _compile_expr(layer['height'], f'{where}.height')
+    kwargs = _style(layer, where)
+    return lambda ax, ns: ax.add_patch(Rectangle(xy(ns), width(ns), height(ns), **kwargs(ns)))
+
+
+def _layer_fill_between(layer, where):
+    _check_keys(layer, where, ('t', 'y1', 'y2'),
+                ('samples', 'tol', 'breakpoints', 'where') + _COMMON)
+    y1 = _compile_expr(layer['y1'], f'{where}.y1')
+    y2 = _compile_expr(layer['y2'], f'{where}.y2')
+    sample = _sampler(layer, where, (y1, y2))
+    mask = _compile_expr(layer['where'], f'{where}.where') if 'where' in layer else None
+    kwargs = _style(layer, where)
+
+    def op(ax, ns):
+        t, (lower, upper) = sample(ns)
+        extra = {'where': mask({**ns, 't': t})} if mask else {}
+        ax.fill_between(t, lower, upper, **extra, **kwargs(ns))
+    return op
+
+
+def _layer_annotate(layer, where):
+    _check_keys(layer, where, ('text', 'xy'), ('xytext', 'arrow') + _COMMON)
+    text = _compile_text(layer['text'], f'{where}.text')
+    xy = _compile_expr(layer['xy'], f'{where}.xy')
+    xytext = _compile_expr(layer['xytext'], f'{where}.xytext') if 'xytext' in layer else xy
+    arrow = layer.get('arrow')
+    kwargs = _style(layer, where)
+
+    def op(ax, ns):
+        extra = {'arrowprops': dict(arrow)} if arrow else {}
+        ax.annotate(text(ns), xy=xy(ns), xytext=xytext(ns), **extra, **kwargs(ns))
+    return op
+
+
+def _layer_text(layer, where):
+    _check_keys(layer, where, ('x', 'y', 'text'), ('coords',) + _COMMON)
+    x = _compile_expr(layer['x'], f'{where}.x')
+    y = _compile_expr(layer['y'], f'{where}.y')
+    text = _compile_text(layer['text'], f'{where}.text')
+    coords = layer.get('coords', 'data')
+    if coords not in ('data', 'axes'):
+        raise SpecError(f"{where}.coords: 只能是 'data' 或 'axes'")
+    kwargs = _style(layer, where)
+
+    def op(ax, ns):
+        extra = {'transform': ax.transAxes} if coords == 'axes' else {}
+        ax.text(x(ns), y(ns), text(ns), **extra, **kwargs(ns))
+    return op
+
+
+def _layer_bar(layer, where):
+    _check_keys(layer, where, ('categories', 'heights'), ('value_format',) + _COMMON)
+    categories = [_compile_text(c, f'{where}.categories[{i}]')
+                  for i, c in enumerate(layer['categories'])]
+    heights = _compile_expr(layer['heights'], f'{where}.heights')
+    value_format = layer.get('value_format')
+    kwargs = _style(layer, where)
+
+    def op(ax, ns):
+        values = heights(ns)
+        bars = ax.bar([c(ns) for c in categories], values, **kwargs(ns))
+        if value_format:
+            for bar, value in zip(bars, values):
+                ax.text(bar.get_x() + bar.get_width()/2., bar.get_height(),
+                        format(value, value_format), ha='center', va='bottom')
+    return op
+
+
+_LAYERS = {
+    'curve': _layer_curve,
+    'point': _layer_point,
+    'hline': _layer_hline,
+    'vline': _layer_vline,
+    'vsegment': _layer_vsegment,
+    'polygon': _layer_polygon,
+    'rect': _layer_rect,
+    'fill_between': _layer_fill_between,
+    'annotate': _layer_annotate,
+    'text': _layer_text,
+    'bar': _layer_bar,
+}
+
+
+def _compile_layer(layer, where):
+    if not isinstance(layer, dict) or len(layer) != 1:
+        raise SpecError(f'{where}: 每个图层必须是只有一个键的对象, 如 {{"curve": {{...}}}}')
+    (kind, body), = layer.items()
+    if kind not in _LAYERS:
+        raise SpecError(f'{where}: 未知图层类型 {kind!r}, 可用: {sorted(_LAYERS)}')
+    if not isinstance(body, dict):
+        raise SpecError(f'{where}.{kind}: 必须是对象')
+    if 'when' not in body:
+        return _LAYERS[kind](body, f'{where}.{kind}')
+    body = dict(body)
+    when = _compile_expr(body.pop('when'), f'{where}.{kind}.when')
+    op = _LAYERS[kind](body, f'{where}.{kind}')
+
+    def conditional(ax, ns):
+        if when(ns):
+            op(ax, ns)
+    return conditional
+
+
+# ---------- 坐标轴与整张图 ----------
+
+_AXES_KEYS = ('position', 'use', 'layers', 'title', 'xlabel', 'ylabel',
+              'xlim', 'ylim', 'grid', 'legend')
+
+
+def _compile_axes(spec, templates, where):
+    _check_keys(spec, where, (), _AXES_KEYS)
+    ops = []
+    for name in spec.get('use', []):
+        if name not in templates:
+            raise SpecError(f'{where}.use: 未定义的模板 {name!r}')
+        ops.extend(templates[name])
+    ops.extend(_compile_layer(layer, f'{where}.layers[{i}]')
+               for i, layer in enumerate(spec.get('layers', [])))
+
+    def labelled(key):
+        value = spec.get(key)
+        if value is None:
+            return None
+        value = _text_entry(value)
+        text = _compile_text(value['text'], f'{where}.{key}.text')
+        style = {k: v for k, v in value.items() if k != 'text'}
+        return lambda ns: (text(ns), style)
+
+    title, xlabel, ylabel = labelled('title'), labelled('xlabel'), labelled('ylabel')
+    xlim = _compile_expr(spec['xlim'], f'{where}.xlim') if 'xlim' in spec else None
+    ylim = _compile_expr(spec['ylim'], f'{where}.ylim') if 'ylim' in spec else None
+    grid = spec.get('grid')
+    legend = spec.get('legend')
+    position = tuple(spec.get('position', (0, 0)))
+
+    def op(axes, ns):
+        ax = axes[position]
+        for layer_op in ops:
+            layer_op(ax, ns)
+        if xlim:
+            ax.set_xlim(*xlim(ns))
+        if ylim:
+            ax.set_ylim(*ylim(ns))
+        for setter, item in ((ax.set_xlabel, xlabel), (ax.set_ylabel, ylabel), (ax.set_title, title)):
+            if item:
+                text, style = item(ns)
+                setter(text, **style)
+        if legend:
+            ax.legend(**(legend if isinstance(legend, dict) else {}))
+        if grid:
+            ax.grid(True, **(grid if isinstance(grid, dict) else {}))
+    return op
+
+
+def _load_callable(path, where):
+    module, _, name = path.partition(':')
+    try:
+        return getattr(importlib.import_module(module), name)
+    except (ImportError, AttributeError) as e:
+        raise SpecError(f'{where}: 无法导入 {path!r} ({e})') from None
+
+
+class RenderPlan:
+    '''
+    编译好的渲染计划: 解析和校验只做一次
+    values(**params) 只算模型数值, render(**params) 画出 Figure
+    '''
+
+    def __init__(self, spec, name='<spec>'):
+        if not isinstance(spec, dict):
+            raise SpecError(f'{name}: 顶层必须是对象')
+        _check_keys(spec, name, ('axes',),
+                    ('figure', 'defaults', 'model', 'let', 'templates'))
+        self.name = name
+        self.defaults = dict(spec.get('defaults', {}))
+
+        model = spec.get('model')
+        if model is None:
+            self._model, self._model_args = None, None
+        else:
+            if isinstance(model, str):
+                model = {'function': model}
+            _check_keys(model, f'{name}.model', ('function',), ('args',))
+            self._model = _load_callable(model['function'], f'{name}.model.function')
+            args = model.get('args')
+            self._model_args = (None if args is None else
+                                {k: _compile_expr(v, f'{name}.model.args.{k}') for k, v in args.items()})
+
+        self._let = [(k, _compile_expr(v, f'{name}.let.{k}'))
+                     for k, v in spec.get('let', {}).items()]
+
+        templates = {}
+        for key, layers in spec.get('templates', {}).items():
+            templates[key] = [_compile_layer(layer, f'{name}.templates.{key}[{i}]')
+                              for i, layer in enumerate(layers)]
+
+        figure = dict(spec.get('figure', {}))
+        _check_keys(figure, f'{name}.figure', (), ('size', 'layout', 'suptitle', 'tight_layout'))
+        self._size = tuple(figure.get('size', (12, 8)))
+        self._layout = tuple(figure.get('layout', (1, 1)))
+        suptitle = figure.get('suptitle')
+        if suptitle is not None:
+            suptitle = _text_entry(suptitle)
+        self._suptitle = None if suptitle is None else (
+            _compile_text(suptitle['text'], f'{name}.figure.suptitle.text'),
+            {k: v for k, v in suptitle.items() if k != 'text'})
+        self.tight_layout = figure.get('tight_layout', True)
+
+        self._axes = [_compile_axes(ax, templates, f'{name}.axes[{i}]')
+                      for i, ax in enumerate(spec['axes'])]
+
+    def values(self, **params):
+        '''参数 + 模型输出 + let 派生量组成的命名空间'''
+        ns = {**self.defaults, **params}
+        if self._model is not None:
+            if self._model_args is None:
+                ns.update(self._model(**ns))
+            else:
+                ns.update(self._model(**{k: v(ns) for k, v in self._model_args.items()}))
+        for key, expr in self._let:
+            ns[key] = expr(ns)
+        return ns
+
+    def build(self, ns):
+        '''按已算好的命名空间创建 Figure 和全部 artist, 不做排版'''
+        import matplotlib.pyplot as plt
+        from econ1210.figures import configure_fonts
+
+        configure_fonts()
+        fig, axes = plt.subplots(*self._layout, figsize=self._size, squeeze=False)
+        for op in self._axes:
+            op(axes, ns)
+        if self._suptitle:
+            text, style = self._suptitle
+            fig.suptitle(text(ns), **style)
+        return fig
+
+    def render(self, **params):
+        from econ1210.fonts import quiet_missing_glyphs
+
+        fig = self.build(self.values(**params))
+        if self.tight_layout:
+            with quiet_missing_glyphs():
+                fig.tight_layout()
+        return fig
+
+
+def with_samples(spec, n):
+    '''返回把所有曲线/填充图层改为 n 点等距采样的描述副本 (n=None 时改为自适应), 用于对比和基准测试'''
+    spec = copy.deepcopy(spec)
+    layer_lists = list(spec.get('templates', {}).values()) + [ax.get('layers', []) for ax in spec['axes']]
+    for layers in layer_lists:
+        for layer in layers:
+            (kind, body), = layer.items()
+            if kind in ('curve', 'fill_between'):
+                if n is None:
+                    body.pop('samples', None)
+                else:
+                    body['samples'] = n
+    return spec
+
+
+def parse_spec(text, fmt='json'):
+    '''把 JSON 或 YAML 文本解析为 dict (YAML 需要安装 PyYAML)'''
+    if fmt == 'json':
+        return json.loads(text)
+    try:
+        import yaml
+    except ImportError:
+        raise ImportError('读取 YAML 描述文件需要 PyYAML: pip install pyyaml') from None
+    return yaml.safe_load(text)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_cached(path, mtime):
+    fmt = 'yaml' if path.suffix in ('.yaml', '.yml') else 'json'
+    return RenderPlan(parse_spec(path.read_text(encoding='utf-8'), fmt), name=path.name)
+
+
+def load_spec(path):
+    '''加载并编译描述文件; 同一文件在未修改前只编译一次'''
+    path = Path(path)
+    if not path.is_absolute() and not path.exists():
+        path = SPEC_DIR / path
+    path = path.resolve()
+    return _load_cached(path, path.stat().st_mtime_ns)
+
+
+def _to_rgba(fig, dpi):
+    from econ1210.export import to_array
+    return to_array(fig, dpi, copy=True)
+
+
+def check_equivalence(dpi=60):
+    '''逐像素比较描述文件版与函数版的注册图形, 返回 {名字: 不同像素比例}'''
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from econ1210.figures import FIGURES, get_figure
+
+    result = {}
+    for name, entry in FIGURES.items():
+        if 'spec' not in entry:
+            continue
+        fig_a = get_figure(name)()
+        fig_b = load_spec(entry['spec']).render()
+        a, b = _to_rgba(fig_a, dpi), _to_rgba(fig_b, dpi)
+        plt.close(fig_a)
+        plt.close(fig_b)
+        if a.shape != b.shape:
+            result[name] = 1.0
+        else:
+            result[name] = float(np.any(a != b, axis=-1).mean())
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='声明式图形描述: 等价性检查与重复渲染计时')
+    parser.add_argument('--check', action='store_true', help='与函数版图形逐像素对比')
+    parser.add_argument('--bench', type=int, default=0, metavar='N', help='每个描述文件重复渲染 N 次')
+    args = parser.parse_args(argv)
+
+    if args.check:
+        for name, diff in check_equivalence().items():
+            print(f'{name:20s} 不同像素比例 {diff:.4%}')
+    if args.bench:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        from econ1210.figures import FIGURES
+
+        _load_cached.cache_clear()
+        for name, entry in FIGURES.items():
+            if 'spec' not in entry:
+                continue
+            start = time.perf_counter()
+            plan = load_spec(entry['spec'])
+            compile_time = time.perf_counter() - start
+            key, low, high = entry['sweep']
+            start = time.perf_counter()
+            for value in np.linspace(low, high, args.bench):
+                plt.close(plan.render(**{key: float(value)}))
+            per_render = (time.perf_counter() - start) / args.bench
+            print(f'{name:20s} 编译 {compile_time*1000:7.2f}ms  每次渲染 {per_render*1000:7.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+'''
+符号推导 -> NumPy 向量化函数的模型编译器
+给出反需求函数 P(Q) 和边际成本 MC(Q) (竞争市场里即供给曲线) 的表达式,
+用 SymPy 求解一次均衡条件:
+    竞争均衡: P(Q) = MC(Q)
+    垄断均衡: MR(Q) = d(P*Q)/dQ = MC(Q)
+并把解生成为只依赖 NumPy 的 Python 源码, 按表达式哈希缓存在磁盘上;
+缓存命中时不导入 SymPy, 冷启动只需读文件和 exec, 之后每次调用都是纯 NumPy 运算
+SymPy 是可选依赖, 只在缓存未命中时需要
+用法:
+    python -m econ1210.symbolic     # 推导各章模型并与手写求解器对比
+'''
+import argparse
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+# 生成代码的格式版本, 改动生成逻辑时加一, 旧缓存自动失效
+_FORMAT = 1
+_compiled = {}
+
+
+def default_cache_dir():
+    return Path(os.environ.get('ECON1210_MODEL_CACHE',
+                               Path.home() / '.cache' / 'econ1210' / 'models'))
+
+
+def model_key(demand, marginal_cost, quantity='Q'):
+    '''表达式 (去掉空白) + 生成格式版本 的哈希'''
+    payload = json.dumps({
+        'demand': ''.join(demand.split()),
+        'marginal_cost': ''.join(marginal_cost.split()),
+        'quantity': quantity,
+        'format': _FORMAT,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:24]
+
+
+def _generate_source(demand, marginal_cost, quantity, key):
+    '''用 SymPy 求解均衡条件, 返回生成的模块源码'''
+    try:
+        import sympy
+        from sympy.printing.numpy import NumPyPrinter
+    except ImportError:
+        raise ImportError('首次推导模型需要 SymPy: pip install sympy '
+                          '(推导结果缓存后不再需要)') from None
+
+    q = sympy.Symbol(quantity, positive=True)
+    P = sympy.sympify(demand, locals={quantity: q})
+    MC = sympy.sympify(marginal_cost, locals={quantity: q})
+    params = sorted((s for s in (P.free_symbols | MC.free_symbols) if s != q), key=str)
+    # 参数一律按正数处理, 帮助 SymPy 化简根式
+    positive = {s: sympy.Symbol(str(s), positive=True) for s in params}
+    P, MC = P.subs(positive), MC.subs(positive)
+    params = [positive[s] for s in params]
+
+    MR = sympy.simplify(sympy.diff(P * q, q))
+    conditions = {
+        'competitive': sympy.Eq(P, MC),
+        'monopoly': sympy.Eq(MR, MC),
+    }
+
+    printer = NumPyPrinter()
+    args = ', '.join(str(s) for s in params)
+    lines = [
+        f'# 由 econ1210.symbolic 生成, 请勿手改; key={key}',
+        f'# P({quantity}) = {P}',
+        f'# MC({quantity}) = {MC}',
+        f'# MR({quantity}) = {MR}',
+        'import numpy',
+        '',
+        f'PARAMS = {tuple(str(s) for s in params)!r}',
+        '',
+        '',
+        f'def demand({quantity}, {args}):',
+        f'    return {printer.doprint(P)}',
+        '',
+        '',
+        f'def marginal_revenue({quantity}, {args}):',
+        f'    return {printer.doprint(MR)}',
+        '',
+        '',
+        f'def marginal_cost({quantity}, {args}):',
+        f'    return {printer.doprint(MC)}',
+    ]
+    for name, condition in conditions.items():
+        try:
+            roots = sympy.solve(condition, q)
+        except NotImplementedError:
+            # sympy 遇到超越方程等无法求解的形式时抛 NotImplementedError
+            roots = []
+        if not roots:
+            raise ValueError(f'{name} 均衡条件 {condition} 没有解析解')
+        body = ', '.join(printer.doprint(r) for r in roots)
+        lines += ['', '', f'def roots_{name}({args}):',
+                  f'    # {condition}', f'    return [{body}]']
+    return '\n'.join(lines) + '\n'
+
+
+def _select_root(roots, shape):
+    '''候选根中取最大的非负实数解; 都不可行时产量为 0 (市场关闭)'''
+    best = np.zeros(shape)
+    for r in roots:
+        r = np.broadcast_to(np.real_if_close(np.asarray(r)), shape)
+        ok = np.isfinite(r) & np.isreal(r) & (np.real(r) >= 0)
+        best = np.where(ok, np.maximum(best, np.real(r)), best)
+    return best
+
+
+class CompiledModel:
+    '''
+    编译后的市场模型, 调用时各参数可以是任意形状的数组 (广播)
+    返回 q/p_competitive 和 q/p_monopoly
+    '''
+
+    def __init__(self, namespace, key):
+        self.key = key
+        self.params = namespace['PARAMS']
+        self.demand = namespace['demand']
+        self.marginal_revenue = namespace['marginal_revenue']
+        self.marginal_cost = namespace['marginal_cost']
+        self._roots = {name: namespace[f'roots_{name}'] for name in ('competitive', 'monopoly')}
+
+    def __call__(self, **params):
+        missing = set(self.params) - set(params)
+        if missing:
+            raise TypeError(f'缺少参数: {sorted(missing)}')
+        values = np.broadcast_arrays(*(np.asarray(params[k], dtype=float) for k in self.params))
+        shape = values[0].shape if values else ()
+        result = {}
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for name, roots in self._roots.items():
+                q = _select_root(roots(*values), shape)
+                result[f'q_{name}'] = q
+                result[f'p_{name}'] = np.broadcast_to(self.demand(q, *values), shape)
+        return result
+
+
+def compile_market(demand, marginal_cost, quantity='Q', cache_dir=None):
+    '''
+    推导并编译市场模型, 例如 compile_market('a - b*Q', 'c + d*Q')
+    同一进程内直接复用; 跨进程按表达式哈希从磁盘读取生成的源码
+    '''
+    key = model_key(demand, marginal_cost, quantity)
+    if key in _compiled:
+        return _compiled[key]
+
+    path = Path(cache_dir or default_cache_dir()) / f'{key}.py'
+    try:
+        source = path.read_text(encoding='utf-8')
+    except FileNotFoundError:
+        source = _generate_source(demand, marginal_cost, quantity, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f'.{os.getpid()}.tmp')
+        tmp.write_text(source, encoding='utf-8')
+        os.replace(tmp, path)
+
+    namespace = {}
+    exec(compile(source, str(path), 'exec'), namespace)
+    model = _compiled[key] = CompiledModel(namespace, key)
+    return model
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='推导各章模型, 与手写求解器对比并计时')
+    parser.add_argument('--cache', default=None, metavar='DIR', help='生成代码的缓存目录')
+    parser.add_argument('--n', type=int, default=1_000_000, help='热调用时的情景数')
+    args = parser.parse_args(argv)
+
+    from econ1210.discrimination import solve_price_discrimination
+    from econ1210.monopoly import solve_monopoly_subsidy
+    from econ1210.price_control import equilibrium
+
+    start = time.perf_counter()
+    linear = compile_market('a - b*Q', 'c + d*Q', cache_dir=args.cache)
+    print(f'编译 (含缓存读取或符号推导) {(time.perf_counter() - start)*1000:.1f}ms')
+
+    ch7 = linear(a=100, b=2, c=10, d=1)
+    q_eq, p_eq = equilibrium(100, 2, 10, 1)
+    print(f'Ch7  竞争均衡 Q={ch7["q_competitive"]:g}, P={ch7["p_competitive"]:g} '
+          f'(手写: {float(q_eq):g}, {float(p_eq):g})')
+
+    ch11 = linear(a=146, b=0.5, c=4, d=0)
+    ref = solve_monopoly_subsidy(146, 0.5, 4)
+    print(f'Ch11 垄断 Q={ch11["q_monopoly"]:g}, P={ch11["p_monopoly"]:g} '
+          f'(手写: {float(ref["q_monopoly"]):g}, {float(ref["p_monopoly"]):g})')
+
+    ch12 = linear(a=np.array([92.0, 64.0]), b=2, c=9, d=0)
+    ref = solve_price_discrimination([92.0, 64.0], [2.0, 2.0], 9.0)
+    print(f'Ch12 分市场定价 Q={ch12["q_monopoly"]}, P={ch12["p_monopoly"]} '
+          f'(手写: {ref["q_discrim"]}, {ref["p_discrim"]})')
+
+    rng = np.random.default_rng(0)
+    a = rng.uniform(50, 150, args.n)
+    b = rng.uniform(0.5, 3, args.n)
+    c = rng.uniform(0, 40, args.n)
+    start = time.perf_counter()
+    linear(a=a, b=b, c=c, d=0)
+    print(f'{args.n} 个情景热调用 {(time.perf_counter() - start)*1000:.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
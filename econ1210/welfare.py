@@ -0,0 +1,112 @@
+'''
+福利面积计算: 消费者剩余 / 生产者剩余 / 无谓损失 / 税收·补贴·转移面积
+曲线都写成反函数 P(Q) 的形式:
+  Linear: 线性曲线, 用精确的闭式积分
+  Curve:  任意向量化函数, 用梯形或 Simpson 数值积分
+曲线参数和积分上下限都可以是 NumPy 数组, 按广播规则一次算完整批参数
+'''
+import numpy as np
+
+
+class Linear:
+    '''P = intercept + slope * Q'''
+
+    def __init__(self, intercept, slope=0.0):
+        self.intercept = np.asarray(intercept, dtype=float)
+        self.slope = np.asarray(slope, dtype=float)
+
+    def __call__(self, q):
+        return self.intercept + self.slope * q
+
+    def integral(self, q0, q1):
+        '''从 q0 到 q1 的精确积分'''
+        q0 = np.asarray(q0, dtype=float)
+        q1 = np.asarray(q1, dtype=float)
+        return self.intercept * (q1 - q0) + 0.5 * self.slope * (q1 ** 2 - q0 ** 2)
+
+
+class Curve:
+    '''
+    非线性曲线 P = func(Q, *params)
+    func 必须能对数组逐元素计算; params 会在末尾补一个轴, 与积分节点广播
+    method: 'simpson' (默认) 或 'trapezoid', n: 积分节点数 (Simpson 需奇数)
+    '''
+
+    def __init__(self, func, *params, method='simpson', n=129):
+        if method not in ('simpson', 'trapezoid'):
+            raise ValueError(f'未知的积分方法: {method}')
+        if method == 'simpson' and n % 2 == 0:
+            n += 1
+        self.func = func
+        self.params = tuple(np.asarray(p, dtype=float) for p in params)
+        self.method = method
+        self.nodes = np.linspace(0.0, 1.0, n)
+        self.weights = _quadrature_weights(method, n)
+
+    def __call__(self, q):
+        return self.func(q, *self.params)
+
+    def integral(self, q0, q1):
+        '''在 [q0, q1] 上映射到固定节点后一次性数值积分'''
+        q0 = np.asarray(q0, dtype=float)
+        q1 = np.asarray(q1, dtype=float)
+        width = q1 - q0
+        q = q0[..., None] + width[..., None] * self.nodes
+        values = self.func(q, *(p[..., None] for p in self.params))
+        return width * (values @ self.weights)
+
+
+def _quadrature_weights(method, n):
+    '''[0, 1] 上 n 个等距节点的积分权重'''
+    h = 1.0 / (n - 1)
+    if method == 'trapezoid':
+        w = np.full(n, h)
+        w[[0, -1]] = h / 2
+    else:
+        w = np.full(n, 2 * h / 3)
+        w[1::2] = 4 * h / 3
+        w[[0, -1]] = h / 3
+    return w
+
+
+def linear_demand(a, b):
+    '''需求 P = a - b*Q (b 取正值)'''
+    return Linear(a, -np.asarray(b, dtype=float))
+
+
+def linear_supply(c, d):
+    '''供给 P = c + d*Q'''
+    return Linear(c, d)
+
+
+def _as_curve(x):
+    # 数字或数组视为水平线 (价格、边际成本); 带 integral 方法的对象 (如 econ1210.nonlinear 的需求族) 直接使用
+    return x if hasattr(x, 'integral') else Linear(x)
+
+
+def area_between(upper, lower, q0, q1):
+    '''两条曲线 (或价格水平) 在 [q0, q1] 之间的面积 ∫(upper - lower) dQ'''
+    return _as_curve(upper).integral(q0, q1) - _as_curve(lower).integral(q0, q1)
+
+
+def consumer_surplus(demand, price, q):
+    '''需求曲线与支付价格之间、0 到 q 的面积'''
+    return area_between(demand, price, 0.0, q)
+
+
+def producer_surplus(supply, price, q):
+    '''收到价格与供给曲线 (或边际成本) 之间、0 到 q 的面积'''
+    return area_between(price, supply, 0.0, q)
+
+
+def deadweight_loss(demand, supply, q, q_efficient):
+    '''
+    成交量 q 偏离有效产量 q_efficient 造成的无谓损失 ∫_q^{q_efficient} (D - S) dQ
+    产量不足和过度生产时结果都为正
+    '''
+    return area_between(demand, supply, q, q_efficient)
+
+
+def transfer_area(height, q):
+    '''矩形面积: 税收收入、补贴成本、贿赂或排队浪费等 (每单位金额 × 数量)'''
+    return np.asarray(height, dtype=float) * q
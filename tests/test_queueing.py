@@ -0,0 +1,15 @@
+'''排队模拟在没有供给时不应抽样出买到者'''
+import pytest
+
+from econ1210.queueing import simulate_queue
+
+
+@pytest.mark.parametrize('p_ceiling', [5.0, 10.0])
+def test_zero_supply_ceiling_serves_nobody(p_ceiling):
+    r = simulate_queue(p_ceiling, n_agents=10_000, seed=0)
+    assert r['q'] == 0.0
+    assert r['served'] == 0.0
+    assert r['wait'] == 0.0
+    assert r['waste_cost'] == 0.0
+    assert r['rent'] == 0.0
+    assert r['dwl_queue'] == r['dwl_ideal']
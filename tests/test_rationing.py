@@ -0,0 +1,30 @@
+'''随机配给模拟在上限不起作用、没有供给时应与解析值一致'''
+import pytest
+
+from econ1210.rationing import simulate_random_rationing
+
+
+@pytest.mark.parametrize('p_ceiling', [40.0, 50.0, 120.0])
+def test_non_binding_ceiling_has_no_loss(p_ceiling):
+    r = simulate_random_rationing(p_ceiling, n_consumers=1000, trials=50, seed=0)
+    assert r['cs_mean'] == pytest.approx(r['cs_ideal'])
+    assert r['cs_mean'] == pytest.approx(r['cs_analytic'])
+    assert r['loss_mean'] == pytest.approx(0.0)
+    assert r['draws'] == 0
+
+
+@pytest.mark.parametrize('p_ceiling', [5.0, 10.0])
+def test_zero_supply_ceiling_has_no_winners(p_ceiling):
+    r = simulate_random_rationing(p_ceiling, n_consumers=1000, trials=50, seed=0)
+    assert r['cs_mean'] == 0.0
+    assert r['cs_ideal'] == 0.0
+    assert r['loss_mean'] == 0.0
+    assert r['cs_std'] == 0.0
+
+
+def test_binding_ceiling_matches_analytic():
+    r = simulate_random_rationing(25.0, n_consumers=2000, trials=200, seed=0)
+    lo, hi = r['cs_ci']
+    assert r['loss_mean'] > 0
+    assert abs(r['cs_mean'] - r['cs_analytic']) < 5 * r['cs_se'] + 1e-9
+    assert lo < hi